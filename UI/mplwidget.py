@@ -1,16 +1,27 @@
 from PyQt5.QtWidgets import *
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib
-
-matplotlib.use('Qt5Agg')
 
 class MplWidget(QWidget):
+    ''' A widget holding a Matplotlib canvas.
+
+    Matplotlib is imported and the canvas is built on the first access of
+    canvas, so a window that never shows this widget does not pay for it.
+    '''
     def __init__(self, parent = None):
         QWidget.__init__(self, parent)
-        self.canvas = FigureCanvas(Figure())
+        self._canvas = None
 
         vertical_layout = QVBoxLayout()
-        vertical_layout.addWidget(self.canvas)
-        self.canvas.axes = self.canvas.figure.add_subplot(111)
         self.setLayout(vertical_layout)
+
+    @property
+    def canvas(self):
+        if self._canvas is None:
+            import matplotlib
+            matplotlib.use('Qt5Agg')
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+            from matplotlib.figure import Figure
+
+            self._canvas = FigureCanvas(Figure())
+            self._canvas.axes = self._canvas.figure.add_subplot(111)
+            self.layout().addWidget(self._canvas)
+        return self._canvas
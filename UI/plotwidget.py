@@ -0,0 +1,202 @@
+from typing import List, Sequence, Tuple
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QColor, QPainter, QPalette, QPen, QPolygonF, QPaintEvent, QFontMetrics
+from PyQt5.QtCore import Qt, QPointF, QRectF
+import numpy as np
+
+# The color cycles of Matplotlib's default and dark_background styles.
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+          '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+DARK_COLORS = ['#8dd3c7', '#feffb3', '#bfbbd9', '#fa8174', '#81b1d2',
+               '#fdb462', '#b3de69', '#bc82bd', '#ccebc4', '#ffed6f']
+
+def nice_ticks(low: float, high: float, count: int = 6) -> np.ndarray:
+    ''' Return round tick positions between low and high, about count of them. '''
+    if not np.isfinite(low) or not np.isfinite(high) or high <= low:
+        return np.array([])
+    raw = (high - low) / max(1, count)
+    magnitude = 10 ** np.floor(np.log10(raw))
+    step = magnitude * min((m for m in (1, 2, 5, 10) if m * magnitude >= raw), default=10)
+    # Adding 0.0 turns -0.0 into 0.0 so no tick is labelled '-0'.
+    return np.arange(np.ceil(low / step), np.floor(high / step) + 1) * step + 0.0
+
+def to_polygon(x: np.ndarray, y: np.ndarray) -> QPolygonF:
+    ''' Build a QPolygonF by writing the points straight into its memory. '''
+    polygon = QPolygonF(len(x))
+    pointer = polygon.data()
+    pointer.setsize(len(x) * 2 * np.dtype(np.float64).itemsize)
+    points = np.frombuffer(pointer, dtype=np.float64).reshape(len(x), 2)
+    points[:, 0] = x
+    points[:, 1] = y
+    return polygon
+
+class PlotWidget(QWidget):
+    ''' A lightweight plot drawn with QPainter.
+
+    Every series is mapped to pixels with NumPy and drawn as one polyline, so
+    a frame costs a few array operations and one drawPolyline per series.
+    NaN points are not drawn. Lines are one pixel wide: wider pens make Qt
+    stroke the polyline as a filled outline, which is orders of magnitude
+    slower for dense data. Background, axes and text follow the palette, so
+    the plot matches the light and the dark theme.
+    '''
+    def __init__(self, parent = None):
+        QWidget.__init__(self, parent)
+        self.series: List[Tuple[np.ndarray, np.ndarray]] = []
+        self.is_stem = False
+        self.xlim = (0.0, 1.0)
+        self.ylim = (0.0, 1.0)
+        self.title = ''
+        self.xlabel = ''
+        self.ylabel = ''
+        self.is_grid_enable = False
+        self.is_antialiased = False
+        self.labels: List[str] = []
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def set_layout(self, xlim: Sequence[float], ylim: Sequence[float], title: str = '', xlabel: str = '',
+                   ylabel: str = '', is_grid_enable: bool = False, is_stem: bool = False,
+                   labels: Sequence[str] = ()) -> None:
+        ''' labels name the stems on the x axis, or the lines in a legend if there are several. '''
+        self.xlim = (float(xlim[0]), float(xlim[1]))
+        self.ylim = (float(ylim[0]), float(ylim[1]))
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.is_grid_enable = is_grid_enable
+        self.is_stem = is_stem
+        self.labels = list(labels)
+        self.update()
+
+    def set_series(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        self.series = series
+        self.update()
+
+    def plot_rect(self) -> QRectF:
+        metrics = QFontMetrics(self.font())
+        line = metrics.height()
+        left = metrics.horizontalAdvance('-0.000e+00') + (line if self.ylabel else 0) + 8
+        top = (2 * line if self.title else line)
+        bottom = 2 * line + 4 + (line if self.xlabel else 0)
+        return QRectF(left, top, max(1, self.width() - left - 16), max(1, self.height() - top - bottom))
+
+    def map_x(self, x: np.ndarray, rect: QRectF) -> np.ndarray:
+        x_min, x_max = self.xlim
+        return rect.left() + (x - x_min) * (rect.width() / ((x_max - x_min) or 1.0))
+
+    def map_y(self, y: np.ndarray, rect: QRectF) -> np.ndarray:
+        y_min, y_max = self.ylim
+        return rect.bottom() - (y - y_min) * (rect.height() / ((y_max - y_min) or 1.0))
+
+    def is_dark(self) -> bool:
+        return self.palette().color(QPalette.Base).lightness() < 128
+
+    def line_colors(self) -> List[str]:
+        return DARK_COLORS if self.is_dark() else COLORS
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().color(QPalette.Base))
+        rect = self.plot_rect()
+        self.paint_axes(painter, rect)
+
+        painter.setClipRect(rect)
+        painter.setRenderHint(QPainter.Antialiasing, self.is_antialiased)
+        if self.is_stem:
+            self.paint_stem(painter, rect)
+        else:
+            self.paint_lines(painter, rect)
+            if len(self.labels) > 1:
+                self.paint_legend(painter, rect)
+        painter.end()
+
+    def paint_axes(self, painter: QPainter, rect: QRectF) -> None:
+        metrics = QFontMetrics(self.font())
+        line = metrics.height()
+        foreground = self.palette().color(QPalette.Text)
+        grid = QColor('#505050' if self.is_dark() else '#b0b0b0')
+        painter.setPen(QPen(foreground, 1))
+
+        if self.is_stem and self.labels:
+            x_ticks = [(index, label) for index, label in enumerate(self.labels) if self.xlim[0] <= index <= self.xlim[1]]
+        else:
+            x_ticks = [(tick, f'{tick:g}') for tick in nice_ticks(*self.xlim)]
+        for tick, label in x_ticks:
+            x = float(self.map_x(tick, rect))
+            if self.is_grid_enable:
+                painter.setPen(QPen(grid, 1))
+                painter.drawLine(QPointF(x, rect.top()), QPointF(x, rect.bottom()))
+                painter.setPen(QPen(foreground, 1))
+            painter.drawLine(QPointF(x, rect.bottom()), QPointF(x, rect.bottom() + 4))
+            painter.drawText(QPointF(x - metrics.horizontalAdvance(label) / 2, rect.bottom() + 4 + line), label)
+
+        for tick in nice_ticks(*self.ylim):
+            y = float(self.map_y(tick, rect))
+            label = f'{tick:g}'
+            if self.is_grid_enable:
+                painter.setPen(QPen(grid, 1))
+                painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+                painter.setPen(QPen(foreground, 1))
+            painter.drawLine(QPointF(rect.left() - 4, y), QPointF(rect.left(), y))
+            painter.drawText(QPointF(rect.left() - 6 - metrics.horizontalAdvance(label), y + metrics.ascent() / 2), label)
+
+        painter.drawRect(rect)
+        if self.title:
+            painter.drawText(QRectF(0, 0, self.width(), 2 * line), Qt.AlignCenter, self.title)
+        if self.xlabel:
+            painter.drawText(QRectF(rect.left(), rect.bottom() + 4 + line, rect.width(), 1.5 * line), Qt.AlignCenter, self.xlabel)
+        if self.ylabel:
+            painter.save()
+            painter.translate(line, rect.center().y())
+            painter.rotate(-90)
+            painter.drawText(QRectF(-rect.height() / 2, -line, rect.height(), 1.5 * line), Qt.AlignCenter, self.ylabel)
+            painter.restore()
+
+    def paint_lines(self, painter: QPainter, rect: QRectF) -> None:
+        colors = self.line_colors()
+        for index, (x, y) in enumerate(self.series):
+            painter.setPen(QPen(QColor(colors[index % len(colors)]), 1))
+            px, py = self.map_x(x, rect), self.map_y(y, rect)
+            # Split at NaN so gaps stay gaps.
+            finite = np.isfinite(px) & np.isfinite(py)
+            if finite.all():
+                painter.drawPolyline(to_polygon(px, py))
+                continue
+            edges = np.flatnonzero(np.diff(np.concatenate([[0], finite.view(np.int8), [0]])))
+            for start, stop in zip(edges[::2], edges[1::2]):
+                painter.drawPolyline(to_polygon(px[start:stop], py[start:stop]))
+
+    def paint_legend(self, painter: QPainter, rect: QRectF) -> None:
+        metrics = QFontMetrics(self.font())
+        line = metrics.height()
+        width = max(metrics.horizontalAdvance(label) for label in self.labels) + 32
+        box = QRectF(rect.right() - width - 8, rect.top() + 8, width, line * len(self.labels) + 8)
+        painter.setPen(QPen(self.palette().color(QPalette.Mid), 1))
+        painter.setBrush(self.palette().color(QPalette.Base))
+        painter.drawRect(box)
+        colors = self.line_colors()
+        for index, label in enumerate(self.labels):
+            y = box.top() + 4 + line * (index + 0.5)
+            painter.setPen(QPen(QColor(colors[index % len(colors)]), 2))
+            painter.drawLine(QPointF(box.left() + 6, y), QPointF(box.left() + 24, y))
+            painter.setPen(QPen(self.palette().color(QPalette.Text), 1))
+            painter.drawText(QPointF(box.left() + 28, y + metrics.ascent() / 2 - 1), label)
+
+    def paint_stem(self, painter: QPainter, rect: QRectF) -> None:
+        if not self.series:
+            return
+        x, y = self.series[0]
+        px, py = self.map_x(x, rect), self.map_y(np.nan_to_num(y), rect)
+        base = float(self.map_y(0.0, rect))
+
+        colors = self.line_colors()
+        painter.setPen(QPen(QColor(colors[3]), 2))
+        painter.drawLine(QPointF(px[0], base), QPointF(px[-1], base))
+
+        color = QColor(colors[0])
+        painter.setPen(QPen(color, 2))
+        for point_x, point_y in zip(px.tolist(), py.tolist()):
+            painter.drawLine(QPointF(point_x, base), QPointF(point_x, point_y))
+        painter.setBrush(color)
+        for point_x, point_y in zip(px.tolist(), py.tolist()):
+            painter.drawEllipse(QPointF(point_x, point_y), 3.5, 3.5)
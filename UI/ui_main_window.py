@@ -82,6 +82,22 @@ class Ui_MainWindow(object):
         self.connect_button = QtWidgets.QPushButton(self.groupBox)
         self.connect_button.setObjectName("connect_button")
         self.verticalLayout_6.addWidget(self.connect_button)
+        self.add_port_button = QtWidgets.QPushButton(self.groupBox)
+        self.add_port_button.setEnabled(False)
+        self.add_port_button.setObjectName("add_port_button")
+        self.verticalLayout_6.addWidget(self.add_port_button)
+        self.replay_button = QtWidgets.QPushButton(self.groupBox)
+        self.replay_button.setObjectName("replay_button")
+        self.verticalLayout_6.addWidget(self.replay_button)
+        self.replay_speed_combo_box = QtWidgets.QComboBox(self.groupBox)
+        self.replay_speed_combo_box.setObjectName("replay_speed_combo_box")
+        self.replay_speed_combo_box.addItem("")
+        self.replay_speed_combo_box.addItem("")
+        self.replay_speed_combo_box.addItem("")
+        self.replay_speed_combo_box.addItem("")
+        self.replay_speed_combo_box.addItem("")
+        self.replay_speed_combo_box.addItem("")
+        self.verticalLayout_6.addWidget(self.replay_speed_combo_box)
         self.verticalLayout.addWidget(self.groupBox)
         self.tabWidget = QtWidgets.QTabWidget(self.centralwidget)
         self.tabWidget.setEnabled(True)
@@ -104,6 +120,12 @@ class Ui_MainWindow(object):
         self.formLayout_4.setContentsMargins(-1, 0, -1, 0)
         self.formLayout_4.setVerticalSpacing(2)
         self.formLayout_4.setObjectName("formLayout_4")
+        self.source_label = QtWidgets.QLabel(self.groupBox_2)
+        self.source_label.setObjectName("source_label")
+        self.formLayout_4.setWidget(0, QtWidgets.QFormLayout.LabelRole, self.source_label)
+        self.source_combo_box = QtWidgets.QComboBox(self.groupBox_2)
+        self.source_combo_box.setObjectName("source_combo_box")
+        self.formLayout_4.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.source_combo_box)
         self.start_string_line_edit = QtWidgets.QLineEdit(self.groupBox_2)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
         sizePolicy.setHorizontalStretch(0)
@@ -152,11 +174,62 @@ class Ui_MainWindow(object):
         self.delimiter_line_edit.setSizePolicy(sizePolicy)
         self.delimiter_line_edit.setObjectName("delimiter_line_edit")
         self.formLayout_4.setWidget(3, QtWidgets.QFormLayout.FieldRole, self.delimiter_line_edit)
+        self.grammar_label = QtWidgets.QLabel(self.groupBox_2)
+        self.grammar_label.setObjectName("grammar_label")
+        self.formLayout_4.setWidget(4, QtWidgets.QFormLayout.LabelRole, self.grammar_label)
+        self.grammar_combo_box = QtWidgets.QComboBox(self.groupBox_2)
+        self.grammar_combo_box.setObjectName("grammar_combo_box")
+        self.grammar_combo_box.addItem("")
+        self.grammar_combo_box.addItem("")
+        self.grammar_combo_box.addItem("")
+        self.grammar_combo_box.addItem("")
+        self.formLayout_4.setWidget(4, QtWidgets.QFormLayout.FieldRole, self.grammar_combo_box)
+        self.pattern_label = QtWidgets.QLabel(self.groupBox_2)
+        self.pattern_label.setObjectName("pattern_label")
+        self.formLayout_4.setWidget(5, QtWidgets.QFormLayout.LabelRole, self.pattern_label)
+        self.pattern_line_edit = QtWidgets.QLineEdit(self.groupBox_2)
+        self.pattern_line_edit.setEnabled(False)
+        self.pattern_line_edit.setObjectName("pattern_line_edit")
+        self.formLayout_4.setWidget(5, QtWidgets.QFormLayout.FieldRole, self.pattern_line_edit)
+        self.protocol_label = QtWidgets.QLabel(self.groupBox_2)
+        self.protocol_label.setObjectName("protocol_label")
+        self.formLayout_4.setWidget(6, QtWidgets.QFormLayout.LabelRole, self.protocol_label)
+        self.protocol_combo_box = QtWidgets.QComboBox(self.groupBox_2)
+        self.protocol_combo_box.setObjectName("protocol_combo_box")
+        self.protocol_combo_box.addItem("")
+        self.protocol_combo_box.addItem("")
+        self.protocol_combo_box.addItem("")
+        self.formLayout_4.setWidget(6, QtWidgets.QFormLayout.FieldRole, self.protocol_combo_box)
+        self.struct_layout_label = QtWidgets.QLabel(self.groupBox_2)
+        self.struct_layout_label.setObjectName("struct_layout_label")
+        self.formLayout_4.setWidget(7, QtWidgets.QFormLayout.LabelRole, self.struct_layout_label)
+        self.struct_layout_line_edit = QtWidgets.QLineEdit(self.groupBox_2)
+        self.struct_layout_line_edit.setEnabled(False)
+        self.struct_layout_line_edit.setObjectName("struct_layout_line_edit")
+        self.formLayout_4.setWidget(7, QtWidgets.QFormLayout.FieldRole, self.struct_layout_line_edit)
+        self.checksum_label = QtWidgets.QLabel(self.groupBox_2)
+        self.checksum_label.setObjectName("checksum_label")
+        self.formLayout_4.setWidget(8, QtWidgets.QFormLayout.LabelRole, self.checksum_label)
+        self.checksum_combo_box = QtWidgets.QComboBox(self.groupBox_2)
+        self.checksum_combo_box.setEnabled(False)
+        self.checksum_combo_box.setObjectName("checksum_combo_box")
+        self.checksum_combo_box.addItem("")
+        self.checksum_combo_box.addItem("")
+        self.checksum_combo_box.addItem("")
+        self.formLayout_4.setWidget(8, QtWidgets.QFormLayout.FieldRole, self.checksum_combo_box)
+        self.derived_label = QtWidgets.QLabel(self.groupBox_2)
+        self.derived_label.setObjectName("derived_label")
+        self.formLayout_4.setWidget(9, QtWidgets.QFormLayout.LabelRole, self.derived_label)
+        self.derived_line_edit = QtWidgets.QLineEdit(self.groupBox_2)
+        self.derived_line_edit.setObjectName("derived_line_edit")
+        self.formLayout_4.setWidget(9, QtWidgets.QFormLayout.FieldRole, self.derived_line_edit)
         self.verticalLayout_4.addWidget(self.groupBox_2)
         self.horizontalLayout_2 = QtWidgets.QHBoxLayout()
         self.horizontalLayout_2.setContentsMargins(-1, 0, 0, -1)
         self.horizontalLayout_2.setSpacing(0)
         self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.graph_config_layout = QtWidgets.QVBoxLayout()
+        self.graph_config_layout.setObjectName("graph_config_layout")
         self.groupBox_3 = QtWidgets.QGroupBox(self.graph_tab)
         self.groupBox_3.setObjectName("groupBox_3")
         self.formLayout_2 = QtWidgets.QFormLayout(self.groupBox_3)
@@ -238,25 +311,192 @@ class Ui_MainWindow(object):
         self.plot_type_combo_box.setObjectName("plot_type_combo_box")
         self.plot_type_combo_box.addItem("")
         self.plot_type_combo_box.addItem("")
+        self.plot_type_combo_box.addItem("")
         self.formLayout_2.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.plot_type_combo_box)
         self.label_4 = QtWidgets.QLabel(self.groupBox_3)
         self.label_4.setObjectName("label_4")
         self.formLayout_2.setWidget(3, QtWidgets.QFormLayout.LabelRole, self.label_4)
         self.sample_spin_box = QtWidgets.QSpinBox(self.groupBox_3)
         self.sample_spin_box.setEnabled(False)
-        self.sample_spin_box.setMaximum(1000)
+        self.sample_spin_box.setKeyboardTracking(False)
+        self.sample_spin_box.setMaximum(1000000)
         self.sample_spin_box.setProperty("value", 100)
         self.sample_spin_box.setObjectName("sample_spin_box")
         self.formLayout_2.setWidget(3, QtWidgets.QFormLayout.FieldRole, self.sample_spin_box)
-        self.horizontalLayout_2.addWidget(self.groupBox_3)
-        self.graph_mpl_widget = MplWidget(self.graph_tab)
+        self.x_axis_label = QtWidgets.QLabel(self.groupBox_3)
+        self.x_axis_label.setObjectName("x_axis_label")
+        self.formLayout_2.setWidget(8, QtWidgets.QFormLayout.LabelRole, self.x_axis_label)
+        self.x_axis_combo_box = QtWidgets.QComboBox(self.groupBox_3)
+        self.x_axis_combo_box.setEnabled(False)
+        self.x_axis_combo_box.setObjectName("x_axis_combo_box")
+        self.x_axis_combo_box.addItem("")
+        self.x_axis_combo_box.addItem("")
+        self.formLayout_2.setWidget(8, QtWidgets.QFormLayout.FieldRole, self.x_axis_combo_box)
+        self.fft_size_label = QtWidgets.QLabel(self.groupBox_3)
+        self.fft_size_label.setObjectName("fft_size_label")
+        self.formLayout_2.setWidget(9, QtWidgets.QFormLayout.LabelRole, self.fft_size_label)
+        self.fft_size_combo_box = QtWidgets.QComboBox(self.groupBox_3)
+        self.fft_size_combo_box.setEnabled(False)
+        self.fft_size_combo_box.setObjectName("fft_size_combo_box")
+        self.fft_size_combo_box.addItem("")
+        self.fft_size_combo_box.addItem("")
+        self.fft_size_combo_box.addItem("")
+        self.fft_size_combo_box.addItem("")
+        self.fft_size_combo_box.addItem("")
+        self.fft_size_combo_box.addItem("")
+        self.fft_size_combo_box.addItem("")
+        self.formLayout_2.setWidget(9, QtWidgets.QFormLayout.FieldRole, self.fft_size_combo_box)
+        self.fft_overlap_label = QtWidgets.QLabel(self.groupBox_3)
+        self.fft_overlap_label.setObjectName("fft_overlap_label")
+        self.formLayout_2.setWidget(10, QtWidgets.QFormLayout.LabelRole, self.fft_overlap_label)
+        self.fft_overlap_combo_box = QtWidgets.QComboBox(self.groupBox_3)
+        self.fft_overlap_combo_box.setEnabled(False)
+        self.fft_overlap_combo_box.setObjectName("fft_overlap_combo_box")
+        self.fft_overlap_combo_box.addItem("")
+        self.fft_overlap_combo_box.addItem("")
+        self.fft_overlap_combo_box.addItem("")
+        self.fft_overlap_combo_box.addItem("")
+        self.formLayout_2.setWidget(10, QtWidgets.QFormLayout.FieldRole, self.fft_overlap_combo_box)
+        self.fft_window_label = QtWidgets.QLabel(self.groupBox_3)
+        self.fft_window_label.setObjectName("fft_window_label")
+        self.formLayout_2.setWidget(11, QtWidgets.QFormLayout.LabelRole, self.fft_window_label)
+        self.fft_window_combo_box = QtWidgets.QComboBox(self.groupBox_3)
+        self.fft_window_combo_box.setEnabled(False)
+        self.fft_window_combo_box.setObjectName("fft_window_combo_box")
+        self.fft_window_combo_box.addItem("")
+        self.fft_window_combo_box.addItem("")
+        self.fft_window_combo_box.addItem("")
+        self.fft_window_combo_box.addItem("")
+        self.formLayout_2.setWidget(11, QtWidgets.QFormLayout.FieldRole, self.fft_window_combo_box)
+        self.fft_averages_label = QtWidgets.QLabel(self.groupBox_3)
+        self.fft_averages_label.setObjectName("fft_averages_label")
+        self.formLayout_2.setWidget(12, QtWidgets.QFormLayout.LabelRole, self.fft_averages_label)
+        self.fft_averages_spin_box = QtWidgets.QSpinBox(self.groupBox_3)
+        self.fft_averages_spin_box.setEnabled(False)
+        self.fft_averages_spin_box.setMinimum(1)
+        self.fft_averages_spin_box.setMaximum(1000)
+        self.fft_averages_spin_box.setProperty("value", 1)
+        self.fft_averages_spin_box.setObjectName("fft_averages_spin_box")
+        self.formLayout_2.setWidget(12, QtWidgets.QFormLayout.FieldRole, self.fft_averages_spin_box)
+        self.peak_hold_label = QtWidgets.QLabel(self.groupBox_3)
+        self.peak_hold_label.setObjectName("peak_hold_label")
+        self.formLayout_2.setWidget(13, QtWidgets.QFormLayout.LabelRole, self.peak_hold_label)
+        self.peak_hold_combo_box = QtWidgets.QComboBox(self.groupBox_3)
+        self.peak_hold_combo_box.setEnabled(False)
+        self.peak_hold_combo_box.setObjectName("peak_hold_combo_box")
+        self.peak_hold_combo_box.addItem("")
+        self.peak_hold_combo_box.addItem("")
+        self.formLayout_2.setWidget(13, QtWidgets.QFormLayout.FieldRole, self.peak_hold_combo_box)
+        self.renderer_label = QtWidgets.QLabel(self.groupBox_3)
+        self.renderer_label.setObjectName("renderer_label")
+        self.formLayout_2.setWidget(14, QtWidgets.QFormLayout.LabelRole, self.renderer_label)
+        self.renderer_combo_box = QtWidgets.QComboBox(self.groupBox_3)
+        self.renderer_combo_box.setObjectName("renderer_combo_box")
+        self.renderer_combo_box.addItem("")
+        self.renderer_combo_box.addItem("")
+        self.formLayout_2.setWidget(14, QtWidgets.QFormLayout.FieldRole, self.renderer_combo_box)
+        self.snapshot_button = QtWidgets.QPushButton(self.groupBox_3)
+        self.snapshot_button.setObjectName("snapshot_button")
+        self.formLayout_2.setWidget(15, QtWidgets.QFormLayout.FieldRole, self.snapshot_button)
+        self.graph_config_layout.addWidget(self.groupBox_3)
+        self.trigger_group_box = QtWidgets.QGroupBox(self.graph_tab)
+        self.trigger_group_box.setObjectName("trigger_group_box")
+        self.trigger_form_layout = QtWidgets.QFormLayout(self.trigger_group_box)
+        self.trigger_form_layout.setObjectName("trigger_form_layout")
+        self.trigger_mode_label = QtWidgets.QLabel(self.trigger_group_box)
+        self.trigger_mode_label.setObjectName("trigger_mode_label")
+        self.trigger_form_layout.setWidget(0, QtWidgets.QFormLayout.LabelRole, self.trigger_mode_label)
+        self.trigger_mode_combo_box = QtWidgets.QComboBox(self.trigger_group_box)
+        self.trigger_mode_combo_box.setEnabled(False)
+        self.trigger_mode_combo_box.setObjectName("trigger_mode_combo_box")
+        self.trigger_mode_combo_box.addItem("")
+        self.trigger_mode_combo_box.addItem("")
+        self.trigger_mode_combo_box.addItem("")
+        self.trigger_mode_combo_box.addItem("")
+        self.trigger_form_layout.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.trigger_mode_combo_box)
+        self.trigger_type_label = QtWidgets.QLabel(self.trigger_group_box)
+        self.trigger_type_label.setObjectName("trigger_type_label")
+        self.trigger_form_layout.setWidget(1, QtWidgets.QFormLayout.LabelRole, self.trigger_type_label)
+        self.trigger_type_combo_box = QtWidgets.QComboBox(self.trigger_group_box)
+        self.trigger_type_combo_box.setEnabled(False)
+        self.trigger_type_combo_box.setObjectName("trigger_type_combo_box")
+        self.trigger_type_combo_box.addItem("")
+        self.trigger_type_combo_box.addItem("")
+        self.trigger_type_combo_box.addItem("")
+        self.trigger_type_combo_box.addItem("")
+        self.trigger_form_layout.setWidget(1, QtWidgets.QFormLayout.FieldRole, self.trigger_type_combo_box)
+        self.trigger_channel_label = QtWidgets.QLabel(self.trigger_group_box)
+        self.trigger_channel_label.setObjectName("trigger_channel_label")
+        self.trigger_form_layout.setWidget(2, QtWidgets.QFormLayout.LabelRole, self.trigger_channel_label)
+        self.trigger_channel_spin_box = QtWidgets.QSpinBox(self.trigger_group_box)
+        self.trigger_channel_spin_box.setEnabled(False)
+        self.trigger_channel_spin_box.setMinimum(0)
+        self.trigger_channel_spin_box.setMaximum(255)
+        self.trigger_channel_spin_box.setProperty("value", 0)
+        self.trigger_channel_spin_box.setObjectName("trigger_channel_spin_box")
+        self.trigger_form_layout.setWidget(2, QtWidgets.QFormLayout.FieldRole, self.trigger_channel_spin_box)
+        self.trigger_level_label = QtWidgets.QLabel(self.trigger_group_box)
+        self.trigger_level_label.setObjectName("trigger_level_label")
+        self.trigger_form_layout.setWidget(3, QtWidgets.QFormLayout.LabelRole, self.trigger_level_label)
+        self.trigger_level_double_spin_box = QtWidgets.QDoubleSpinBox(self.trigger_group_box)
+        self.trigger_level_double_spin_box.setEnabled(False)
+        self.trigger_level_double_spin_box.setDecimals(3)
+        self.trigger_level_double_spin_box.setMinimum(-1000000.0)
+        self.trigger_level_double_spin_box.setMaximum(1000000.0)
+        self.trigger_level_double_spin_box.setProperty("value", 0.0)
+        self.trigger_level_double_spin_box.setObjectName("trigger_level_double_spin_box")
+        self.trigger_form_layout.setWidget(3, QtWidgets.QFormLayout.FieldRole, self.trigger_level_double_spin_box)
+        self.trigger_high_label = QtWidgets.QLabel(self.trigger_group_box)
+        self.trigger_high_label.setObjectName("trigger_high_label")
+        self.trigger_form_layout.setWidget(4, QtWidgets.QFormLayout.LabelRole, self.trigger_high_label)
+        self.trigger_high_double_spin_box = QtWidgets.QDoubleSpinBox(self.trigger_group_box)
+        self.trigger_high_double_spin_box.setEnabled(False)
+        self.trigger_high_double_spin_box.setDecimals(3)
+        self.trigger_high_double_spin_box.setMinimum(-1000000.0)
+        self.trigger_high_double_spin_box.setMaximum(1000000.0)
+        self.trigger_high_double_spin_box.setProperty("value", 1.0)
+        self.trigger_high_double_spin_box.setObjectName("trigger_high_double_spin_box")
+        self.trigger_form_layout.setWidget(4, QtWidgets.QFormLayout.FieldRole, self.trigger_high_double_spin_box)
+        self.trigger_pre_label = QtWidgets.QLabel(self.trigger_group_box)
+        self.trigger_pre_label.setObjectName("trigger_pre_label")
+        self.trigger_form_layout.setWidget(5, QtWidgets.QFormLayout.LabelRole, self.trigger_pre_label)
+        self.trigger_pre_spin_box = QtWidgets.QSpinBox(self.trigger_group_box)
+        self.trigger_pre_spin_box.setEnabled(False)
+        self.trigger_pre_spin_box.setMinimum(0)
+        self.trigger_pre_spin_box.setMaximum(100000)
+        self.trigger_pre_spin_box.setProperty("value", 100)
+        self.trigger_pre_spin_box.setObjectName("trigger_pre_spin_box")
+        self.trigger_form_layout.setWidget(5, QtWidgets.QFormLayout.FieldRole, self.trigger_pre_spin_box)
+        self.trigger_post_label = QtWidgets.QLabel(self.trigger_group_box)
+        self.trigger_post_label.setObjectName("trigger_post_label")
+        self.trigger_form_layout.setWidget(6, QtWidgets.QFormLayout.LabelRole, self.trigger_post_label)
+        self.trigger_post_spin_box = QtWidgets.QSpinBox(self.trigger_group_box)
+        self.trigger_post_spin_box.setEnabled(False)
+        self.trigger_post_spin_box.setMinimum(1)
+        self.trigger_post_spin_box.setMaximum(100000)
+        self.trigger_post_spin_box.setProperty("value", 400)
+        self.trigger_post_spin_box.setObjectName("trigger_post_spin_box")
+        self.trigger_form_layout.setWidget(6, QtWidgets.QFormLayout.FieldRole, self.trigger_post_spin_box)
+        self.trigger_arm_button = QtWidgets.QPushButton(self.trigger_group_box)
+        self.trigger_arm_button.setEnabled(False)
+        self.trigger_arm_button.setObjectName("trigger_arm_button")
+        self.trigger_form_layout.setWidget(7, QtWidgets.QFormLayout.FieldRole, self.trigger_arm_button)
+        self.graph_config_layout.addWidget(self.trigger_group_box)
+        self.horizontalLayout_2.addLayout(self.graph_config_layout)
+        self.graph_stacked_widget = QtWidgets.QStackedWidget(self.graph_tab)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
-        sizePolicy.setHeightForWidth(self.graph_mpl_widget.sizePolicy().hasHeightForWidth())
-        self.graph_mpl_widget.setSizePolicy(sizePolicy)
+        sizePolicy.setHeightForWidth(self.graph_stacked_widget.sizePolicy().hasHeightForWidth())
+        self.graph_stacked_widget.setSizePolicy(sizePolicy)
+        self.graph_stacked_widget.setObjectName("graph_stacked_widget")
+        self.graph_plot_widget = PlotWidget()
+        self.graph_plot_widget.setObjectName("graph_plot_widget")
+        self.graph_stacked_widget.addWidget(self.graph_plot_widget)
+        self.graph_mpl_widget = MplWidget()
         self.graph_mpl_widget.setObjectName("graph_mpl_widget")
-        self.horizontalLayout_2.addWidget(self.graph_mpl_widget)
+        self.graph_stacked_widget.addWidget(self.graph_mpl_widget)
+        self.horizontalLayout_2.addWidget(self.graph_stacked_widget)
         self.horizontalLayout_2.setStretch(1, 4)
         self.verticalLayout_4.addLayout(self.horizontalLayout_2)
         self.verticalLayout_4.setStretch(1, 9)
@@ -269,12 +509,23 @@ class Ui_MainWindow(object):
         self.save_button = QtWidgets.QPushButton(self.console_tab)
         self.save_button.setObjectName("save_button")
         self.verticalLayout_2.addWidget(self.save_button)
+        self.record_button = QtWidgets.QPushButton(self.console_tab)
+        self.record_button.setCheckable(True)
+        self.record_button.setObjectName("record_button")
+        self.verticalLayout_2.addWidget(self.record_button)
         self.clear_button = QtWidgets.QPushButton(self.console_tab)
         self.clear_button.setObjectName("clear_button")
         self.verticalLayout_2.addWidget(self.clear_button)
         self.end_button = QtWidgets.QPushButton(self.console_tab)
         self.end_button.setObjectName("end_button")
         self.verticalLayout_2.addWidget(self.end_button)
+        self.timing_button = QtWidgets.QPushButton(self.console_tab)
+        self.timing_button.setObjectName("timing_button")
+        self.verticalLayout_2.addWidget(self.timing_button)
+        self.metrics_button = QtWidgets.QPushButton(self.console_tab)
+        self.metrics_button.setCheckable(True)
+        self.metrics_button.setObjectName("metrics_button")
+        self.verticalLayout_2.addWidget(self.metrics_button)
         self.console_text_browser = QtWidgets.QTextBrowser(self.console_tab)
         font = QtGui.QFont()
         font.setFamily("Bahnschrift")
@@ -286,6 +537,20 @@ class Ui_MainWindow(object):
         self.console_text_browser.setObjectName("console_text_browser")
         self.verticalLayout_2.addWidget(self.console_text_browser)
         self.tabWidget.addTab(self.console_tab, "")
+        self.statistics_tab = QtWidgets.QWidget()
+        self.statistics_tab.setObjectName("statistics_tab")
+        self.statistics_layout = QtWidgets.QVBoxLayout(self.statistics_tab)
+        self.statistics_layout.setObjectName("statistics_layout")
+        self.statistics_reset_button = QtWidgets.QPushButton(self.statistics_tab)
+        self.statistics_reset_button.setObjectName("statistics_reset_button")
+        self.statistics_layout.addWidget(self.statistics_reset_button)
+        self.statistics_table_widget = QtWidgets.QTableWidget(self.statistics_tab)
+        self.statistics_table_widget.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.statistics_table_widget.setObjectName("statistics_table_widget")
+        self.statistics_table_widget.setColumnCount(0)
+        self.statistics_table_widget.setRowCount(0)
+        self.statistics_layout.addWidget(self.statistics_table_widget)
+        self.tabWidget.addTab(self.statistics_tab, "")
         self.verticalLayout.addWidget(self.tabWidget)
         MainWindow.setCentralWidget(self.centralwidget)
         self.statusbar = QtWidgets.QStatusBar(MainWindow)
@@ -300,6 +565,9 @@ class Ui_MainWindow(object):
         self.baud_rate_combo_box.setCurrentIndex(11)
         self.tabWidget.setCurrentIndex(0)
         self.grid_combo_box.setCurrentIndex(1)
+        self.fft_size_combo_box.setCurrentIndex(2)
+        self.fft_overlap_combo_box.setCurrentIndex(2)
+        self.graph_stacked_widget.setCurrentIndex(0)
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
 
     def retranslateUi(self, MainWindow):
@@ -325,13 +593,45 @@ class Ui_MainWindow(object):
         self.baud_rate_combo_box.setItemText(14, _translate("MainWindow", "921600"))
         self.baud_rate_label.setText(_translate("MainWindow", "Baud Rate: "))
         self.connect_button.setText(_translate("MainWindow", "Connect !"))
+        self.add_port_button.setText(_translate("MainWindow", "Add Port"))
+        self.replay_button.setText(_translate("MainWindow", "Replay Log..."))
+        self.replay_speed_combo_box.setToolTip(_translate("MainWindow", "Replay speed"))
+        self.replay_speed_combo_box.setItemText(0, _translate("MainWindow", "1x"))
+        self.replay_speed_combo_box.setItemText(1, _translate("MainWindow", "2x"))
+        self.replay_speed_combo_box.setItemText(2, _translate("MainWindow", "5x"))
+        self.replay_speed_combo_box.setItemText(3, _translate("MainWindow", "10x"))
+        self.replay_speed_combo_box.setItemText(4, _translate("MainWindow", "100x"))
+        self.replay_speed_combo_box.setItemText(5, _translate("MainWindow", "As fast as possible"))
         self.groupBox_2.setTitle(_translate("MainWindow", "Filter Config"))
+        self.source_label.setText(_translate("MainWindow", "Source: "))
+        self.source_combo_box.setToolTip(_translate("MainWindow", "The port the filter config applies to"))
         self.start_string_line_edit.setText(_translate("MainWindow", "$$$"))
         self.start_string_label.setText(_translate("MainWindow", "Start String: "))
         self.end_string_label.setText(_translate("MainWindow", "End String: "))
         self.delimiter_label.setText(_translate("MainWindow", "Delimiter: "))
         self.end_string_line_edit.setText(_translate("MainWindow", "###"))
         self.delimiter_line_edit.setText(_translate("MainWindow", ","))
+        self.grammar_label.setText(_translate("MainWindow", "Grammar: "))
+        self.grammar_combo_box.setItemText(0, _translate("MainWindow", "Delimited"))
+        self.grammar_combo_box.setItemText(1, _translate("MainWindow", "CSV Header"))
+        self.grammar_combo_box.setItemText(2, _translate("MainWindow", "Key=Value"))
+        self.grammar_combo_box.setItemText(3, _translate("MainWindow", "Regex"))
+        self.pattern_label.setText(_translate("MainWindow", "Pattern: "))
+        self.pattern_line_edit.setToolTip(_translate("MainWindow", "Regular expression with one group per channel, (?P<name>...) names a channel"))
+        self.pattern_line_edit.setPlaceholderText(_translate("MainWindow", "ADC: (?P<adc>\\S+) T=(?P<temp>\\S+)"))
+        self.protocol_label.setText(_translate("MainWindow", "Protocol: "))
+        self.protocol_combo_box.setItemText(0, _translate("MainWindow", "Text"))
+        self.protocol_combo_box.setItemText(1, _translate("MainWindow", "Binary (COBS)"))
+        self.protocol_combo_box.setItemText(2, _translate("MainWindow", "Binary (SLIP)"))
+        self.struct_layout_label.setText(_translate("MainWindow", "Struct Layout: "))
+        self.struct_layout_line_edit.setText(_translate("MainWindow", "<ffff"))
+        self.checksum_label.setText(_translate("MainWindow", "Checksum: "))
+        self.checksum_combo_box.setItemText(0, _translate("MainWindow", "None"))
+        self.checksum_combo_box.setItemText(1, _translate("MainWindow", "CRC16"))
+        self.checksum_combo_box.setItemText(2, _translate("MainWindow", "CRC32"))
+        self.derived_label.setText(_translate("MainWindow", "Derived: "))
+        self.derived_line_edit.setToolTip(_translate("MainWindow", "name = expression over ch0, ch1, ..., separated by \';\'"))
+        self.derived_line_edit.setPlaceholderText(_translate("MainWindow", "diff = ch0 - ch1; mag = sqrt(ch2**2 + ch3**2)"))
         self.groupBox_3.setTitle(_translate("MainWindow", "Graph Config"))
         self.label_2.setText(_translate("MainWindow", "Auto Scale: "))
         self.auto_combo_box.setItemText(0, _translate("MainWindow", "Enable"))
@@ -346,13 +646,66 @@ class Ui_MainWindow(object):
         self.label_3.setText(_translate("MainWindow", "Plot Type: "))
         self.plot_type_combo_box.setItemText(0, _translate("MainWindow", "Stem"))
         self.plot_type_combo_box.setItemText(1, _translate("MainWindow", "Plot"))
+        self.plot_type_combo_box.setItemText(2, _translate("MainWindow", "Spectrum"))
         self.label_4.setText(_translate("MainWindow", "Samples (n):"))
+        self.x_axis_label.setText(_translate("MainWindow", "X Axis: "))
+        self.x_axis_combo_box.setItemText(0, _translate("MainWindow", "Index"))
+        self.x_axis_combo_box.setItemText(1, _translate("MainWindow", "Time"))
+        self.fft_size_label.setText(_translate("MainWindow", "FFT Size: "))
+        self.fft_size_combo_box.setItemText(0, _translate("MainWindow", "256"))
+        self.fft_size_combo_box.setItemText(1, _translate("MainWindow", "512"))
+        self.fft_size_combo_box.setItemText(2, _translate("MainWindow", "1024"))
+        self.fft_size_combo_box.setItemText(3, _translate("MainWindow", "2048"))
+        self.fft_size_combo_box.setItemText(4, _translate("MainWindow", "4096"))
+        self.fft_size_combo_box.setItemText(5, _translate("MainWindow", "8192"))
+        self.fft_size_combo_box.setItemText(6, _translate("MainWindow", "16384"))
+        self.fft_overlap_label.setText(_translate("MainWindow", "Overlap: "))
+        self.fft_overlap_combo_box.setItemText(0, _translate("MainWindow", "0%"))
+        self.fft_overlap_combo_box.setItemText(1, _translate("MainWindow", "25%"))
+        self.fft_overlap_combo_box.setItemText(2, _translate("MainWindow", "50%"))
+        self.fft_overlap_combo_box.setItemText(3, _translate("MainWindow", "75%"))
+        self.fft_window_label.setText(_translate("MainWindow", "Window: "))
+        self.fft_window_combo_box.setItemText(0, _translate("MainWindow", "Hann"))
+        self.fft_window_combo_box.setItemText(1, _translate("MainWindow", "Hamming"))
+        self.fft_window_combo_box.setItemText(2, _translate("MainWindow", "Blackman"))
+        self.fft_window_combo_box.setItemText(3, _translate("MainWindow", "Rectangular"))
+        self.fft_averages_label.setText(_translate("MainWindow", "Averages: "))
+        self.peak_hold_label.setText(_translate("MainWindow", "Peak Hold: "))
+        self.peak_hold_combo_box.setItemText(0, _translate("MainWindow", "Disable"))
+        self.peak_hold_combo_box.setItemText(1, _translate("MainWindow", "Enable"))
+        self.renderer_label.setText(_translate("MainWindow", "Renderer: "))
+        self.renderer_combo_box.setItemText(0, _translate("MainWindow", "Qt"))
+        self.renderer_combo_box.setItemText(1, _translate("MainWindow", "Matplotlib"))
+        self.snapshot_button.setText(_translate("MainWindow", "Snapshot"))
+        self.trigger_group_box.setTitle(_translate("MainWindow", "Trigger Config"))
+        self.trigger_mode_label.setText(_translate("MainWindow", "Mode: "))
+        self.trigger_mode_combo_box.setItemText(0, _translate("MainWindow", "Off"))
+        self.trigger_mode_combo_box.setItemText(1, _translate("MainWindow", "Auto"))
+        self.trigger_mode_combo_box.setItemText(2, _translate("MainWindow", "Normal"))
+        self.trigger_mode_combo_box.setItemText(3, _translate("MainWindow", "Single"))
+        self.trigger_type_label.setText(_translate("MainWindow", "Type: "))
+        self.trigger_type_combo_box.setItemText(0, _translate("MainWindow", "Rising"))
+        self.trigger_type_combo_box.setItemText(1, _translate("MainWindow", "Falling"))
+        self.trigger_type_combo_box.setItemText(2, _translate("MainWindow", "Level"))
+        self.trigger_type_combo_box.setItemText(3, _translate("MainWindow", "Window"))
+        self.trigger_channel_label.setText(_translate("MainWindow", "Channel: "))
+        self.trigger_level_label.setText(_translate("MainWindow", "Level: "))
+        self.trigger_high_label.setText(_translate("MainWindow", "High: "))
+        self.trigger_pre_label.setText(_translate("MainWindow", "Pre-trigger: "))
+        self.trigger_post_label.setText(_translate("MainWindow", "Post-trigger: "))
+        self.trigger_arm_button.setText(_translate("MainWindow", "Arm"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.graph_tab), _translate("MainWindow", "Graph"))
         self.save_button.setText(_translate("MainWindow", "Save"))
+        self.record_button.setText(_translate("MainWindow", "Record"))
         self.clear_button.setText(_translate("MainWindow", "Clear"))
         self.end_button.setText(_translate("MainWindow", "End"))
+        self.timing_button.setText(_translate("MainWindow", "Export Timing"))
+        self.metrics_button.setText(_translate("MainWindow", "Log Metrics"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.console_tab), _translate("MainWindow", "Console"))
+        self.statistics_reset_button.setText(_translate("MainWindow", "Reset"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.statistics_tab), _translate("MainWindow", "Statistics"))
 from UI.mplwidget import MplWidget
+from UI.plotwidget import PlotWidget
 
 
 if __name__ == "__main__":
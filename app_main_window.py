@@ -1,22 +1,91 @@
 from UI.ui_main_window import Ui_MainWindow
 from modules.application import Application
 from PyQt5 import QtWidgets, QtCore, QtGui
-from PyQt5.QtWidgets import QMessageBox
+from PyQt5.QtWidgets import QMessageBox, QFileDialog
 from PyQt5.QtCore import QObject, QTimer, QEvent
 from datetime import datetime
-from modules.displayer import TextBrowserDisplayer, MplDisplayer, MplConfig, PlotType
-from modules.save import save_log
+from modules.displayer import TextBrowserDisplayer, MplDisplayer, QtPlotDisplayer, MplConfig, PlotType, XAxis
+from modules.receiver import SerialReceiver, FileReplayReceiver
+from modules.binary_parser import Framing, Checksum
+from modules.source import Source
+from modules.spectrum import Window
+from modules.trigger import TriggerMode, TriggerType
+from modules.grammar import GrammarType
 
 import serial.tools.list_ports as list_ports
 import os
+import threading
 
 plot_type_dict = {
     'Stem': PlotType.STEM,
     'Plot': PlotType.PLOT,
+    'Spectrum': PlotType.SPECTRUM,
+}
+fft_window_dict = {
+    'Hann': Window.HANN,
+    'Hamming': Window.HAMMING,
+    'Blackman': Window.BLACKMAN,
+    'Rectangular': Window.RECTANGULAR,
+}
+trigger_mode_dict = {
+    'Off': None,
+    'Auto': TriggerMode.AUTO,
+    'Normal': TriggerMode.NORMAL,
+    'Single': TriggerMode.SINGLE,
+}
+trigger_type_dict = {
+    'Rising': TriggerType.RISING,
+    'Falling': TriggerType.FALLING,
+    'Level': TriggerType.LEVEL,
+    'Window': TriggerType.WINDOW,
+}
+x_axis_dict = {
+    'Index': XAxis.INDEX,
+    'Time': XAxis.TIME,
+}
+grammar_dict = {
+    'Delimited': GrammarType.DELIMITED,
+    'CSV Header': GrammarType.CSV_HEADER,
+    'Key=Value': GrammarType.KEY_VALUE,
+    'Regex': GrammarType.REGEX,
+}
+protocol_dict = {
+    'Text': None,
+    'Binary (COBS)': Framing.COBS,
+    'Binary (SLIP)': Framing.SLIP,
+}
+checksum_dict = {
+    'None': Checksum.NONE,
+    'CRC16': Checksum.CRC16,
+    'CRC32': Checksum.CRC32,
+}
+replay_speed_dict = {
+    '1x': 1.0,
+    '2x': 2.0,
+    '5x': 5.0,
+    '10x': 10.0,
+    '100x': 100.0,
+    'As fast as possible': 0.0,
+}
+statistics_columns = {
+    'Source': 'source',
+    'Channel': 'name',
+    'Mean': 'mean',
+    'RMS': 'rms',
+    'Std': 'std',
+    'Min': 'min',
+    'Max': 'max',
+    'Peak-Peak': 'peak_to_peak',
+    'Rate (Hz)': 'rate',
+    'Mean (1 s)': 'window_mean',
+    'RMS (1 s)': 'window_rms',
+    'Peak-Peak (1 s)': 'window_peak_to_peak',
 }
 class App_MainWindow(QtWidgets.QMainWindow):
     """Application GUI"""
 
+    ports_found = QtCore.pyqtSignal(list)
+
     def __init__(self, parent: QtWidgets.QMainWindow = None):
         super().__init__(parent)
         self.ui = Ui_MainWindow()
@@ -25,26 +94,56 @@ class App_MainWindow(QtWidgets.QMainWindow):
         """ Set up class instances """
         self.timer = QTimer()
         self.timeout_ms = 20
+        self.render_timer = QTimer()
+        self.metrics_timer = QTimer()
+        self.statistics_timer = QTimer()
+        self.metrics_label = QtWidgets.QLabel()
         self.log_dir = 'logs'
         self.filename = 'saved_log'
+        self.ports = {}
+
+        self.plot_displayers = {
+            'Qt': QtPlotDisplayer(self.ui.graph_plot_widget),
+            'Matplotlib': MplDisplayer(self.ui.graph_mpl_widget),
+        }
 
         self.app = Application(
             TextBrowserDisplayer(self.ui.console_text_browser),
-            MplDisplayer(self.ui.graph_mpl_widget),
+            self.plot_displayers[self.ui.renderer_combo_box.currentText()],
         )
-        self.app.parser.set_config(
+        self.app.set_parser_config(
             self.ui.start_string_line_edit.text(),
             self.ui.end_string_line_edit.text(),
             self.ui.delimiter_line_edit.text(),
         )
+        self.update_source_combo_box()
 
         """ Connect UI Signals and Events """
         self.timer.timeout.connect(self.app.receive_and_post_event)
-        self.ui.com_port_combo_box.addItems(
-            [str(port) for port in list_ports.comports()]
-        )
+        self.render_timer.timeout.connect(self.app.scheduler.tick)
+        self.render_timer.start(self.app.scheduler.interval_ms)
+        self.metrics_timer.timeout.connect(self.metrics_timer_action)
+        self.metrics_timer.start(1000)
+        self.ui.statusbar.addPermanentWidget(self.metrics_label)
+        self.statistics_timer.timeout.connect(self.statistics_timer_action)
+        self.statistics_timer.start(500)
+        self.ui.statistics_table_widget.setColumnCount(len(statistics_columns))
+        self.ui.statistics_table_widget.setHorizontalHeaderLabels(list(statistics_columns))
+        self.ui.statistics_reset_button.clicked.connect(self.app.statistics.reset)
+        self.ports_found.connect(self.ports_found_action)
+        self.refresh_button_action()
         self.ui.save_button.clicked.connect(self.save_button_action)
+        self.ui.record_button.toggled.connect(self.record_button_action)
+        self.ui.timing_button.clicked.connect(self.timing_button_action)
+        self.ui.metrics_button.toggled.connect(self.metrics_button_action)
         self.ui.refresh_button.clicked.connect(self.refresh_button_action)
+        self.ui.replay_button.clicked.connect(self.replay_button_action)
+        self.ui.add_port_button.clicked.connect(
+            lambda: self.add_port_button_action(
+                self.ui.com_port_combo_box.currentText(),
+                self.ui.baud_rate_combo_box.currentText(),
+            )
+        )
         self.ui.connect_button.clicked.connect(
             lambda: self.connect_button_action(
                 self.ui.com_port_combo_box.currentText(),
@@ -54,28 +153,35 @@ class App_MainWindow(QtWidgets.QMainWindow):
         self.ui.end_button.clicked.connect(
             lambda: self.app.text_displayer.auto_scroll_enabled(True)
         )
-        self.ui.clear_button.clicked.connect(lambda: self.ui.console_text_browser.clear())
+        self.ui.clear_button.clicked.connect(self.app.text_displayer.clear)
         self.ui.start_string_line_edit.textChanged.connect(
-            lambda: self.app.parser.set_config(
+            lambda: self.app.set_parser_config(
                 self.ui.start_string_line_edit.text(),
                 self.ui.end_string_line_edit.text(),
                 self.ui.delimiter_line_edit.text(),
             )
         )
         self.ui.end_string_line_edit.textChanged.connect(
-            lambda: self.app.parser.set_config(
+            lambda: self.app.set_parser_config(
                 self.ui.start_string_line_edit.text(),
                 self.ui.end_string_line_edit.text(),
                 self.ui.delimiter_line_edit.text(),
             )
         )
         self.ui.delimiter_line_edit.textChanged.connect(
-            lambda: self.app.parser.set_config(
+            lambda: self.app.set_parser_config(
                 self.ui.start_string_line_edit.text(),
                 self.ui.end_string_line_edit.text(),
                 self.ui.delimiter_line_edit.text(),
             )
         )
+        self.ui.source_combo_box.currentIndexChanged.connect(self.source_select_action)
+        self.ui.grammar_combo_box.currentTextChanged.connect(self.grammar_config_action)
+        self.ui.pattern_line_edit.editingFinished.connect(self.grammar_config_action)
+        self.ui.protocol_combo_box.currentTextChanged.connect(self.protocol_config_action)
+        self.ui.struct_layout_line_edit.textChanged.connect(self.protocol_config_action)
+        self.ui.checksum_combo_box.currentTextChanged.connect(self.protocol_config_action)
+        self.ui.derived_line_edit.editingFinished.connect(self.derived_config_action)
         self.ui.x_max_double_spin_box.textChanged.connect(self.graph_config_action)
         self.ui.x_min_double_spin_box.textChanged.connect(self.graph_config_action)
         self.ui.y_min_double_spin_box.textChanged.connect(self.graph_config_action)
@@ -83,9 +189,32 @@ class App_MainWindow(QtWidgets.QMainWindow):
         self.ui.grid_combo_box.currentTextChanged.connect(self.graph_config_action)
         self.ui.auto_combo_box.currentTextChanged.connect(self.graph_config_action)
         self.ui.plot_type_combo_box.currentIndexChanged.connect(self.graph_config_action)
-        self.ui.sample_spin_box.textChanged.connect(self.graph_config_action)
+        self.ui.x_axis_combo_box.currentIndexChanged.connect(self.graph_config_action)
+        # Without keyboard tracking, typing 500 resizes the sample buffers once instead of to 5, 50 and 500.
+        self.ui.sample_spin_box.valueChanged.connect(self.graph_config_action)
+        self.ui.fft_size_combo_box.currentIndexChanged.connect(self.graph_config_action)
+        self.ui.fft_overlap_combo_box.currentIndexChanged.connect(self.graph_config_action)
+        self.ui.fft_window_combo_box.currentIndexChanged.connect(self.graph_config_action)
+        self.ui.fft_averages_spin_box.textChanged.connect(self.graph_config_action)
+        self.ui.peak_hold_combo_box.currentIndexChanged.connect(self.graph_config_action)
+        self.ui.trigger_mode_combo_box.currentIndexChanged.connect(self.graph_config_action)
+        self.ui.trigger_type_combo_box.currentIndexChanged.connect(self.graph_config_action)
+        self.ui.trigger_channel_spin_box.textChanged.connect(self.graph_config_action)
+        self.ui.trigger_level_double_spin_box.textChanged.connect(self.graph_config_action)
+        self.ui.trigger_high_double_spin_box.textChanged.connect(self.graph_config_action)
+        self.ui.trigger_pre_spin_box.textChanged.connect(self.graph_config_action)
+        self.ui.trigger_post_spin_box.textChanged.connect(self.graph_config_action)
+        self.ui.trigger_arm_button.clicked.connect(self.trigger_arm_button_action)
+        self.ui.renderer_combo_box.currentTextChanged.connect(self.renderer_action)
+        self.ui.snapshot_button.clicked.connect(self.snapshot_button_action)
         self.ui.console_text_browser.installEventFilter(self)
 
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        self.app.stop_recording()
+        self.app.stop_metrics_log()
+        self.app.disconnect()
+        super().closeEvent(event)
+
     def eventFilter(self, source: QObject, event: QEvent) -> bool:
         if source == self.ui.console_text_browser:
             if event.type() == QEvent.Wheel:
@@ -95,12 +224,183 @@ class App_MainWindow(QtWidgets.QMainWindow):
     
     def save_button_action(self) -> None:
         filename = self.filename + datetime.now().strftime('_%Y%m%d_%H%M%S') + '.txt'
-        save_log(self.ui.console_text_browser.toPlainText(), self.log_dir, filename)
+        self.app.text_displayer.history.save(self.log_dir, filename)
         self.ui.statusbar.showMessage(f'Console log has been saved to {os.path.join(self.log_dir, filename)}')
     
+    def timing_button_action(self) -> None:
+        filename = 'timing' + datetime.now().strftime('_%Y%m%d_%H%M%S') + '.csv'
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.app.export_timing(os.path.join(self.log_dir, filename))
+        self.ui.statusbar.showMessage(f'Inter-arrival histogram has been saved to {os.path.join(self.log_dir, filename)}')
+
+    def metrics_button_action(self, checked: bool) -> None:
+        if checked:
+            filename = 'metrics' + datetime.now().strftime('_%Y%m%d_%H%M%S') + '.jsonl'
+            os.makedirs(self.log_dir, exist_ok=True)
+            self.app.start_metrics_log(os.path.join(self.log_dir, filename))
+            self.ui.metrics_button.setText('Stop Metrics Log')
+            self.ui.statusbar.showMessage(f'Logging metrics to {os.path.join(self.log_dir, filename)}')
+        else:
+            self.app.stop_metrics_log()
+            self.ui.metrics_button.setText('Log Metrics')
+            self.ui.statusbar.showMessage(f'Metrics log has been saved to {self.log_dir}')
+
+    def metrics_timer_action(self) -> None:
+        self.check_read_errors()
+        self.check_replay_finished()
+        snapshot = self.app.update_metrics()
+        dropped = snapshot['chunks_dropped'] + snapshot['malformed_frames'] + snapshot['truncated_frames'] \
+            + snapshot['events_dropped'] + snapshot['records_dropped']
+        self.metrics_label.setText(
+            f"{snapshot['bytes_per_s'] / 1e3:.1f} kB/s | {snapshot['frames_per_s']:.0f} frames/s | "
+            f"{snapshot['render_fps']:.1f} fps | queue {snapshot['queue_depth']} | dropped {dropped}"
+        )
+
+    def check_read_errors(self) -> None:
+        ''' Disconnect the ports that stopped reading and tell why. A failed first port disconnects them all. '''
+        failed = self.app.failed_sources()
+        if not failed:
+            return
+        # Parse what was read before the error.
+        self.app.receive_and_post_event()
+        messages = [f'{source.name or "Read"} failed: {source.acquisition.error}' for source in failed]
+        if self.app.source in failed:
+            self.app.disconnect()
+            self.update_connection_state(False, '')
+        else:
+            for source in failed:
+                self.app.remove_source(source.name)
+            self.update_connection_state(True, '')
+        self.ui.statusbar.showMessage(', '.join(messages))
+
+    def check_replay_finished(self) -> None:
+        ''' Disconnect once a replayed log has been read and every chunk of it parsed. '''
+        receiver = self.app.receiver
+        if not isinstance(receiver, FileReplayReceiver) or not receiver.finished or not self.timer.isActive():
+            return
+        # Join the acquisition thread first, it may still be queueing the last chunk.
+        self.app.disconnect()
+        self.app.receive_and_post_event()
+        self.update_connection_state(False, '')
+        self.ui.statusbar.showMessage('Replay finished')
+
+    def statistics_timer_action(self) -> None:
+        if self.ui.tabWidget.currentWidget() is not self.ui.statistics_tab:
+            return
+        rows = self.app.statistics.rows()
+        table = self.ui.statistics_table_widget
+        table.setRowCount(len(rows))
+        for row, statistics in enumerate(rows):
+            for column, key in enumerate(statistics_columns.values()):
+                value = statistics[key]
+                text = value if isinstance(value, str) else f'{value:.6g}'
+                item = table.item(row, column)
+                if item is None:
+                    table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+                else:
+                    item.setText(text)
+
+    def record_button_action(self, checked: bool) -> None:
+        if checked:
+            self.app.start_recording(self.log_dir)
+            self.ui.record_button.setText('Stop Recording')
+            self.ui.statusbar.showMessage(f'Recording to {self.log_dir}')
+        else:
+            self.app.stop_recording()
+            self.ui.record_button.setText('Record')
+            self.ui.statusbar.showMessage(f'Recording has been saved to {self.log_dir}')
+
+    def update_source_combo_box(self) -> None:
+        ''' List the connected sources and select the one the filter config applies to. '''
+        combo_box = self.ui.source_combo_box
+        combo_box.blockSignals(True)
+        combo_box.clear()
+        for source in self.app.sources:
+            combo_box.addItem(source.name or 'First port', source.name)
+        combo_box.setCurrentIndex(max(0, combo_box.findData(self.app.selected)))
+        combo_box.blockSignals(False)
+        combo_box.setEnabled(len(self.app.sources) > 1)
+
+    def source_select_action(self, index: int) -> None:
+        name = self.ui.source_combo_box.itemData(index)
+        if name is None:
+            return
+        self.app.select_source(name)
+        self.show_source_config(self.app.selected_source)
+
+    def show_source_config(self, source: Source) -> None:
+        ''' Fill the filter config widgets with the config of source, without applying it again. '''
+        framing = source.binary_parser.framing if source.binary_parser.enabled else None
+        widgets = (self.ui.start_string_line_edit, self.ui.end_string_line_edit, self.ui.delimiter_line_edit,
+                   self.ui.grammar_combo_box, self.ui.pattern_line_edit, self.ui.protocol_combo_box,
+                   self.ui.struct_layout_line_edit, self.ui.checksum_combo_box)
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.ui.start_string_line_edit.setText(source.parser.start_string)
+        self.ui.end_string_line_edit.setText(source.parser.end_string)
+        self.ui.delimiter_line_edit.setText(source.parser.delimiter)
+        self.ui.grammar_combo_box.setCurrentText(
+            next(text for text, grammar_type in grammar_dict.items() if grammar_type is source.parser.grammar_type))
+        self.ui.pattern_line_edit.setText(source.parser.pattern)
+        self.ui.protocol_combo_box.setCurrentText(next(text for text, value in protocol_dict.items() if value is framing))
+        self.ui.struct_layout_line_edit.setText(source.binary_parser.layout)
+        self.ui.checksum_combo_box.setCurrentText(
+            next(text for text, checksum in checksum_dict.items() if checksum is source.binary_parser.checksum))
+        for widget in widgets:
+            widget.blockSignals(False)
+        self.update_filter_widgets()
+
+    def update_filter_widgets(self) -> None:
+        ''' Enable the filter config widgets that apply to the selected protocol and grammar. '''
+        is_binary = protocol_dict[self.ui.protocol_combo_box.currentText()] is not None
+        for widget in (self.ui.start_string_line_edit, self.ui.end_string_line_edit, self.ui.delimiter_line_edit,
+                       self.ui.grammar_combo_box):
+            widget.setEnabled(not is_binary)
+        self.ui.pattern_line_edit.setEnabled(
+            not is_binary and grammar_dict[self.ui.grammar_combo_box.currentText()] is GrammarType.REGEX)
+        self.ui.struct_layout_line_edit.setEnabled(is_binary)
+        self.ui.checksum_combo_box.setEnabled(is_binary)
+
+    def grammar_config_action(self) -> None:
+        grammar_type = grammar_dict[self.ui.grammar_combo_box.currentText()]
+        self.update_filter_widgets()
+        try:
+            self.app.set_grammar(grammar_type, self.ui.pattern_line_edit.text() if grammar_type is GrammarType.REGEX else '')
+        except ValueError as error:
+            self.ui.statusbar.showMessage(str(error))
+            return
+        self.ui.statusbar.clearMessage()
+
+    def protocol_config_action(self) -> None:
+        framing = protocol_dict[self.ui.protocol_combo_box.currentText()]
+        is_binary = framing is not None
+        self.update_filter_widgets()
+
+        if is_binary:
+            try:
+                self.app.set_binary_config(
+                    self.ui.struct_layout_line_edit.text(),
+                    framing,
+                    checksum_dict[self.ui.checksum_combo_box.currentText()],
+                )
+            except ValueError as error:
+                self.ui.statusbar.showMessage(str(error))
+                return
+            self.ui.statusbar.clearMessage()
+        self.app.set_binary_enabled(is_binary)
+
+    def derived_config_action(self) -> None:
+        try:
+            self.app.set_derived_channels(self.ui.derived_line_edit.text())
+        except ValueError as error:
+            self.ui.statusbar.showMessage(str(error))
+            return
+        self.ui.statusbar.clearMessage()
+
     def graph_config_action(self) -> None:
         current_plot_type = PlotType
         current_plot_type = plot_type_dict[self.ui.plot_type_combo_box.currentText()]
+        trigger_mode = trigger_mode_dict[self.ui.trigger_mode_combo_box.currentText()]
 
         self.app.canvas_displayer.update_mpl_config(
             MplConfig(
@@ -110,8 +410,21 @@ class App_MainWindow(QtWidgets.QMainWindow):
                 y_max=float(self.ui.y_max_double_spin_box.text()),
                 is_auto_enable=True if self.ui.auto_combo_box.currentText() == 'Enable' else False,
                 is_grid_enable=True if self.ui.grid_combo_box.currentText() == 'Enable' else False,
-                sample_num=int(self.ui.sample_spin_box.text()),
-                plot_type=current_plot_type
+                sample_num=self.ui.sample_spin_box.value(),
+                plot_type=current_plot_type,
+                x_axis=x_axis_dict[self.ui.x_axis_combo_box.currentText()],
+                fft_size=int(self.ui.fft_size_combo_box.currentText()),
+                fft_overlap=int(self.ui.fft_overlap_combo_box.currentText().rstrip('%')) / 100,
+                fft_window=fft_window_dict[self.ui.fft_window_combo_box.currentText()],
+                fft_averages=int(self.ui.fft_averages_spin_box.text()),
+                is_peak_hold_enable=True if self.ui.peak_hold_combo_box.currentText() == 'Enable' else False,
+                trigger_mode=trigger_mode,
+                trigger_type=trigger_type_dict[self.ui.trigger_type_combo_box.currentText()],
+                trigger_channel=int(self.ui.trigger_channel_spin_box.text()),
+                trigger_level=self.ui.trigger_level_double_spin_box.value(),
+                trigger_high=self.ui.trigger_high_double_spin_box.value(),
+                trigger_pre=int(self.ui.trigger_pre_spin_box.text()),
+                trigger_post=int(self.ui.trigger_post_spin_box.text()),
             )
         )
 
@@ -119,17 +432,61 @@ class App_MainWindow(QtWidgets.QMainWindow):
             self.ui.x_min_double_spin_box.setEnabled(False)
             self.ui.x_max_double_spin_box.setEnabled(False)
             self.ui.sample_spin_box.setEnabled(True)
+            self.ui.x_axis_combo_box.setEnabled(True)
 
-        elif current_plot_type == PlotType.STEM:
+        elif current_plot_type == PlotType.STEM or current_plot_type == PlotType.SPECTRUM:
             self.ui.x_min_double_spin_box.setEnabled(True)
             self.ui.x_max_double_spin_box.setEnabled(True)
             self.ui.sample_spin_box.setEnabled(False)
+            self.ui.x_axis_combo_box.setEnabled(False)
+
+        is_spectrum = current_plot_type == PlotType.SPECTRUM
+        for widget in (self.ui.fft_size_combo_box, self.ui.fft_overlap_combo_box, self.ui.fft_window_combo_box,
+                       self.ui.fft_averages_spin_box, self.ui.peak_hold_combo_box):
+            widget.setEnabled(is_spectrum)
+
+        # The trigger only applies to PLOT.
+        is_trigger = current_plot_type == PlotType.PLOT and trigger_mode is not None
+        self.ui.trigger_mode_combo_box.setEnabled(current_plot_type == PlotType.PLOT)
+        for widget in (self.ui.trigger_type_combo_box, self.ui.trigger_channel_spin_box,
+                       self.ui.trigger_level_double_spin_box, self.ui.trigger_pre_spin_box, self.ui.trigger_post_spin_box):
+            widget.setEnabled(is_trigger)
+        self.ui.trigger_high_double_spin_box.setEnabled(
+            is_trigger and trigger_type_dict[self.ui.trigger_type_combo_box.currentText()] is TriggerType.WINDOW
+        )
+        self.ui.trigger_arm_button.setEnabled(is_trigger and trigger_mode is TriggerMode.SINGLE)
+
+    def trigger_arm_button_action(self) -> None:
+        if self.app.canvas_displayer.trigger is not None:
+            self.app.canvas_displayer.trigger.arm()
+
+    def renderer_action(self, renderer: str) -> None:
+        displayer = self.plot_displayers[renderer]
+        self.ui.graph_stacked_widget.setCurrentWidget(displayer.widget)
+        self.app.set_canvas_displayer(displayer)
+
+    def snapshot_button_action(self) -> None:
+        filename = 'plot' + datetime.now().strftime('_%Y%m%d_%H%M%S') + '.png'
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Snapshot", os.path.join(self.log_dir, filename), "Images (*.png *.svg *.pdf)"
+        )
+        if path == '':
+            return
+        self.app.canvas_displayer.save_snapshot(path)
+        self.ui.statusbar.showMessage(f'Plot has been saved to {path}')
 
     def refresh_button_action(self) -> None:
+        ''' Enumerate the ports on a background thread, it can take seconds on some systems. '''
+        self.ui.refresh_button.setEnabled(False)
+        threading.Thread(
+            target=lambda: self.ports_found.emit(list_ports.comports()), name='list-ports', daemon=True
+        ).start()
+
+    def ports_found_action(self, ports: list) -> None:
+        self.ports = {str(port): port.name for port in ports}
         self.ui.com_port_combo_box.clear()
-        self.ui.com_port_combo_box.addItems(
-            [str(port) for port in list_ports.comports()]
-        )
+        self.ui.com_port_combo_box.addItems(list(self.ports))
+        self.ui.refresh_button.setEnabled(True)
 
     def connect_button_action(
         self, port_info: str, baudrate: str
@@ -137,11 +494,12 @@ class App_MainWindow(QtWidgets.QMainWindow):
         connected = bool()
 
         if self.ui.connect_button.text() == "Connect !":
-            for port in list_ports.comports():
-                if str(port) == port_info:
-                    connected = self.app.connect(
-                        port.name, int(baudrate)
-                    )
+            if not isinstance(self.app.receiver, SerialReceiver):
+                self.app.set_receiver(SerialReceiver())
+            if port_info in self.ports:
+                connected = self.app.connect(
+                    self.ports[port_info], int(baudrate)
+                )
             if connected is not True:
                 msg = QMessageBox(self)
                 msg.setWindowTitle("Warning!")
@@ -152,9 +510,69 @@ class App_MainWindow(QtWidgets.QMainWindow):
         else:
             connected = self.app.disconnect()
 
+        self.update_connection_state(connected, "Connection Successful!")
+
+    def add_port_button_action(self, port_info: str, baudrate: str) -> None:
+        ''' Connect one more port next to the connected ones.
+
+        It starts with the filter config of the selected source and becomes
+        the selected source, so its config can be changed on its own.
+        '''
+        name = self.ports.get(port_info)
+        if name is not None:
+            if self.app.get_source(name) is not None:
+                self.ui.statusbar.showMessage(f"{name} is already connected")
+                return
+
+            source = Source(name)
+            source.copy_config(self.app.selected_source)
+            self.app.add_source(source)
+            if source.connect(name, int(baudrate)):
+                self.app.select_source(name)
+                self.update_source_combo_box()
+                self.ui.statusbar.showMessage(f"{len(self.app.sources)} ports connected")
+                return
+            self.app.remove_source(name)
+
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Warning!")
+        msg.setText("Connection Failed!")
+        msg.setStandardButtons(QMessageBox.Yes)
+        msg.setIcon(QMessageBox.Warning)
+        msg.exec()
+
+    def replay_button_action(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Replay Log", self.log_dir, "Logs (*.txt *.log *.spcap);;All Files (*)"
+        )
+        if path == '':
+            return
+
+        self.app.set_receiver(
+            FileReplayReceiver(
+                speed=replay_speed_dict[self.ui.replay_speed_combo_box.currentText()],
+                start_string=self.ui.start_string_line_edit.text(),
+                end_string=self.ui.end_string_line_edit.text(),
+                delimiter=self.ui.delimiter_line_edit.text(),
+            )
+        )
+        connected = self.app.connect(path, int(self.ui.baud_rate_combo_box.currentText()))
+        self.update_connection_state(connected, f"Replaying {path}")
+        if not connected:
+            self.ui.statusbar.showMessage(f'Could not replay {path}: {self.app.receiver.error}')
+
+    def update_connection_state(self, connected: bool, message: str) -> None:
+        # Disconnecting forgets the added ports, the first one is selected again.
+        selected = self.ui.source_combo_box.currentData()
+        self.update_source_combo_box()
+        if self.app.selected != selected:
+            self.show_source_config(self.app.selected_source)
+        self.ui.replay_button.setEnabled(connected is not True)
+        self.ui.replay_speed_combo_box.setEnabled(connected is not True)
+        self.ui.add_port_button.setEnabled(connected is True)
         if connected is True:
             self.ui.connect_button.setText("Disconnect !")
-            self.ui.statusbar.showMessage("Connection Successful!")
+            self.ui.statusbar.showMessage(message)
             self.timer.start(self.timeout_ms)
         else:
             self.ui.connect_button.setText("Connect !")
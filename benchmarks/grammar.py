@@ -0,0 +1,104 @@
+''' Parse throughput of every frame grammar.
+
+Run from the repository root, for example:
+
+    python -m benchmarks.grammar --channels 6 --frames 200000 --text-ratio 0.05 --output grammar.json
+
+The same samples are written as newline framed text in every grammar, with
+a share of debug lines mixed in, and fed in chunks through StreamFramer and
+StringParser.parse_batch. Frames per second, bytes per second and the
+latency per chunk of framing and parsing are printed as JSON, per grammar.
+'''
+from typing import Dict, List
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.pipeline import git_commit
+from modules.grammar import GrammarType
+from modules.string_parser import StringParser
+
+def format_frames(grammar_type: GrammarType, values: np.ndarray, delimiter: str) -> List[str]:
+    ''' Return one line per row of values in the grammar, without the newline. '''
+    names = [f'v{channel}' for channel in range(values.shape[1])]
+    rows = [[f'{value:.6g}' for value in row] for row in values.tolist()]
+    if grammar_type is GrammarType.KEY_VALUE:
+        return [delimiter.join(f'{name}={value}' for name, value in zip(names, row)) for row in rows]
+    if grammar_type is GrammarType.REGEX:
+        return [' '.join(f'{name}: {value}' for name, value in zip(names, row)) for row in rows]
+    lines = [delimiter.join(row) for row in rows]
+    if grammar_type is GrammarType.CSV_HEADER:
+        lines.insert(0, delimiter.join(names))
+    return lines
+
+def regex_pattern(channels: int) -> str:
+    return ' '.join(rf'v{channel}: (?P<v{channel}>\S+)' for channel in range(channels))
+
+def run_grammar(grammar_type: GrammarType, args: argparse.Namespace) -> Dict[str, object]:
+    rng = np.random.default_rng(0)
+    values = rng.standard_normal((args.frames, args.channels))
+    lines = format_frames(grammar_type, values, args.delimiter)
+    # Debug prints at random places, as firmware mixes them into the stream.
+    debug = rng.random(len(lines)) < args.text_ratio
+    debug[0] = False
+    data = ''.join(('debug: task switch took 12 us\n' if is_debug else '') + line + '\n'
+                   for line, is_debug in zip(lines, debug))
+    chunks = [data[start:start + args.chunk_size] for start in range(0, len(data), args.chunk_size)]
+
+    parser = StringParser()
+    parser.set_config('', '', args.delimiter)
+    parser.set_grammar(grammar_type, regex_pattern(args.channels) if grammar_type is GrammarType.REGEX else '')
+    framing, parsing = [], []
+    parsed = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        framing_start = time.perf_counter()
+        frames = parser.framer.feed(chunk)
+        parsing_start = time.perf_counter()
+        batches = parser.parse_batch(frames)
+        parsing.append(time.perf_counter() - parsing_start)
+        framing.append(parsing_start - framing_start)
+        parsed += sum(len(values) for _, values in batches)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'frames': parsed,
+        'text_frames': parser.text_count,
+        'malformed': parser.malformed_count,
+        'names': parser.grammar.names,
+        'frames_per_s': parsed / elapsed,
+        'bytes_per_s': len(data) / elapsed,
+        'framing_p50_ms': float(np.percentile(framing, 50) * 1e3),
+        'parsing_p50_ms': float(np.percentile(parsing, 50) * 1e3),
+        'parsing_p99_ms': float(np.percentile(parsing, 99) * 1e3),
+    }
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'parameters': vars(args),
+        'grammars': {grammar_type.name: run_grammar(grammar_type, args) for grammar_type in GrammarType},
+    }
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--channels', type=int, default=6)
+    parser.add_argument('--frames', type=int, default=200000)
+    parser.add_argument('--text-ratio', type=float, default=0.05, help='debug lines per data frame')
+    parser.add_argument('--chunk-size', type=int, default=4096, help='characters per read')
+    parser.add_argument('--delimiter', default=',')
+    parser.add_argument('--output', default='', help='write the JSON result to this file')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    result = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(result + '\n')
+    print(result)
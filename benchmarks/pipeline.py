@@ -0,0 +1,189 @@
+''' Headless throughput benchmark for the receiver -> parser -> displayer pipeline.
+
+Run from the repository root, for example:
+
+    python -m benchmarks.pipeline --channels 6 --rate 5000 --duration 5 --output bench.json
+
+Synthetic chunks are fed through StreamFramer, StringParser, the event bus
+and the displayers with an offscreen Qt platform, and per-stage throughput
+and latency percentiles are printed as JSON.
+'''
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+@dataclass
+class StageTimer:
+    ''' Collects the latency of every call of one pipeline stage. '''
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    items: int = 0
+
+    @contextmanager
+    def time(self, items: int = 0) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        self.latencies.append(time.perf_counter() - start)
+        self.items += items
+
+    def summary(self) -> Dict[str, float]:
+        latencies = np.array(self.latencies or [0.0])
+        total = float(latencies.sum())
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        return {
+            'calls': len(self.latencies),
+            'items': self.items,
+            'total_s': total,
+            'items_per_s': self.items / total if total > 0 else 0.0,
+            'p50_ms': float(p50) * 1e3,
+            'p90_ms': float(p90) * 1e3,
+            'p99_ms': float(p99) * 1e3,
+            'max_ms': float(latencies.max()) * 1e3,
+        }
+
+def synthetic_chunks(channels: int, rate: float, interval: float, duration: float,
+                     start_string: str, end_string: str, delimiter: str, seed: int = 0) -> Iterator[bytes]:
+    ''' Yield one chunk per read interval, each holding rate * interval frames. '''
+    rng = np.random.default_rng(seed)
+    frames_per_chunk = max(1, round(rate * interval))
+    row_format = start_string + delimiter.join(['%.6f'] * channels) + end_string + '\n'
+    for _ in range(max(1, round(duration / interval))):
+        values = rng.standard_normal((frames_per_chunk, channels))
+        yield ''.join(row_format % tuple(row) for row in values).encode('utf-8')
+
+def simulation_chunks(rate: float, interval: float, duration: float) -> Iterator[bytes]:
+    from modules.receiver import SimulationReceiver
+
+    receiver = SimulationReceiver()
+    frames_per_chunk = max(1, round(rate * interval))
+    for _ in range(max(1, round(duration / interval))):
+        yield ''.join(receiver.receive_message() for _ in range(frames_per_chunk)).encode('utf-8')
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    from PyQt5.QtWidgets import QApplication, QTextBrowser
+    from modules import event
+    from modules.event import EventType, post_event
+    from modules.displayer import MplDisplayer, QtPlotDisplayer, MplConfig, PlotType, TextBrowserDisplayer
+    from modules.receiver import new_decoder
+    from modules.string_parser import StringParser
+    from modules.derived import DerivedChannels
+    from modules.sample import SampleBatch
+    from UI.mplwidget import MplWidget
+    from UI.plotwidget import PlotWidget
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    event.subscribers.clear()
+
+    if args.renderer == 'qt':
+        widget = PlotWidget()
+        canvas_displayer = QtPlotDisplayer(widget, decimation=not args.no_decimation)
+    else:
+        widget = MplWidget()
+        canvas_displayer = MplDisplayer(widget, decimation=not args.no_decimation)
+    widget.resize(args.width, args.height)
+    widget.show()
+    canvas_displayer.update_mpl_config(MplConfig(plot_type=PlotType[args.plot_type], sample_num=args.sample_num))
+    text_browser = QTextBrowser()
+    text_displayer = TextBrowserDisplayer(text_browser)
+    canvas_displayer.setup_event_handler()
+    text_displayer.setup_event_handler()
+
+    decoder = new_decoder()
+    parser = StringParser()
+    parser.set_config(args.start_string, args.end_string, args.delimiter)
+    derived = DerivedChannels(args.derived)
+
+    stages = {name: StageTimer(name) for name in ('decode', 'framing', 'parsing', 'derived', 'event_bus', 'plot_render', 'text_render')}
+    if args.source == 'simulation':
+        chunks = simulation_chunks(args.rate, args.interval, args.duration)
+    else:
+        chunks = synthetic_chunks(args.channels, args.rate, args.interval, args.duration,
+                                  args.start_string, args.end_string, args.delimiter)
+
+    render_every = max(1, round(1 / (args.refresh_rate * args.interval)))
+    total_bytes = 0
+    start = time.perf_counter()
+    for index, chunk in enumerate(chunks):
+        total_bytes += len(chunk)
+        with stages['decode'].time(len(chunk)):
+            text = decoder.decode(chunk)
+        with stages['framing'].time():
+            frames = parser.framer.feed(text)
+        stages['framing'].items += len(frames)
+        with stages['parsing'].time(len(frames)):
+            batches = parser.parse_batch(frames)
+        with stages['derived'].time(len(frames)):
+            batches = [(indices, derived.apply(values)) for indices, values in batches]
+        with stages['event_bus'].time(len(frames)):
+            post_event(EventType.NEW_MESSAGE_EVENT, text)
+            for _, values in batches:
+                post_event(EventType.NEW_FLOAT_BATCH_EVENT, SampleBatch(values))
+            event.dispatch_pending()
+
+        if index % render_every == 0:
+            with stages['plot_render'].time(1):
+                canvas_displayer.render()
+                widget.repaint()
+            with stages['text_render'].time(1):
+                text_displayer.render()
+            app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'parameters': vars(args),
+        'frames': parser.framer.frame_count,
+        'malformed': parser.malformed_count,
+        'truncated': parser.truncated_count,
+        'bytes': total_bytes,
+        'wall_s': elapsed,
+        'frames_per_s': parser.framer.frame_count / elapsed if elapsed > 0 else 0.0,
+        'stages': {name: stage.summary() for name, stage in stages.items()},
+    }
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--source', choices=['synthetic', 'simulation'], default='synthetic')
+    parser.add_argument('--channels', type=int, default=6)
+    parser.add_argument('--rate', type=float, default=1000.0, help='frames per second')
+    parser.add_argument('--interval', type=float, default=0.02, help='seconds of data per chunk')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds of data to generate')
+    parser.add_argument('--refresh-rate', type=float, default=30.0)
+    parser.add_argument('--plot-type', choices=['STEM', 'PLOT', 'SPECTRUM'], default='PLOT')
+    parser.add_argument('--sample-num', type=int, default=1000)
+    parser.add_argument('--renderer', choices=['mpl', 'qt'], default='mpl')
+    parser.add_argument('--no-decimation', action='store_true', help='draw every buffered sample')
+    parser.add_argument('--width', type=int, default=800)
+    parser.add_argument('--height', type=int, default=600)
+    parser.add_argument('--start-string', default='$$$')
+    parser.add_argument('--end-string', default='###')
+    parser.add_argument('--delimiter', default=',')
+    parser.add_argument('--derived', default='', help='derived channel definitions, see DerivedChannels')
+    parser.add_argument('--output', default='', help='write the JSON result to this file')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    result = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(result + '\n')
+    print(result)
@@ -0,0 +1,87 @@
+''' Cold start benchmark for the GUI.
+
+Run from the repository root, for example:
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+
+Every run starts a fresh interpreter with an offscreen Qt platform, which
+imports the application, builds and shows the main window and waits for the
+first paint. The median of every phase and the slowest imports of the last
+run (from python -X importtime) are printed as JSON.
+'''
+from typing import Dict, List
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.pipeline import git_commit
+
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+from PyQt5 import QtWidgets
+from app_main_window import App_MainWindow
+imported = time.perf_counter()
+app = QtWidgets.QApplication(sys.argv[:1])
+window = App_MainWindow()
+built = time.perf_counter()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - start,
+    'build_s': built - imported,
+    'show_s': shown - built,
+    'total_s': shown - start,
+    'matplotlib_loaded': 'matplotlib' in sys.modules,
+}))
+'''
+
+def parse_importtime(stderr: str, count: int) -> List[Dict[str, object]]:
+    ''' Return the count imports with the largest cumulative time, nested ones included. '''
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append({'module': name.strip(), 'depth': depth, 'cumulative_ms': int(cumulative) / 1e3})
+    return sorted(imports, key=lambda item: item['cumulative_ms'], reverse=True)[:count]
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    results = []
+    for _ in range(args.runs):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD],
+                                 capture_output=True, text=True, env=env, check=True)
+        results.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'parameters': vars(args),
+        'matplotlib_loaded': any(result['matplotlib_loaded'] for result in results),
+        'phases_s': {phase: float(np.median([result[phase] for result in results]))
+                     for phase in ('import_s', 'build_s', 'show_s', 'total_s')},
+        'slowest_imports': parse_importtime(process.stderr, args.top),
+    }
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help='number of slowest imports to report')
+    parser.add_argument('--output', default='', help='write the JSON result to this file')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    result = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(result + '\n')
+    print(result)
@@ -0,0 +1,153 @@
+''' Headless capture: log a serial port to disk without the GUI.
+
+Run from the repository root, for example:
+
+    python cli.py --port COM3 --baud 115200 --duration 60 --format csv
+
+The port is read, framed and parsed exactly as in the GUI and the samples are
+written by the same Recorder, but nothing from PyQt5, qdarktheme or
+matplotlib is imported. Stop with Ctrl+C or after --duration seconds.
+'''
+from typing import List
+import argparse
+import sys
+import time
+
+from modules.binary_parser import Framing, Checksum, struct_dtype
+from modules.derived import DerivedChannels
+from modules.grammar import GrammarType, compile_pattern
+from modules.metrics import metrics
+from modules.receiver import SerialReceiver, FileReplayReceiver
+from modules.recorder import Recorder, SampleFormat
+from modules.source import Source
+
+protocol_dict = {
+    'text': None,
+    'cobs': Framing.COBS,
+    'slip': Framing.SLIP,
+}
+grammar_dict = {
+    'delimited': GrammarType.DELIMITED,
+    'csv-header': GrammarType.CSV_HEADER,
+    'key-value': GrammarType.KEY_VALUE,
+    'regex': GrammarType.REGEX,
+}
+checksum_dict = {
+    'none': Checksum.NONE,
+    'crc16': Checksum.CRC16,
+    'crc32': Checksum.CRC32,
+}
+
+def list_ports() -> None:
+    import serial.tools.list_ports
+
+    for port in serial.tools.list_ports.comports():
+        print(port)
+
+def run(args: argparse.Namespace) -> int:
+    if args.replay:
+        receiver = FileReplayReceiver(
+            speed=args.speed, start_string=args.start_string, end_string=args.end_string, delimiter=args.delimiter,
+        )
+    else:
+        receiver = SerialReceiver()
+    source = Source('', receiver)
+    source.parser.set_config(args.start_string, args.end_string, args.delimiter)
+    source.parser.set_grammar(grammar_dict[args.grammar], args.pattern)
+    framing = protocol_dict[args.protocol]
+    if framing is not None:
+        source.binary_parser.set_config(args.layout, framing, checksum_dict[args.checksum])
+        source.set_binary_enabled(True)
+    source.set_derived(DerivedChannels(args.derived))
+
+    recorder = Recorder(
+        args.dir, args.filename,
+        is_sample_enabled=args.format != 'raw',
+        sample_format=SampleFormat.CAPTURE if args.format == 'spcap' else SampleFormat.CSV,
+        max_bytes=args.max_bytes,
+        fsync=args.fsync,
+    )
+    recorder.setup_event_handler()
+    if args.format == 'raw':
+        source.acquisition.listeners.append(recorder.record_chunk)
+
+    origin = time.perf_counter()
+    recorder.origin = origin
+    # Start the writers first, the acquisition thread records from its first read.
+    recorder.start([''])
+    writers = list(recorder.raw_writers.values()) + list(recorder.sample_writers.values())
+    if not source.connect(args.replay or args.port, args.baud, 0.5):
+        recorder.stop()
+        error = getattr(receiver, 'error', None)
+        print(f'Could not open {args.replay or args.port}' + (f': {error}' if error else ''), file=sys.stderr)
+        return 1
+
+    deadline = origin + args.duration if args.duration > 0 else float('inf')
+    next_status = origin + 1.0
+    try:
+        while time.perf_counter() < deadline:
+            time.sleep(args.interval)
+            source.receive(origin)
+            if source.acquisition.error is not None:
+                print(f'Read failed: {source.acquisition.error}', file=sys.stderr)
+                break
+            if args.replay and receiver.finished and not len(source.acquisition.queue):
+                break
+            if not args.quiet and time.perf_counter() >= next_status:
+                next_status += 1.0
+                print(f'{metrics.rate("receive") / 1e3:.1f} kB/s, {metrics.rate("parsing"):.0f} frames/s', file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.disconnect()
+        source.receive(origin)
+        recorder.stop()
+
+    for writer in writers:
+        for path in writer.files:
+            print(path)
+    return 0
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', help='serial port, for example COM3 or /dev/ttyUSB0')
+    parser.add_argument('--replay', default='', help='read a recorded log or capture instead of a port')
+    parser.add_argument('--list', action='store_true', help='list the serial ports and exit')
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--start-string', default='$$$')
+    parser.add_argument('--end-string', default='###')
+    parser.add_argument('--delimiter', default=',')
+    parser.add_argument('--grammar', choices=list(grammar_dict), default='delimited', help='layout of text frames')
+    parser.add_argument('--pattern', default='', help='regular expression of --grammar regex, one group per channel')
+    parser.add_argument('--protocol', choices=list(protocol_dict), default='text')
+    parser.add_argument('--layout', default='<ffff', help='struct layout of binary frames')
+    parser.add_argument('--checksum', choices=list(checksum_dict), default='none')
+    parser.add_argument('--derived', default='', help="derived channels, for example 'diff = ch0 - ch1; mag = sqrt(ch2**2 + ch3**2)'")
+    parser.add_argument('--duration', type=float, default=0.0, help='seconds to capture, 0 runs until Ctrl+C')
+    parser.add_argument('--format', choices=['csv', 'spcap', 'raw'], default='csv',
+                        help='parsed samples as CSV or binary capture, or the raw byte stream')
+    parser.add_argument('--dir', default='logs')
+    parser.add_argument('--filename', default='record')
+    parser.add_argument('--max-bytes', type=int, default=64 * 1024 * 1024, help='start a new file after this many bytes')
+    parser.add_argument('--fsync', action='store_true', help='fsync after every flush')
+    parser.add_argument('--interval', type=float, default=0.02, help='seconds between parses')
+    parser.add_argument('--speed', type=float, default=0.0, help='replay speed, 0 replays as fast as possible')
+    parser.add_argument('--quiet', action='store_true', help='do not print the rates every second')
+    args = parser.parse_args(argv)
+    if not args.list and not args.port and not args.replay:
+        parser.error('one of --port, --replay or --list is required')
+    try:
+        DerivedChannels(args.derived)
+        struct_dtype(args.layout)
+        if args.grammar == 'regex':
+            compile_pattern(args.pattern)
+    except ValueError as error:
+        parser.error(str(error))
+    return args
+
+if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    if args.list:
+        list_ports()
+        sys.exit(0)
+    sys.exit(run(args))
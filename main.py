@@ -2,13 +2,17 @@ from PyQt5 import QtWidgets
 from app_main_window import App_MainWindow
 import sys
 import qdarktheme
-import matplotlib.pyplot as plt
 from modules.theme import Theme
 
+def use_dark_plot_style() -> None:
+    # Imported here so the light theme never loads Matplotlib at startup.
+    import matplotlib.style
+    matplotlib.style.use('dark_background')
+
 theme = Theme.LIGHT
 theme_setup = {
     Theme.LIGHT: lambda: qdarktheme.setup_theme('light'),
-    Theme.DARK: lambda: (qdarktheme.setup_theme('dark'), plt.style.use('dark_background'))
+    Theme.DARK: lambda: (qdarktheme.setup_theme('dark'), use_dark_plot_style())
 }
 
 if __name__ == '__main__':
@@ -0,0 +1,140 @@
+from dataclasses import dataclass, field
+from collections import deque
+from enum import Enum, auto
+from typing import Callable, List, Optional
+import threading
+import time
+
+from modules.receiver import Receiver
+from modules.metrics import metrics
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = auto()
+    BLOCK = auto()
+    DROP_NEWEST = auto()
+
+@dataclass
+class Chunk:
+    ''' A block of raw bytes and the host time it was read at. '''
+    timestamp: float
+    data: bytes
+
+@dataclass
+class ChunkQueue:
+    ''' A bounded single-producer / single-consumer queue of chunks.
+
+    Appending and popping on a deque are atomic, so the reader thread and the
+    GUI thread never take a lock on the hot path. Only the BLOCK policy waits,
+    and it does so on an event that the consumer sets after draining.
+    '''
+    max_chunks: int = 1024
+    policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    bytes_dropped: int = field(init=False, default=0)
+    chunks_dropped: int = field(init=False, default=0)
+    _chunks: deque = field(init=False, default_factory=deque)
+    _space: threading.Event = field(init=False, default_factory=threading.Event)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def put(self, chunk: Chunk, stop: Optional[threading.Event] = None) -> bool:
+        ''' Return True if the chunk was queued. '''
+        while len(self._chunks) >= self.max_chunks:
+            if self.policy is OverflowPolicy.DROP_NEWEST:
+                self._count_drop(chunk)
+                return False
+
+            if self.policy is OverflowPolicy.DROP_OLDEST:
+                try:
+                    self._count_drop(self._chunks.popleft())
+                except IndexError:
+                    pass
+                continue
+
+            if stop is not None and stop.is_set():
+                self._count_drop(chunk)
+                return False
+            self._space.clear()
+            self._space.wait(0.01)
+
+        self._chunks.append(chunk)
+        return True
+
+    def get_all(self) -> List[Chunk]:
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._chunks.popleft())
+            except IndexError:
+                break
+        if chunks:
+            self._space.set()
+        return chunks
+
+    def clear(self) -> None:
+        self.get_all()
+
+    def _count_drop(self, chunk: Chunk) -> None:
+        self.chunks_dropped += 1
+        self.bytes_dropped += len(chunk.data)
+
+@dataclass
+class Acquisition:
+    ''' Reads a receiver on a background thread and hands chunks to a ChunkQueue.
+
+    Listeners are called with every chunk on the acquisition thread, before
+    it is queued, and must not block. The time the receiver waits for data
+    is recorded as the receive_wait stage, the rest of each read as receive.
+    '''
+    receiver: Receiver
+    queue: ChunkQueue = field(default_factory=ChunkQueue)
+    listeners: List[Callable[[Chunk], None]] = field(default_factory=list)
+    bytes_read: int = field(init=False, default=0)
+    error: Optional[Exception] = field(init=False, default=None)
+    _stop: threading.Event = field(init=False, default_factory=threading.Event)
+    _thread: Optional[threading.Thread] = field(init=False, default=None)
+
+    @property
+    def bytes_dropped(self) -> int:
+        return self.queue.bytes_dropped
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='acquisition', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self.receiver.cancel_read()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                data = self.receiver.receive_bytes()
+            except Exception as error:
+                self.error = error
+                break
+
+            # Time spent waiting for the device is idle time, not receive latency.
+            now = time.perf_counter()
+            wait_time = min(self.receiver.wait_time, now - start)
+            metrics.record('receive_wait', wait_time)
+            if not data:
+                continue
+            chunk = Chunk(now, data)
+            metrics.record('receive', now - start - wait_time, len(data))
+            self.bytes_read += len(data)
+            for listener in self.listeners:
+                listener(chunk)
+            self.queue.put(chunk, self._stop)
@@ -1,33 +1,226 @@
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
+from functools import partial
+from typing import Any, Dict, List, Optional
+import time
 
-from modules.displayer import TextBrowserDisplayer, ConsoleDisplayer, MplDisplayer
+from modules.displayer import TextBrowserDisplayer, ConsoleDisplayer, PlotDisplayer
 from modules.receiver import Receiver, SerialReceiver, SimulationReceiver
+from modules.acquisition import Acquisition
+from modules.scheduler import RenderScheduler, render_stage
+from modules.recorder import Recorder
+from modules.source import Source
+from modules.timing import InterArrivalMonitor
+from modules.statistics import StatisticsMonitor
+from modules.event import dispatch_pending, get_subscriptions
+from modules.metrics import metrics, MetricsLog
 from modules.string_parser import StringParser
-from modules.event import EventType, post_event
+from modules.binary_parser import BinaryParser, Framing, Checksum
+from modules.derived import DerivedChannels
+from modules.grammar import GrammarType
 
 @dataclass
 class Application:
-    ''' An application class that contend all the functions the user need. '''
+    ''' An application class that contend all the functions the user need.
+
+    Data can come from several sources at once. The first source uses
+    receiver and is the one connect() and disconnect() refer to; all sources
+    share the displayers, the recorder and one time base. Every source has
+    its own parser config: the set_*_config methods change the selected
+    source only.
+    '''
     text_displayer: TextBrowserDisplayer
-    canvas_displayer: MplDisplayer
+    canvas_displayer: PlotDisplayer
     # console_displayer: ConsoleDisplayer = field(default_factory=ConsoleDisplayer)
     receiver: Receiver = field(default_factory=SerialReceiver)
-    parser: StringParser = field(init=False, default_factory=StringParser)
+    sources: List[Source] = field(init=False, default_factory=list)
+    selected: str = field(init=False, default='')
+    origin: float = field(init=False, default_factory=time.perf_counter)
+    scheduler: RenderScheduler = field(init=False, default_factory=RenderScheduler)
+    recorder: Recorder = field(init=False, default_factory=Recorder)
+    timing: InterArrivalMonitor = field(init=False, default_factory=InterArrivalMonitor)
+    statistics: StatisticsMonitor = field(init=False, default_factory=StatisticsMonitor)
+    derived: DerivedChannels = field(init=False, default_factory=DerivedChannels)
+    metrics_log: Optional[MetricsLog] = field(init=False, default=None)
 
     def __post_init__(self) -> None:
         self.canvas_displayer.setup_event_handler()
+        self.scheduler.add(self.canvas_displayer)
         self.text_displayer.setup_event_handler()
+        self.scheduler.add(self.text_displayer)
         # self.console_displayer.setup_event_handler()
-        self.parser.setup_event_handler()
+        self.recorder.origin = self.origin
+        self.recorder.setup_event_handler()
+        self.timing.setup_event_handler()
+        self.statistics.origin = self.origin
+        self.statistics.setup_event_handler()
+        self.add_source(Source('', self.receiver))
+
+    @property
+    def source(self) -> Source:
+        return self.sources[0]
+
+    @property
+    def parser(self) -> StringParser:
+        return self.source.parser
+
+    @property
+    def binary_parser(self) -> BinaryParser:
+        return self.source.binary_parser
+
+    @property
+    def acquisition(self) -> Acquisition:
+        return self.source.acquisition
+
+    @property
+    def selected_source(self) -> Source:
+        return self.get_source(self.selected) or self.source
+
+    def select_source(self, name: str) -> None:
+        ''' Apply the parser config to the source named name from now on. '''
+        if self.get_source(name) is None:
+            raise ValueError(f'No source named {name!r}')
+        self.selected = name
+
+    def add_source(self, source: Source) -> Source:
+        if self.get_source(source.name) is not None:
+            raise ValueError(f'A source named {source.name!r} already exists')
+        source.acquisition.listeners.append(partial(self.recorder.record_chunk, source=source.name))
+        source.set_derived(self.derived)
+        self.sources.append(source)
+        self.recorder.add_source(source.name)
+        return source
+
+    def remove_source(self, name: str) -> None:
+        source = self.get_source(name)
+        if source is None or source is self.source:
+            return
+        source.disconnect()
+        self.sources.remove(source)
+        # Show what it already posted, then forget its traces and statistics.
+        dispatch_pending()
+        self.canvas_displayer.remove_source(name)
+        self.statistics.remove_source(name)
+        if self.selected == name:
+            self.selected = self.source.name
+
+    def get_source(self, name: str) -> Optional[Source]:
+        for source in self.sources:
+            if source.name == name:
+                return source
+        return None
+
+    def failed_sources(self) -> List[Source]:
+        ''' Return the sources whose acquisition stopped on a read error, e.g. because the port was unplugged. '''
+        return [source for source in self.sources if source.acquisition.error is not None]
+
+    def set_canvas_displayer(self, displayer: PlotDisplayer) -> None:
+        ''' Switch the plot to another displayer, which continues with the samples of the current one. '''
+        if displayer is self.canvas_displayer:
+            return
+        self.canvas_displayer.remove_event_handler()
+        self.scheduler.remove(self.canvas_displayer)
+        displayer.take_over(self.canvas_displayer)
+        self.canvas_displayer = displayer
+        displayer.setup_event_handler()
+        self.scheduler.add(displayer)
+
+    def set_receiver(self, receiver: Receiver) -> None:
+        ''' Replace the receiver of the first source. Only call this while disconnected. '''
+        self.receiver = receiver
+        self.source.set_receiver(receiver)
 
     def connect(self, port: str, baudrate: int) -> bool:
-        return self.receiver.connect(port, baudrate, 0.5)
+        self.timing.reset()
+        self.statistics.reset()
+        metrics.reset()
+        return self.source.connect(port, baudrate, 0.5)
 
     def disconnect(self) -> bool:
-        return self.receiver.disconnect()
+        ''' Disconnect every source and forget all but the first one. '''
+        for source in self.sources[1:]:
+            self.remove_source(source.name)
+        return self.source.disconnect()
+
+    def set_parser_config(self, start_string: str, end_string: str, delimiter: str) -> None:
+        self.selected_source.parser.set_config(start_string, end_string, delimiter)
+
+    def set_grammar(self, grammar_type: GrammarType, pattern: str = '') -> None:
+        ''' Raises ValueError if pattern is not a valid REGEX pattern. '''
+        self.selected_source.parser.set_grammar(grammar_type, pattern)
+
+    def set_binary_config(self, layout: str, framing: Framing, checksum: Checksum) -> None:
+        self.selected_source.binary_parser.set_config(layout, framing, checksum)
+
+    def set_binary_enabled(self, enabled: bool) -> None:
+        self.selected_source.set_binary_enabled(enabled)
+
+    def set_derived_channels(self, text: str) -> None:
+        ''' Define the derived channels of every source, see DerivedChannels. Raises ValueError if text is invalid. '''
+        self.derived = DerivedChannels(text)
+        for source in self.sources:
+            source.set_derived(self.derived)
+
+    def start_recording(self, dir: str) -> None:
+        self.recorder.dir = dir
+        self.recorder.start([source.name for source in self.sources])
+
+    def stop_recording(self) -> None:
+        self.recorder.stop()
+
+    def export_timing(self, path: str) -> None:
+        ''' Save the inter-arrival time histogram of every source as CSV. '''
+        self.timing.export_csv(path)
+
+    def start_metrics_log(self, path: str) -> None:
+        ''' Append every snapshot taken by update_metrics to a JSON lines file. '''
+        self.stop_metrics_log()
+        self.metrics_log = MetricsLog(path)
+
+    def stop_metrics_log(self) -> None:
+        if self.metrics_log is not None:
+            self.metrics_log.close()
+            self.metrics_log = None
+
+    def update_metrics(self) -> Dict[str, Any]:
+        ''' Return the current pipeline metrics and write them to the metrics log, if any.
+
+        queue_depth counts the chunks waiting for receive_and_post_event and
+        the events waiting in subscriber queues. malformed_frames counts the
+        frames that lost their end or failed to convert, truncated_frames the
+        times unterminated text was dropped, and text_frames the frames that
+        hold no data in the grammar, such as debug prints. records_dropped
+        counts the chunks and batches the recorder had no room for.
+        '''
+        subscriptions = get_subscriptions()
+        snapshot = {
+            'time': time.perf_counter() - self.origin,
+            'bytes_per_s': metrics.rate('receive'),
+            'frames_per_s': metrics.rate('parsing'),
+            'render_fps': metrics.call_rate(render_stage(self.canvas_displayer)),
+            'queue_depth': sum(len(source.acquisition.queue) for source in self.sources)
+                           + sum(subscription.depth for subscription in subscriptions),
+            'chunks_dropped': sum(source.acquisition.queue.chunks_dropped for source in self.sources),
+            'bytes_dropped': sum(source.acquisition.bytes_dropped for source in self.sources),
+            'malformed_frames': sum(source.parser.malformed_count + source.binary_parser.malformed_count
+                                    for source in self.sources),
+            'truncated_frames': sum(source.parser.truncated_count for source in self.sources),
+            'text_frames': sum(source.parser.text_count for source in self.sources),
+            'events_dropped': sum(subscription.dropped for subscription in subscriptions),
+            'records_dropped': self.recorder.items_dropped,
+            'renders_skipped': self.scheduler.total_skipped(),
+            'stages': metrics.snapshot(),
+        }
+        if self.metrics_log is not None:
+            self.metrics_log.write(snapshot)
+        return snapshot
 
     def receive_and_post_event(self) -> None:
-        msg = self.receiver.receive_message()
-        if msg != '':
-            post_event(EventType.NEW_MESSAGE_EVENT, msg)
+        ''' Drain the chunks every acquisition thread read since the last call.
+
+        Must be called on the main thread, it also delivers the events queued
+        for Delivery.MAIN subscribers such as the displayers.
+        '''
+        for source in self.sources:
+            source.receive(self.origin)
+        dispatch_pending()
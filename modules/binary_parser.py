@@ -0,0 +1,198 @@
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import List, Optional, Tuple
+import binascii
+import re
+import struct
+import time
+import zlib
+
+import numpy as np
+from numpy.lib import recfunctions
+
+from modules.derived import DerivedChannels
+from modules.event import EventType, post_event
+from modules.metrics import metrics
+from modules.sample import SampleBatch
+from modules.timing import ArrivalTimes
+
+class Framing(Enum):
+    COBS = auto()
+    SLIP = auto()
+
+class Checksum(Enum):
+    NONE = auto()
+    CRC16 = auto()
+    CRC32 = auto()
+
+SLIP_END = b'\xc0'
+SLIP_ESC = b'\xdb'
+
+STRUCT_TO_NUMPY = {
+    'b': 'i1', 'B': 'u1', '?': 'b1', 'c': 'u1',
+    'h': 'i2', 'H': 'u2', 'i': 'i4', 'I': 'u4', 'l': 'i4', 'L': 'u4',
+    'q': 'i8', 'Q': 'u8', 'e': 'f2', 'f': 'f4', 'd': 'f8',
+}
+
+def struct_dtype(layout: str) -> np.dtype:
+    ''' Translate a struct layout such as '<Hffff' into a packed NumPy structured dtype. '''
+    order = layout[:1] if layout[:1] in '<>=!@' else '<'
+    body = layout[1:] if layout[:1] in '<>=!@' else layout
+    if order == '@':
+        raise ValueError("Native alignment '@' is not supported, use '<' or '>'")
+    numpy_order = {'<': '<', '>': '>', '!': '>', '=': '='}[order]
+
+    body = body.replace(' ', '')
+    tokens = re.findall(r'(\d*)([xcbB?hHiIlLqQefd])', body)
+    if ''.join(count + code for count, code in tokens) != body or not tokens:
+        raise ValueError(f'Unsupported struct layout {layout!r}')
+
+    names, formats, offsets = [], [], []
+    offset = 0
+    for count, code in tokens:
+        repeat = int(count or 1)
+        size = struct.calcsize(order + code)
+        if code == 'x':
+            offset += repeat * size
+            continue
+        for _ in range(repeat):
+            names.append(f'f{len(names)}')
+            formats.append(numpy_order + STRUCT_TO_NUMPY[code])
+            offsets.append(offset)
+            offset += size
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': offset})
+
+def cobs_decode(frame: bytes) -> bytes:
+    out = bytearray()
+    index = 0
+    while index < len(frame):
+        code = frame[index]
+        if code == 0 or index + code > len(frame):
+            raise ValueError('Invalid COBS frame')
+        out += frame[index + 1:index + code]
+        index += code
+        if code < 0xFF and index < len(frame):
+            out.append(0)
+    return bytes(out)
+
+def cobs_encode(data: bytes) -> bytes:
+    out = bytearray()
+    for block in data.split(b'\x00'):
+        while len(block) >= 0xFE:
+            out.append(0xFF)
+            out += block[:0xFE]
+            block = block[0xFE:]
+        out.append(len(block) + 1)
+        out += block
+    return bytes(out)
+
+def slip_decode(frame: bytes) -> bytes:
+    return frame.replace(b'\xdb\xdc', SLIP_END).replace(b'\xdb\xdd', SLIP_ESC)
+
+def slip_encode(data: bytes) -> bytes:
+    return data.replace(SLIP_ESC, b'\xdb\xdd').replace(SLIP_END, b'\xdb\xdc')
+
+@dataclass
+class BinaryParser:
+    ''' Parse COBS or SLIP framed packed structs into sample batches.
+
+    Each frame holds one struct described by layout, optionally followed by a
+    CRC16-CCITT or CRC32 of the struct bytes in the layout's byte order. All
+    valid frames of a read are decoded with a single np.frombuffer call and
+    posted as one NEW_FLOAT_BATCH_EVENT.
+    '''
+    layout: str = '<ffff'
+    framing: Framing = Framing.COBS
+    checksum: Checksum = Checksum.NONE
+    enabled: bool = False
+    source: str = ''
+    derived: DerivedChannels = field(default_factory=DerivedChannels)
+    max_frame_length: int = 4096
+
+    frame_count: int = field(init=False, default=0)
+    malformed_count: int = field(init=False, default=0)
+    dtype: np.dtype = field(init=False)
+    _buffer: bytes = field(init=False, default=b'')
+
+    def __post_init__(self) -> None:
+        self.dtype = struct_dtype(self.layout)
+
+    def set_config(self, layout: str, framing: Framing, checksum: Checksum) -> None:
+        self.dtype = struct_dtype(layout)
+        self.layout = layout
+        self.framing = framing
+        self.checksum = checksum
+        self._buffer = b''
+
+    @property
+    def checksum_size(self) -> int:
+        return {Checksum.NONE: 0, Checksum.CRC16: 2, Checksum.CRC32: 4}[self.checksum]
+
+    def reset(self) -> None:
+        self._buffer = b''
+        self.frame_count = 0
+        self.malformed_count = 0
+
+    def parse_bytes(self, data: bytes, arrival: Optional[ArrivalTimes] = None) -> None:
+        ''' arrival maps positions in data to the host time they were read at, if known. '''
+        if not self.enabled:
+            return
+        ends, values = self.parse_batch(data)
+        if values.size:
+            timestamps = None if arrival is None else arrival.at(ends)
+            post_event(EventType.NEW_FLOAT_BATCH_EVENT, self.derived.apply_batch(SampleBatch(values, self.source, timestamps)))
+
+    def split_frames(self, data: bytes) -> List[Tuple[bytes, int]]:
+        ''' Return the complete encoded frames in data, keeping the incomplete tail for the next call.
+
+        Every frame is paired with the position in data right after its delimiter.
+        '''
+        delimiter = b'\x00' if self.framing is Framing.COBS else SLIP_END
+        carried = len(self._buffer)
+        frames = (self._buffer + data).split(delimiter)
+        self._buffer = frames.pop()
+        if len(self._buffer) > self.max_frame_length:
+            self.malformed_count += 1
+            self._buffer = b''
+        ends = np.cumsum([len(frame) + len(delimiter) for frame in frames], dtype=np.intp) - carried
+        return [(frame, int(end)) for frame, end in zip(frames, ends) if frame]
+
+    def parse_batch(self, data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+        ''' Decode every complete frame in data into a (n_frames, n_fields) float64 array.
+
+        Returns the end position in data of every decoded frame and the array.
+        '''
+        decode = cobs_decode if self.framing is Framing.COBS else slip_decode
+        size = self.dtype.itemsize
+        payloads, ends = [], []
+        start = time.perf_counter()
+        frames = self.split_frames(data)
+        framed = time.perf_counter()
+        metrics.record('framing', framed - start, len(frames))
+        for frame, end in frames:
+            try:
+                payload = decode(frame)
+            except ValueError:
+                self.malformed_count += 1
+                continue
+            if len(payload) != size + self.checksum_size or not self.check(payload[:size], payload[size:]):
+                self.malformed_count += 1
+                continue
+            payloads.append(payload[:size])
+            ends.append(end)
+
+        self.frame_count += len(payloads)
+        records = np.frombuffer(b''.join(payloads), dtype=self.dtype)
+        values = recfunctions.structured_to_unstructured(records, dtype=np.float64)
+        metrics.record('parsing', time.perf_counter() - framed, len(payloads))
+        return np.array(ends, dtype=np.intp), values
+
+    def check(self, payload: bytes, crc: bytes) -> bool:
+        if self.checksum is Checksum.NONE:
+            return True
+        byteorder = 'big' if self.layout[:1] in '>!' else 'little'
+        if self.checksum is Checksum.CRC16:
+            expected = binascii.crc_hqx(payload, 0xFFFF)
+        else:
+            expected = zlib.crc32(payload)
+        return int.from_bytes(crc, byteorder) == expected
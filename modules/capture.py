@@ -0,0 +1,171 @@
+''' Binary capture format
+
+A capture is a fixed header followed by append-only rows. The header is
+
+    magic 'SPCAP\0', version (u16), header size (u32), channel count (u32),
+    value dtype ('f' float32 or 'd' float64), channel names as (u16 length,
+    utf-8 bytes) pairs, zero padding up to a multiple of 64 bytes.
+
+Each row is a float64 host timestamp followed by one value per channel, all
+little endian, so the rows of a file can be memory-mapped as one NumPy
+structured array.
+'''
+
+from dataclasses import dataclass, field
+from typing import IO, Iterator, List, Optional, Sequence, Tuple
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'SPCAP\x00'
+VERSION = 1
+HEADER_ALIGNMENT = 64
+HEADER_STRUCT = struct.Struct('<6sHIIc')
+VALUE_DTYPES = {'f': np.dtype('<f4'), 'd': np.dtype('<f8')}
+
+def row_dtype(channel_count: int, value_dtype: str = 'd') -> np.dtype:
+    return np.dtype([('timestamp', '<f8'), ('values', VALUE_DTYPES[value_dtype], (channel_count,))])
+
+def default_names(channel_count: int) -> List[str]:
+    return [f'ch{index}' for index in range(channel_count)]
+
+def encode_header(names: Sequence[str], value_dtype: str = 'd') -> bytes:
+    if value_dtype not in VALUE_DTYPES:
+        raise ValueError(f'Unsupported capture dtype {value_dtype!r}')
+    encoded_names = b''
+    for name in names:
+        encoded = name.encode('utf-8')
+        encoded_names += struct.pack('<H', len(encoded)) + encoded
+
+    size = HEADER_STRUCT.size + len(encoded_names)
+    size += -size % HEADER_ALIGNMENT
+    header = HEADER_STRUCT.pack(MAGIC, VERSION, size, len(names), value_dtype.encode('ascii')) + encoded_names
+    return header.ljust(size, b'\x00')
+
+def encode_rows(timestamps: np.ndarray, values: np.ndarray, value_dtype: str = 'd') -> bytes:
+    values = np.atleast_2d(values)
+    rows = np.empty(values.shape[0], dtype=row_dtype(values.shape[1], value_dtype))
+    rows['timestamp'] = timestamps
+    rows['values'] = values
+    return rows.tobytes()
+
+@dataclass
+class CaptureWriter:
+    ''' Appends rows to a capture file. '''
+    path: str
+    names: List[str]
+    value_dtype: str = 'd'
+    rows_written: int = field(init=False, default=0)
+    _file: Optional[IO[bytes]] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        self._file = open(self.path, 'wb')
+        self._file.write(encode_header(self.names, self.value_dtype))
+
+    def append(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        values = np.atleast_2d(values)
+        if values.shape[1] != len(self.names):
+            raise ValueError(f'Expected {len(self.names)} channels, got {values.shape[1]}')
+        self._file.write(encode_rows(timestamps, values, self.value_dtype))
+        self.rows_written += values.shape[0]
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'CaptureWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+@dataclass
+class CaptureReader:
+    ''' Memory-maps a capture file. Rows are only read from disk when they are accessed.
+
+    A partially written last row, e.g. after a crash, is ignored.
+    '''
+    path: str
+    names: List[str] = field(init=False, default_factory=list)
+    value_dtype: str = field(init=False, default='d')
+    header_size: int = field(init=False, default=0)
+    rows: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        with open(self.path, 'rb') as f:
+            fixed = f.read(HEADER_STRUCT.size)
+            if len(fixed) < HEADER_STRUCT.size:
+                raise ValueError(f'{self.path} is not a capture file')
+            magic, version, self.header_size, channel_count, value_dtype = HEADER_STRUCT.unpack(fixed)
+            if magic != MAGIC:
+                raise ValueError(f'{self.path} is not a capture file')
+            if version != VERSION:
+                raise ValueError(f'Unsupported capture version {version}')
+            self.value_dtype = value_dtype.decode('latin-1')
+            if self.value_dtype not in VALUE_DTYPES:
+                raise ValueError(f'Unsupported capture dtype {self.value_dtype!r}')
+
+            try:
+                for _ in range(channel_count):
+                    length, = struct.unpack('<H', f.read(2))
+                    name = f.read(length)
+                    if len(name) < length:
+                        raise ValueError
+                    self.names.append(name.decode('utf-8'))
+            except (struct.error, ValueError):
+                raise ValueError(f'{self.path} has a truncated capture header') from None
+            if f.tell() > self.header_size:
+                raise ValueError(f'{self.path} has a truncated capture header')
+
+        dtype = row_dtype(channel_count, self.value_dtype)
+        row_count = (os.path.getsize(self.path) - self.header_size) // dtype.itemsize
+        if row_count > 0:
+            self.rows = np.memmap(self.path, dtype=dtype, mode='r', offset=self.header_size, shape=(row_count,))
+        else:
+            self.rows = np.empty(0, dtype=dtype)
+
+    def __len__(self) -> int:
+        return self.rows.shape[0]
+
+    @property
+    def channel_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.rows['timestamp']
+
+    @property
+    def values(self) -> np.ndarray:
+        ''' A (n_rows, n_channels) view of the values. '''
+        return self.rows['values']
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        ''' Return rows [start, stop) as a (timestamps, values) pair loaded in memory. '''
+        rows = self.rows[start:stop]
+        return np.array(rows['timestamp']), np.array(rows['values'])
+
+    def iter_chunks(self, chunk_rows: int = 65536) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        for start in range(0, len(self), chunk_rows):
+            yield self.read(start, start + chunk_rows)
+
+    def to_csv(self, path: str, chunk_rows: int = 65536) -> None:
+        with open(path, 'w', newline='') as f:
+            f.write(','.join(['timestamp'] + self.names) + '\n')
+            for timestamps, values in self.iter_chunks(chunk_rows):
+                np.savetxt(f, np.column_stack([timestamps, values]), delimiter=',',
+                           fmt=['%.9f'] + ['%.9g'] * self.channel_count)
+
+    def to_npy(self, path: str, chunk_rows: int = 65536) -> None:
+        ''' Save the values as a (n_rows, n_channels) .npy file without loading the whole capture. '''
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=VALUE_DTYPES[self.value_dtype],
+                                        shape=(len(self), self.channel_count))
+        for start in range(0, len(self), chunk_rows):
+            out[start:start + chunk_rows] = self.values[start:start + chunk_rows]
+        out.flush()
+        del out
@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+
+from modules.ring_buffer import RingBuffer
+
+@dataclass
+class MinMaxPyramid:
+    ''' Incrementally maintained min/max summaries of a RingBuffer.
+
+    Level k holds one bucket per factor**(k + 1) samples: the minimum and the
+    maximum of every channel and the timestamp of the bucket's first sample.
+    update() only reduces the samples appended since the last call, and each
+    level is built from the one below it, so keeping the summaries costs a
+    constant amount of work per sample. decimate() then returns any window
+    of the buffer as a bounded number of points, whatever its length.
+    '''
+    samples: RingBuffer
+    factor: int = 4
+    min_buckets: int = 16
+    levels: List[RingBuffer] = field(init=False, default_factory=list)
+    _shape: Tuple[int, int] = field(init=False, default=(0, 0))
+
+    def bucket_size(self, level: int) -> int:
+        return self.factor ** (level + 1)
+
+    def rebuild(self) -> None:
+        ''' Drop the summaries, they are recomputed from the samples still buffered. '''
+        capacity = self.samples.capacity
+        self.levels = []
+        while self.bucket_size(len(self.levels)) * self.min_buckets <= capacity:
+            size = self.bucket_size(len(self.levels))
+            self.levels.append(RingBuffer(-(-capacity // size) + 1, 2 * self.samples.channel_count))
+        self._shape = (capacity, self.samples.channel_count)
+
+    def update(self) -> None:
+        ''' Summarise the samples appended since the last call. '''
+        if self._shape != (self.samples.capacity, self.samples.channel_count):
+            self.rebuild()
+
+        source = self.samples
+        for level in self.levels:
+            self.reduce(source, level, source is self.samples)
+            source = level
+
+    def reduce(self, source: RingBuffer, level: RingBuffer, is_raw: bool) -> None:
+        available = source.total - len(source)
+        start = max(level.total, -(-available // self.factor))
+        stop = source.total // self.factor
+        if start >= stop:
+            return
+        if start > level.total:
+            # Samples were lost before they could be summarised, restart the level.
+            level.clear()
+            level.total = start
+
+        first = start * self.factor - available
+        rows = source.view()[first:first + (stop - start) * self.factor]
+        times = source.times()[first:first + (stop - start) * self.factor:self.factor]
+        rows = rows.reshape(stop - start, self.factor, rows.shape[1])
+        channels = rows.shape[2] if is_raw else rows.shape[2] // 2
+        low = np.fmin.reduce(rows[:, :, :channels], axis=1)
+        high = np.fmax.reduce(rows[:, :, -channels:], axis=1)
+        level.append(np.concatenate([low, high], axis=1), times)
+
+    def decimate(self, max_points: int, use_times: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        ''' Return (x, values) for the whole buffer with at most about max_points rows.
+
+        Windows that are short enough are returned as is. Otherwise the
+        coarsest level needed is used and every bucket becomes two rows at
+        the same x, its minimum and its maximum, so peaks are never lost. The
+        newest samples, not yet in a complete bucket, come from the finer
+        levels. x is the sample index, or the timestamp with use_times.
+        '''
+        self.update()
+        count = len(self.samples)
+        use_times = use_times and bool(np.isfinite(self.samples.times()).all())
+        if count <= max_points or not self.levels:
+            return self.get_x(self.samples, use_times), self.samples.view()
+
+        level_index = len(self.levels) - 1
+        for index in range(len(self.levels)):
+            if 2 * count / self.bucket_size(index) <= max_points:
+                level_index = index
+                break
+
+        xs, values = [], []
+        begin = -(-(self.samples.total - count) // self.bucket_size(level_index)) * self.bucket_size(level_index)
+        for index in range(level_index, -1, -1):
+            level, size = self.levels[index], self.bucket_size(index)
+            end = level.total * size
+            if end <= begin:
+                continue
+            first = max(0, begin // size - (level.total - len(level)))
+            buckets = level.view()[first:]
+            x = self.get_x(level, use_times)[first:]
+            if not use_times:
+                x = x * size + (size - 1) / 2
+            channels = buckets.shape[1] // 2
+            xs.append(np.repeat(x, 2))
+            values.append(np.stack([buckets[:, :channels], buckets[:, channels:]], axis=1).reshape(-1, channels))
+            begin = end
+
+        tail = self.samples.total - begin
+        if tail > 0:
+            xs.append(self.get_x(self.samples, use_times)[-tail:])
+            values.append(self.samples.view()[-tail:])
+        return np.concatenate(xs), np.concatenate(values)
+
+    def get_x(self, buffer: RingBuffer, use_times: bool) -> np.ndarray:
+        return buffer.times() if use_times else buffer.indices()
@@ -0,0 +1,185 @@
+from dataclasses import dataclass, field
+from types import CodeType
+from typing import Dict, List, Optional, Set
+import ast
+import re
+import time
+
+import numpy as np
+
+from modules.capture import default_names
+from modules.metrics import metrics
+from modules.sample import SampleBatch
+
+FUNCTIONS = {
+    'abs': np.abs,
+    'sqrt': np.sqrt,
+    'exp': np.exp,
+    'log': np.log,
+    'log10': np.log10,
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'arcsin': np.arcsin,
+    'arccos': np.arccos,
+    'arctan': np.arctan,
+    'arctan2': np.arctan2,
+    'hypot': np.hypot,
+    'degrees': np.degrees,
+    'radians': np.radians,
+    'sign': np.sign,
+    'floor': np.floor,
+    'ceil': np.ceil,
+    'round': np.round,
+    'minimum': np.minimum,
+    'maximum': np.maximum,
+    'clip': np.clip,
+    'where': np.where,
+}
+CONSTANTS = {
+    'pi': np.pi,
+    'e': np.e,
+}
+NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)
+CHANNEL = re.compile(r'ch(0|[1-9]\d*)')
+
+def compile_expression(expression: str) -> CodeType:
+    ''' Validate expression and compile it for eval().
+
+    Only arithmetic, comparisons, numbers, calls to the FUNCTIONS and names
+    are accepted, so evaluating it can not reach anything but NumPy. Names
+    other than the FUNCTIONS and CONSTANTS are channels: the raw ch0, ch1,
+    ..., the channel names of the grammar or earlier derived channels. Names
+    starting with an underscore are rejected.
+    '''
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as error:
+        raise ValueError(f'Invalid expression {expression!r}: {error.msg}') from None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, NODES):
+            raise ValueError(f'Unsupported syntax {type(node).__name__} in {expression!r}')
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise ValueError(f'Unsupported constant {node.value!r} in {expression!r}')
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f'Unsupported call in {expression!r}, use one of {", ".join(FUNCTIONS)}')
+        if isinstance(node, ast.Name) and node.id.startswith('_'):
+            raise ValueError(f'Unsupported name {node.id!r} in {expression!r}')
+        # Evaluate in floating point, integer powers such as 9**9**9 would never finish.
+        if isinstance(node, ast.Constant):
+            node.value = float(node.value)
+    return compile(tree, '<derived channel>', 'eval')
+
+def referenced_names(code: CodeType) -> Set[str]:
+    ''' Return the channel names code reads, raw, grammar or derived. '''
+    return {name for name in code.co_names if name not in FUNCTIONS and name not in CONSTANTS}
+
+def is_channel_name(name: str) -> bool:
+    ''' Whether an expression can refer to a grammar channel called name. '''
+    return name.isidentifier() and not name.startswith('_') and name not in FUNCTIONS and name not in CONSTANTS \
+        and not CHANNEL.fullmatch(name)
+
+@dataclass
+class DerivedChannel:
+    ''' One channel computed from the raw channels of every frame by expression.
+
+    The expression is compiled once and evaluated on whole columns of a
+    batch, so its cost is a few NumPy calls per batch, not per sample.
+    '''
+    name: str
+    expression: str
+    code: CodeType = field(init=False, repr=False)
+    inputs: Set[str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.code = compile_expression(self.expression)
+        self.inputs = referenced_names(self.code)
+        # Fail now on mistakes that only show when evaluated, such as a wrong argument count.
+        try:
+            with np.errstate(all='ignore'):
+                self.evaluate({name: np.ones(1) for name in self.inputs}, 1)
+        except (ArithmeticError, TypeError, ValueError) as error:
+            raise ValueError(f'Invalid expression {self.expression!r}: {error}') from None
+
+    def evaluate(self, namespace: Dict[str, np.ndarray], length: int) -> np.ndarray:
+        result = eval(self.code, {'__builtins__': {}}, {**FUNCTIONS, **CONSTANTS, **namespace})
+        return np.broadcast_to(np.asarray(result, dtype=np.float64), (length,))
+
+@dataclass
+class DerivedChannels:
+    ''' Appends derived channels to the columns of every batch.
+
+    Defined by text such as 'diff = ch0 - ch1; mag = sqrt(ch2**2 + ch3**2)':
+    one name = expression per ';' or line. Besides ch0, ch1, ... an
+    expression may use the channel names of the grammar, such as
+    'fahrenheit = temp * 1.8 + 32', and the derived channels defined before
+    it. Channels referring to a channel a batch does not have are NaN.
+    '''
+    text: str = ''
+    channels: List[DerivedChannel] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.channels = self.parse(self.text)
+
+    @staticmethod
+    def parse(text: str) -> List[DerivedChannel]:
+        channels = []
+        for definition in re.split(r'[;\n]', text):
+            if not definition.strip():
+                continue
+            name, separator, expression = definition.partition('=')
+            name = name.strip()
+            # Leave comparisons such as ch0 == 1 to the expression.
+            if not separator or expression.startswith('=') or name.endswith(('<', '>', '!')):
+                raise ValueError(f'Expected name = expression, got {definition.strip()!r}')
+            if not is_channel_name(name):
+                raise ValueError(f'Invalid channel name {name!r}')
+            if any(channel.name == name for channel in channels):
+                raise ValueError(f'Channel {name!r} is defined twice')
+            channels.append(DerivedChannel(name, expression.strip()))
+        for index, channel in enumerate(channels):
+            later = channel.inputs & {other.name for other in channels[index:]}
+            if later:
+                raise ValueError(f'Channel {channel.name!r} uses {", ".join(sorted(later))} before it is defined')
+        return channels
+
+    def names(self, channel_count: int, names: Optional[List[str]] = None) -> List[str]:
+        ''' Return the names of the raw and derived columns of a batch with channel_count raw channels. '''
+        return (names or default_names(channel_count)) + [channel.name for channel in self.channels]
+
+    def apply(self, values: np.ndarray, names: Optional[List[str]] = None) -> np.ndarray:
+        ''' Return the (n_frames, n_channels) values followed by one column per derived channel.
+
+        names are the channel names of the grammar, if any, one per column.
+        '''
+        if not self.channels:
+            return values
+        start = time.perf_counter()
+        length, channel_count = values.shape
+        namespace = {f'ch{index}': values[:, index] for index in range(channel_count)}
+        if names is not None and len(names) == channel_count:
+            namespace.update((name, values[:, index]) for index, name in enumerate(names) if is_channel_name(name))
+        columns = [values]
+        with np.errstate(all='ignore'):
+            for channel in self.channels:
+                if not channel.inputs <= namespace.keys():
+                    result = np.full(length, np.nan)
+                else:
+                    result = channel.evaluate(namespace, length)
+                namespace[channel.name] = result
+                columns.append(result[:, np.newaxis])
+        values = np.hstack(columns)
+        metrics.record('derived', time.perf_counter() - start, length)
+        return values
+
+    def apply_batch(self, batch: SampleBatch) -> SampleBatch:
+        ''' Return batch with the derived channels appended and every column named. '''
+        if not self.channels:
+            return batch
+        return SampleBatch(self.apply(batch.values, batch.names), batch.source, batch.timestamps, self.names(batch.channel_count, batch.names))
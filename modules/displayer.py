@@ -1,18 +1,38 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from modules.event import EventType, subscribe
+from modules.event import EventType, Delivery, subscribe, unsubscribe
+from modules.capture import default_names
+from modules.sample import SampleBatch
+from modules.ring_buffer import RingBuffer
+from modules.decimation import MinMaxPyramid
+from modules.spectrum import SpectrumAnalyzer, Window
+from modules.trigger import Trigger, TriggerMode, TriggerType
 from modules.theme import Theme
 from UI.mplwidget import MplWidget
-from PyQt5.QtWidgets import QTextBrowser, QScrollBar
+from UI.plotwidget import PlotWidget
+from modules.save import ConsoleHistory
+from PyQt5.QtWidgets import QTextBrowser, QScrollBar, QWidget
+from PyQt5.QtGui import QTextCursor
 from enum import Enum, auto
-import matplotlib.pyplot as plt
+import numpy as np
+
+if TYPE_CHECKING:
+    # Matplotlib takes most of the startup time, it is imported where it is first used.
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+    from matplotlib.axes import Axes
+
+# Legends and stem labels beyond this many series are left out, they would hide the plot.
+MAX_LABELS = 16
 
 class PlotType(Enum):
     STEM = auto()
     PLOT = auto()
+    SPECTRUM = auto()
+
+class XAxis(Enum):
+    INDEX = auto()
+    TIME = auto()
 @dataclass
 class MplConfig:
     x_min: float = 0
@@ -30,6 +50,21 @@ class MplConfig:
     is_grid_enable: bool = False
 
     plot_type: PlotType = PlotType.STEM
+    x_axis: XAxis = XAxis.INDEX
+
+    fft_size: int = 1024
+    fft_overlap: float = 0.5
+    fft_window: Window = Window.HANN
+    fft_averages: int = 1
+    is_peak_hold_enable: bool = False
+
+    trigger_mode: Optional[TriggerMode] = None
+    trigger_type: TriggerType = TriggerType.RISING
+    trigger_channel: int = 0
+    trigger_level: float = 0.0
+    trigger_high: float = 1.0
+    trigger_pre: int = 100
+    trigger_post: int = 400
 
     def get_xlim(self) -> List[float]:
         return [self.x_min, self.x_max]
@@ -37,12 +72,29 @@ class MplConfig:
     def get_ylim(self) -> List[float]:
         return [self.y_min, self.y_max]
 
+    def get_spectrum_config(self) -> Tuple[int, float, Window, int, bool]:
+        return (self.fft_size, self.fft_overlap, self.fft_window, self.fft_averages, self.is_peak_hold_enable)
+
+    def new_analyzer(self) -> SpectrumAnalyzer:
+        return SpectrumAnalyzer(*self.get_spectrum_config())
+
+    def get_trigger_config(self) -> Tuple[TriggerType, Optional[TriggerMode], int, float, float, int, int]:
+        return (self.trigger_type, self.trigger_mode, self.trigger_channel,
+                self.trigger_level, self.trigger_high, self.trigger_pre, self.trigger_post)
+
+    def new_trigger(self) -> Optional[Trigger]:
+        ''' Return a Trigger for PLOT, or None if the trigger is off. '''
+        if self.trigger_mode is None:
+            return None
+        return Trigger(*self.get_trigger_config())
+
 @dataclass
 class ConsoleDisplayer:
     ''' An displayer class to display data and message through console. '''
 
     def setup_event_handler(self) -> None:
         subscribe(EventType.NEW_FLOAT_EVENT, self.display_float)
+        subscribe(EventType.NEW_FLOAT_BATCH_EVENT, self.display_batch)
 
     def display_message(self, message: str) -> None:
         print(message, end='')
@@ -50,81 +102,608 @@ class ConsoleDisplayer:
     def display_float(self, datas: List[float]) -> None:
         print(', '.join([str(num) for num in datas]))
 
+    def display_batch(self, batch: SampleBatch) -> None:
+        for datas in batch.values:
+            self.display_float(datas)
+
 @dataclass
-class MplDisplayer:
-    ''' An displayer class to display data and message through canvas. '''
-    mpl_widget: MplWidget
+class PlotDisplayer(ABC):
+    ''' Stores the plotted samples and decides what to draw; subclasses paint it on a canvas.
+
+    Incoming data is only stored, in one ring buffer per source; the plot is
+    repainted when render() is called by the RenderScheduler. The axes are
+    laid out again only when the MplConfig or the channel count changes, or
+    when the data leaves the current limits; in between only the data of the
+    series is replaced.
+
+    With XAxis.TIME, PLOT draws every sample at its host timestamp, so gaps
+    and bursts in the stream are visible and several sources share one axis.
+    Sources without timestamps fall back to the sample index.
+
+    With decimation, long PLOT windows are drawn from the min/max summaries
+    of a MinMaxPyramid, about two points per horizontal pixel of the plot,
+    so the cost of a redraw does not grow with sample_num.
+
+    SPECTRUM feeds every source to a SpectrumAnalyzer and draws the magnitude
+    spectrum of each channel, followed by the peak-held spectra if enabled.
+
+    With a trigger mode set, PLOT also feeds the first source to a Trigger
+    and shows its last captured frame instead of the scrolling buffer, with
+    the trigger at x = 0; the plot stays frozen until the next capture.
+
+    Every series is labelled with its channel name, prefixed by the source
+    name for all but the first source, so channels of different ports can be
+    told apart.
+    '''
+    widget: QWidget
     mpl_config: MplConfig = field(default_factory=MplConfig)
-    sample_dict: dict = field(default_factory=dict)
+    samples: Dict[str, RingBuffer] = field(default_factory=dict)
+    decimation: bool = True
+    summaries: Dict[str, MinMaxPyramid] = field(init=False, default_factory=dict)
+    spectra: Dict[str, SpectrumAnalyzer] = field(init=False, default_factory=dict)
+    trigger: Optional[Trigger] = field(init=False, default=None)
+    trigger_source: Optional[str] = field(init=False, default=None)
+    pending_updates: int = field(init=False, default=0)
+    latest_datas: Dict[str, np.ndarray] = field(init=False, default_factory=dict)
+    names: Dict[str, List[str]] = field(init=False, default_factory=dict)
+    labels: List[str] = field(init=False, default_factory=list)
+
+    layout_config: Optional[MplConfig] = field(init=False, default=None)
+    layout_size: int = field(init=False, default=0)
+    layout_labels: List[str] = field(init=False, default_factory=list)
+    xlim: List[float] = field(init=False, default_factory=lambda: [0.0, 1.0])
+    ylim: List[float] = field(init=False, default_factory=lambda: [0.0, 1.0])
 
     def update_mpl_config(self, mpl_config: MplConfig) -> None:
+        if mpl_config.get_spectrum_config() != self.mpl_config.get_spectrum_config():
+            self.spectra.clear()
+        if mpl_config.get_trigger_config() != self.mpl_config.get_trigger_config():
+            self.trigger = mpl_config.new_trigger()
+            self.trigger_source = None
         self.mpl_config = mpl_config
+        for samples in self.samples.values():
+            samples.resize(mpl_config.sample_num)
+        if self.latest_datas:
+            self.pending_updates += 1
+
+    def take_over(self, other: 'PlotDisplayer') -> None:
+        ''' Continue with the configuration and the buffered samples of other. '''
+        self.mpl_config = other.mpl_config
+        self.samples = other.samples
+        self.summaries = other.summaries
+        self.spectra = other.spectra
+        self.trigger = other.trigger
+        self.trigger_source = other.trigger_source
+        self.latest_datas = other.latest_datas
+        self.names = other.names
+        self.layout_config = None
+        self.pending_updates += 1
 
     def setup_event_handler(self) -> None:
-        subscribe(EventType.NEW_FLOAT_EVENT, self.display_float)
+        subscribe(EventType.NEW_FLOAT_EVENT, self.display_float, Delivery.MAIN)
+        subscribe(EventType.NEW_FLOAT_BATCH_EVENT, self.display_batch, Delivery.MAIN)
+
+    def remove_event_handler(self) -> None:
+        unsubscribe(EventType.NEW_FLOAT_EVENT, self.display_float)
+        unsubscribe(EventType.NEW_FLOAT_BATCH_EVENT, self.display_batch)
     
     def display_message(self, message: str) -> None:
         pass
 
     def display_float(self, datas: List[float]) -> None:
-        self.mpl_widget.canvas.axes.cla()
-        
-        if self.mpl_config.title != '':
-            self.mpl_widget.canvas.axes.set_title(self.title)
-        
-        if self.mpl_config.xlabel != '':
-            self.mpl_widget.canvas.axes.set_xlabel(self.xlabel)
-        
-        if self.mpl_config.ylabel != '':
-            self.mpl_widget.canvas.axes.set_ylabel(self.ylabel)
-        
+        self.store(datas)
+        self.latest_datas[''] = np.asarray(datas, dtype=float)
+        self.names.pop('', None)
+        self.pending_updates += 1
+
+    def display_batch(self, batch: SampleBatch) -> None:
+        ''' Store every frame of the batch; the next render shows the newest frame. '''
+        self.store(batch.values, batch.source, batch.timestamps)
+        self.latest_datas[batch.source] = batch.values[-1]
+        if batch.names:
+            self.names[batch.source] = batch.names
+        else:
+            self.names.pop(batch.source, None)
+        self.pending_updates += 1
+
+    def render(self) -> None:
+        self.pending_updates = 0
+        if self.latest_datas:
+            self.draw(np.concatenate(list(self.latest_datas.values())))
+
+    def store(self, datas: np.ndarray, source: str = '', timestamps: Optional[np.ndarray] = None) -> None:
+        if self.mpl_config.plot_type == PlotType.PLOT:
+            if source not in self.samples:
+                self.samples[source] = RingBuffer(self.mpl_config.sample_num)
+                self.summaries[source] = MinMaxPyramid(self.samples[source])
+            self.samples[source].append(datas, timestamps)
+            if self.decimation:
+                self.summaries[source].update()
+            if self.trigger is not None:
+                if self.trigger_source is None:
+                    self.trigger_source = source
+                if source == self.trigger_source:
+                    self.trigger.update(datas, timestamps)
+
+        elif self.mpl_config.plot_type == PlotType.SPECTRUM:
+            if source not in self.spectra:
+                self.spectra[source] = self.mpl_config.new_analyzer()
+            self.spectra[source].update(datas, timestamps)
+
+    def remove_source(self, source: str) -> None:
+        ''' Forget the samples, spectra and channel names of source, e.g. once its port is removed. '''
+        self.samples.pop(source, None)
+        self.summaries.pop(source, None)
+        self.spectra.pop(source, None)
+        self.latest_datas.pop(source, None)
+        self.names.pop(source, None)
+        if source == self.trigger_source:
+            self.trigger = self.mpl_config.new_trigger()
+            self.trigger_source = None
+        self.pending_updates += 1
+
+    def clear(self) -> None:
+        self.samples.clear()
+        self.summaries.clear()
+        self.spectra.clear()
+        self.trigger = self.mpl_config.new_trigger()
+        self.trigger_source = None
+        self.latest_datas.clear()
+        self.names.clear()
+
+    def draw(self, datas: List[float]) -> None:
+        series = self.get_series(datas)
+        if not series:
+            return
+
+        if self.needs_layout(series):
+            self.layout(series)
+        else:
+            self.draw_series(series)
+
+    def layout(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        self.layout_config = self.mpl_config
+        self.layout_size = self.get_layout_size(series)
+        self.layout_labels = self.labels
+        self.xlim = self.get_xlim(series)
+        self.ylim = self.get_ylim(series)
+        self.draw_layout(series)
+
+    @abstractmethod
+    def draw_layout(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        ''' Redraw the axes with the current layout and the series. '''
+
+    @abstractmethod
+    def draw_series(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        ''' Redraw the series only, the layout is unchanged. '''
+
+    @abstractmethod
+    def plot_width(self) -> int:
+        ''' Width of the plot area in pixels. '''
+
+    def get_series(self, datas: List[float], decimation: Optional[bool] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        ''' Return the (x, y) data of every series for the current plot type.
+
+        labels is set to the label of every series, or of every stem for STEM.
+        '''
+        if self.mpl_config.plot_type == PlotType.STEM:
+            self.labels = [label for source, values in self.latest_datas.items()
+                           for label in self.get_labels(source, len(values))]
+            return [(np.arange(len(datas)), np.asarray(datas, dtype=float))]
+
+        series, labels = [], []
+        if self.mpl_config.plot_type == PlotType.SPECTRUM:
+            for source, analyzer in self.spectra.items():
+                spectra = [(analyzer.spectrum(), '')] + ([(analyzer.peak_spectrum(), ' (peak)')] if analyzer.peak_hold else [])
+                for spectrum, suffix in spectra:
+                    if spectrum is None:
+                        continue
+                    frequencies, magnitude = spectrum
+                    series.extend((frequencies, magnitude[:, channel]) for channel in range(magnitude.shape[1]))
+                    labels.extend(label + suffix for label in self.get_labels(source, magnitude.shape[1]))
+            self.labels = labels
+            return series
+
+        if self.trigger is not None:
+            series = self.get_frame_series()
+            self.labels = self.get_labels(self.trigger_source, len(series))
+            return series
+
+        for source in self.samples:
+            x, view = self.get_data(source, self.decimation if decimation is None else decimation)
+            if not len(x):
+                continue
+            series.extend((x, view[:, channel]) for channel in range(view.shape[1]))
+            labels.extend(self.get_labels(source, view.shape[1]))
+        self.labels = labels
+        return series
+
+    def get_labels(self, source: Optional[str], channel_count: int) -> List[str]:
+        ''' Return the labels of the channels of source, e.g. 'COM3: volts'. '''
+        names = self.names.get(source)
+        if names is None or len(names) != channel_count:
+            names = default_names(channel_count)
+        return [f'{source}: {name}' if source else name for name in names]
+
+    def label_axes(self, axes: 'Axes', series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        ''' Name the stems on the x axis, or the lines in a legend if there are several. '''
+        if len(self.labels) > MAX_LABELS:
+            return
+        if self.mpl_config.plot_type == PlotType.STEM:
+            if len(self.labels) == len(series[0][0]):
+                axes.set_xticks(series[0][0], self.labels)
+                axes.tick_params(axis='x', labelrotation=45 if len(self.labels) > 8 else 0)
+        elif len(self.labels) > 1:
+            axes.legend(self.labels, loc='upper right', fontsize='small')
+
+    def get_frame_series(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        ''' Return the series of the last captured trigger frame, none before the first capture. '''
+        frame = self.trigger.frame
+        if frame is None:
+            return []
+        x = self.trigger.frame_times
+        if self.mpl_config.x_axis is not XAxis.TIME or not np.isfinite(x).all():
+            x = np.arange(-self.trigger.pre, self.trigger.post)
+        return [(x, frame[:, channel]) for channel in range(frame.shape[1])]
+
+    def get_data(self, source: str, decimation: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        ''' Return the x values and the (n_points, n_channels) samples to draw for source. '''
+        use_times = self.mpl_config.x_axis is XAxis.TIME
+        if decimation:
+            return self.summaries[source].decimate(self.max_points(), use_times)
+
+        samples = self.samples[source]
+        if use_times and np.isfinite(samples.times()).all():
+            return samples.times(), samples.view()
+        return samples.indices(), samples.view()
+
+    def max_points(self) -> int:
+        return 2 * max(1, self.plot_width())
+
+    def get_layout_size(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> int:
+        ''' The number of stems, or the number of lines. '''
+        if self.mpl_config.plot_type == PlotType.STEM:
+            return len(series[0][0])
+        return len(series)
+
+    def get_xlabel(self) -> str:
+        if self.mpl_config.xlabel == '' and self.trigger is not None and self.mpl_config.plot_type == PlotType.PLOT:
+            return 'Time from trigger (s)' if self.mpl_config.x_axis is XAxis.TIME else 'Samples from trigger'
+        if self.mpl_config.xlabel == '' and self.mpl_config.x_axis is XAxis.TIME \
+                and self.mpl_config.plot_type == PlotType.PLOT:
+            return 'Time (s)'
+        if self.mpl_config.xlabel == '' and self.mpl_config.plot_type == PlotType.SPECTRUM:
+            if any(analyzer.sample_rate is not None for analyzer in self.spectra.values()):
+                return 'Frequency (Hz)'
+            return 'Frequency (cycles/sample)'
+        return self.mpl_config.xlabel
+
+    def needs_layout(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> bool:
+        if self.layout_config != self.mpl_config or self.layout_size != self.get_layout_size(series) \
+                or self.layout_labels != self.labels:
+            return True
+
+        x_min, x_max = self.xlim
+        # Frames in time differ slightly in length; lay out only when one does not fit.
+        if self.mpl_config.plot_type == PlotType.PLOT and self.trigger is not None:
+            if min(x[0] for x, _ in series) < x_min or max(x[-1] for x, _ in series) > x_max:
+                return True
+        elif self.mpl_config.plot_type == PlotType.PLOT and max(x[-1] for x, _ in series) > x_max:
+            return True
+        # The frequency axis changes with the estimated sample rate.
+        if self.mpl_config.plot_type == PlotType.SPECTRUM and self.mpl_config.is_auto_enable \
+                and max(x[-1] for x, _ in series) != x_max:
+            return True
+
+        if self.mpl_config.is_auto_enable:
+            y_low, y_high = self.get_data_ylim(series)
+            y_min, y_max = self.ylim
+            if y_low < y_min or y_high > y_max:
+                return True
+            # Shrink again once the limits the data needs, margin included, use a small part of the axis.
+            target_min, target_max = self.get_ylim(series)
+            if target_max - target_min < 0.5 * (y_max - y_min):
+                return True
+
+        return False
+
+    def get_xlim(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> List[float]:
+        x = series[0][0]
+        if self.mpl_config.plot_type == PlotType.PLOT and self.trigger is not None:
+            return [float(x[0]), float(x[-1])]
+
+        if self.mpl_config.plot_type == PlotType.PLOT and self.mpl_config.x_axis is XAxis.TIME:
+            # Same paging as below, with the time the buffered samples span as the page.
+            x_first = min(x[0] for x, _ in series)
+            x_last = max(x[-1] for x, _ in series)
+            width = max(x_last - x_first, 1e-3)
+            return [x_first, x_last + width / 4]
+
+        if self.mpl_config.plot_type == PlotType.PLOT:
+            # Scroll a page at a time so the limits move every sample_num / 4 samples only.
+            step = max(1, self.mpl_config.sample_num // 4)
+            x_max = max(max(x[-1] for x, _ in series) + step, self.mpl_config.sample_num + step)
+            return [x_max - self.mpl_config.sample_num - step, x_max]
+
+        if not self.mpl_config.is_auto_enable:
+            return self.mpl_config.get_xlim()
+        if self.mpl_config.plot_type == PlotType.SPECTRUM:
+            return [0.0, max(x[-1] for x, _ in series)]
+        return [-0.5, len(x) - 0.5]
+
+    def get_ylim(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> List[float]:
+        if not self.mpl_config.is_auto_enable:
+            return self.mpl_config.get_ylim()
+
+        y_low, y_high = self.get_data_ylim(series)
+        margin = 0.1 * (y_high - y_low) or 0.5
+        return [y_low - margin, y_high + margin]
+
+    def get_data_ylim(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[float, float]:
+        values = np.concatenate([y for _, y in series])
+        values = values[np.isfinite(values)]
+        y_low, y_high = (float(values.min()), float(values.max())) if values.size else (0.0, 0.0)
+        if self.mpl_config.plot_type in (PlotType.STEM, PlotType.SPECTRUM):
+            y_low, y_high = min(y_low, 0.0), max(y_high, 0.0)
+        return y_low, y_high
+
+    def save_snapshot(self, path: str, dpi: int = 200) -> None:
+        ''' Save the current plot with every buffered sample, not decimated, through Matplotlib.
+
+        The file type follows the extension of path, e.g. .png, .svg or .pdf.
+        '''
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=(8, 4.5), dpi=dpi)
+        FigureCanvasAgg(figure)
+        axes = figure.add_subplot(111)
+        datas = np.concatenate(list(self.latest_datas.values())) if self.latest_datas else np.array([])
+        series = self.get_series(datas, decimation=False)
+        if series:
+            if self.mpl_config.plot_type == PlotType.STEM:
+                axes.stem(*series[0])
+            else:
+                for x, y in series:
+                    axes.plot(x, y, linewidth=0.8)
+            self.label_axes(axes, series)
+            axes.set_xlim(self.get_xlim(series))
+            axes.set_ylim(self.get_ylim(series))
+        axes.set_title(self.mpl_config.title)
+        axes.set_xlabel(self.get_xlabel())
+        axes.set_ylabel(self.mpl_config.ylabel)
+        axes.grid(self.mpl_config.is_grid_enable)
+        figure.savefig(path, bbox_inches='tight')
+
+@dataclass
+class MplDisplayer(PlotDisplayer):
+    ''' An displayer class to display data and message through a Matplotlib canvas.
+
+    With fast_render the line (or stem) artists are created once per layout
+    and only their data is replaced afterwards. Updates are blitted over a
+    cached background.
+    '''
+    fast_render: bool = True
+    artists: list = field(init=False, default_factory=list)
+    background: object = field(init=False, default=None)
+    draw_connection: Optional[int] = field(init=False, default=None)
+
+    @property
+    def mpl_widget(self) -> MplWidget:
+        return self.widget
+
+    @property
+    def canvas(self) -> 'FigureCanvas':
+        return self.mpl_widget.canvas
+
+    @property
+    def axes(self) -> 'Axes':
+        return self.mpl_widget.canvas.axes
+
+    def setup_event_handler(self) -> None:
+        # The canvas is only built once the displayer is used.
+        if self.draw_connection is None:
+            self.draw_connection = self.canvas.mpl_connect('draw_event', self.on_draw)
+        super().setup_event_handler()
+
+    def draw(self, datas: List[float]) -> None:
+        if not self.fast_render:
+            self.draw_full(datas)
+            return
+        super().draw(datas)
+
+    def draw_full(self, datas: List[float]) -> None:
+        self.artists = []
+        self.layout_config = None
+        self.layout_axes()
+
         if not self.mpl_config.is_auto_enable:
             if self.mpl_config.plot_type is not PlotType.PLOT:
-                self.mpl_widget.canvas.axes.set_xlim(self.mpl_config.get_xlim())
-            self.mpl_widget.canvas.axes.set_ylim(self.mpl_config.get_ylim())
+                self.axes.set_xlim(self.mpl_config.get_xlim())
+            self.axes.set_ylim(self.mpl_config.get_ylim())
 
-        if self.mpl_config.is_grid_enable:
-            self.mpl_widget.canvas.axes.grid()
-        
         self.plot(datas)
-        self.mpl_widget.canvas.axes.get_figure().canvas.draw()
+        self.canvas.draw()
     
     def plot(self, datas: List[float]) -> None:
 
         if self.mpl_config.plot_type == PlotType.STEM:
             self.mpl_widget.canvas.axes.stem(range(len(datas)), datas)
 
+        elif self.mpl_config.plot_type == PlotType.PLOT and self.trigger is not None:
+            for x, y in self.get_frame_series():
+                self.mpl_widget.canvas.axes.plot(x, y)
+
         elif self.mpl_config.plot_type == PlotType.PLOT:
-            for index, data in enumerate(datas):
-                if not index in self.sample_dict:
-                    self.sample_dict[index] = []
-                self.sample_dict[index].append(data)
+            for source in self.samples:
+                self.mpl_widget.canvas.axes.plot(*self.get_data(source, self.decimation))
 
-            start_point = 0
-            end_point = len(self.sample_dict[index])
+        elif self.mpl_config.plot_type == PlotType.SPECTRUM:
+            for x, y in self.get_series(datas):
+                self.mpl_widget.canvas.axes.plot(x, y)
 
-            for index in self.sample_dict:
-                if len(self.sample_dict[index]) > self.mpl_config.sample_num:
-                    start_point = len(self.sample_dict[index]) - self.mpl_config.sample_num
+    def plot_width(self) -> int:
+        return int(self.axes.bbox.width)
 
-                self.mpl_widget.canvas.axes.plot(range(start_point, end_point), self.sample_dict[index][start_point:end_point])
+    def needs_layout(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> bool:
+        return self.background is None or super().needs_layout(series)
+
+    def draw_layout(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        self.layout_axes()
+
+        if self.mpl_config.plot_type == PlotType.STEM:
+            x, y = series[0]
+            container = self.axes.stem(x, y)
+            self.artists = [container.markerline, container.stemlines, container.baseline]
+        else:
+            self.artists = [self.axes.plot(x, y)[0] for x, y in series]
+        self.label_axes(self.axes, series)
+
+        for artist in self.artists:
+            artist.set_animated(True)
+
+        self.axes.set_xlim(self.xlim)
+        self.axes.set_ylim(self.ylim)
+        self.canvas.draw()
+
+    def draw_series(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        self.set_artist_data(series)
+        self.blit()
+
+    def layout_axes(self) -> None:
+        self.axes.cla()
+
+        if self.mpl_config.title != '':
+            self.axes.set_title(self.mpl_config.title)
+
+        if self.get_xlabel() != '':
+            self.axes.set_xlabel(self.get_xlabel())
+
+        if self.mpl_config.ylabel != '':
+            self.axes.set_ylabel(self.mpl_config.ylabel)
+
+        if self.mpl_config.is_grid_enable:
+            self.axes.grid(True)
+
+    def set_artist_data(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        if self.mpl_config.plot_type == PlotType.STEM:
+            x, y = series[0]
+            markerline, stemlines, baseline = self.artists
+            markerline.set_data(x, y)
+            stemlines.set_segments(np.stack([np.column_stack([x, np.zeros_like(y)]), np.column_stack([x, y])], axis=1))
+            baseline.set_data([x[0], x[-1]], [0, 0])
+        else:
+            for line, (x, y) in zip(self.artists, series):
+                line.set_data(x, y)
+
+    def blit(self) -> None:
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.axes.bbox)
+
+    def draw_artists(self) -> None:
+        for artist in self.artists:
+            self.axes.draw_artist(artist)
+
+    def on_draw(self, event) -> None:
+        ''' Cache the background after every full draw, including the ones caused by resizing. '''
+        if not self.fast_render or not self.artists:
+            self.background = None
+            return
+        self.background = self.canvas.copy_from_bbox(self.axes.bbox)
+        self.draw_artists()
+
+@dataclass
+class QtPlotDisplayer(PlotDisplayer):
+    ''' Displays data on a PlotWidget, drawn directly with QPainter.
+
+    Much cheaper per frame than Agg rasterization, which keeps tens of
+    thousands of points per frame at interactive rates. Use save_snapshot()
+    for publication quality output.
+    '''
+
+    @property
+    def plot_widget(self) -> PlotWidget:
+        return self.widget
+
+    def plot_width(self) -> int:
+        return int(self.plot_widget.plot_rect().width())
+
+    def draw_layout(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        self.plot_widget.set_layout(
+            self.xlim, self.ylim,
+            title=self.mpl_config.title,
+            xlabel=self.get_xlabel(),
+            ylabel=self.mpl_config.ylabel,
+            is_grid_enable=self.mpl_config.is_grid_enable,
+            is_stem=self.mpl_config.plot_type == PlotType.STEM,
+            labels=self.labels if len(self.labels) <= MAX_LABELS else [],
+        )
+        self.draw_series(series)
+
+    def draw_series(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        # The widget paints later, copy the views before the ring buffer overwrites them.
+        self.plot_widget.set_series([(np.array(x), np.array(y)) for x, y in series])
 
 
 @dataclass
 class TextBrowserDisplayer:
+    ''' Displays the received text, keeping at most max_lines lines in the widget.
+
+    Messages are collected and inserted once per render() call. The complete
+    text is written to a ConsoleHistory on disk so it can still be saved.
+    '''
     text_browser: QTextBrowser
     is_auto_scroll_enabled: bool = True
+    max_lines: int = 5000
+    history: ConsoleHistory = field(default_factory=ConsoleHistory)
+    pending_updates: int = field(init=False, default=0)
+    pending_messages: List[str] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.set_max_lines(self.max_lines)
+
+    def set_max_lines(self, max_lines: int) -> None:
+        ''' The oldest lines are removed from the widget once max_lines is exceeded. 0 means no limit. '''
+        self.max_lines = max_lines
+        self.text_browser.document().setMaximumBlockCount(max_lines)
 
     def auto_scroll_enabled(self, enable: bool) -> None:
         self.is_auto_scroll_enabled = enable
+        if enable:
+            self.scroll_to_end()
 
     def setup_event_handler(self) -> None:
-        subscribe(EventType.NEW_MESSAGE_EVENT, self.display_message)
+        subscribe(EventType.NEW_MESSAGE_EVENT, self.display_message, Delivery.MAIN)
 
     def display_message(self, message: str) -> None:
-        self.text_browser.insertPlainText(message)
+        self.history.write(message)
+        self.pending_messages.append(message)
+        self.pending_updates += 1
+
+    def render(self) -> None:
+        self.pending_updates = 0
+        if not self.pending_messages:
+            return
+        text = ''.join(self.pending_messages)
+        self.pending_messages.clear()
+
+        cursor = QTextCursor(self.text_browser.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
         if self.is_auto_scroll_enabled:
-            self.text_browser.verticalScrollBar().setValue(self.text_browser.verticalScrollBar().maximum())
+            self.scroll_to_end()
+
+    def scroll_to_end(self) -> None:
+        self.text_browser.verticalScrollBar().setValue(self.text_browser.verticalScrollBar().maximum())
+
+    def clear(self) -> None:
+        self.pending_messages.clear()
+        self.text_browser.clear()
+        self.history.clear()
     
     def display_float(self, datas: List[float]) -> None:
         pass
+
+    def display_batch(self, batch: SampleBatch) -> None:
+        pass
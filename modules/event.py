@@ -1,19 +1,238 @@
+''' A small publish / subscribe event bus.
+
+By default subscribers are called synchronously by post_event. A subscriber
+can instead ask for its own queue, drained either by a dedicated thread
+(Delivery.THREAD) or by the main thread in dispatch_pending(), which the GUI
+calls from its Qt timer (Delivery.MAIN). Queued subscriptions have a depth
+limit and a QueuePolicy deciding what happens when it is reached.
+'''
+from dataclasses import dataclass, field
+from collections import deque
 from enum import Enum, auto
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import time
+
+from modules.metrics import metrics
+from modules.sample import SampleBatch
 
 subscribers = dict()
 
 class EventType(Enum):
     NEW_MESSAGE_EVENT = auto()
     NEW_FLOAT_EVENT = auto()
+    NEW_FLOAT_BATCH_EVENT = auto()
+
+PAYLOAD_TYPES = {
+    EventType.NEW_MESSAGE_EVENT: str,
+    EventType.NEW_FLOAT_EVENT: (list, tuple),
+    EventType.NEW_FLOAT_BATCH_EVENT: SampleBatch,
+}
+
+class Delivery(Enum):
+    SYNC = auto()
+    THREAD = auto()
+    MAIN = auto()
+
+class QueuePolicy(Enum):
+    ''' What a queued subscription does when max_depth events are pending.
+
+    LOSSLESS makes the poster wait for the subscriber (backpressure), LATEST
+    keeps only the newest pending event and DROP_OLDEST discards the oldest.
+    '''
+    LOSSLESS = auto()
+    LATEST = auto()
+    DROP_OLDEST = auto()
+
+synchronous = False
+check_types = False
+
+@dataclass(eq=False)
+class Subscription:
+    ''' One handler of one event type, with its delivery counters.
+
+    latency is measured from post_event to the end of the handler, so for
+    queued deliveries it includes the time spent waiting in the queue.
+    '''
+    event: EventType
+    fn: Callable[[Any], None]
+    delivery: Delivery = Delivery.SYNC
+    policy: QueuePolicy = QueuePolicy.LOSSLESS
+    max_depth: int = 1024
+
+    delivered: int = field(init=False, default=0)
+    dropped: int = field(init=False, default=0)
+    latency_total: float = field(init=False, default=0.0)
+    latency_max: float = field(init=False, default=0.0)
+    _pending: deque = field(init=False, default_factory=deque)
+    _condition: threading.Condition = field(init=False, default_factory=threading.Condition)
+    _thread: Optional[threading.Thread] = field(init=False, default=None)
+    _busy: bool = field(init=False, default=False)
+    _closed: bool = field(init=False, default=False)
+
+    @property
+    def name(self) -> str:
+        return getattr(self.fn, '__qualname__', repr(self.fn))
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency_total / self.delivered if self.delivered else 0.0
+
+    def post(self, data: Any) -> None:
+        if synchronous or self.delivery is Delivery.SYNC:
+            self.deliver(data, time.perf_counter())
+            return
+
+        with self._condition:
+            while len(self._pending) >= self.max_depth:
+                if self.policy is QueuePolicy.LATEST or self.policy is QueuePolicy.DROP_OLDEST:
+                    self._pending.popleft()
+                    self.dropped += 1
+                elif self.delivery is Delivery.MAIN and threading.current_thread() is threading.main_thread():
+                    # Waiting would deadlock the thread that drains the queue, catch up instead.
+                    self._condition.release()
+                    try:
+                        self.drain()
+                    finally:
+                        self._condition.acquire()
+                else:
+                    self._condition.wait(0.1)
 
-def subscribe(event: EventType, fn):
+            if self.policy is QueuePolicy.LATEST and self._pending:
+                self._pending.clear()
+                self.dropped += 1
+            self._pending.append((data, time.perf_counter()))
+            self._condition.notify_all()
+
+        if self.delivery is Delivery.THREAD and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f'event-{self.name}', daemon=True)
+            self._thread.start()
+
+    def deliver(self, data: Any, posted: float) -> None:
+        self.fn(data)
+        latency = time.perf_counter() - posted
+        self.delivered += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def drain(self) -> int:
+        ''' Deliver every pending event on the calling thread. Return how many were delivered. '''
+        count = 0
+        while True:
+            with self._condition:
+                if not self._pending:
+                    self._condition.notify_all()
+                    return count
+                data, posted = self._pending.popleft()
+                self._busy = True
+            try:
+                self.deliver(data, posted)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+            count += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        ''' Wait until every pending event has been handled. Return False on timeout. '''
+        if self.delivery is not Delivery.THREAD:
+            self.drain()
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining if remaining is not None else 0.1)
+        return True
+
+    def close(self) -> None:
+        ''' Deliver what is pending and stop the delivery thread. '''
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._pending:
+                    return
+            self.drain()
+
+def subscribe(event: EventType, fn, delivery: Delivery = Delivery.SYNC,
+              policy: QueuePolicy = QueuePolicy.LOSSLESS, max_depth: int = 1024) -> Subscription:
     if not event in subscribers:
         subscribers[event] = []
-    subscribers[event].append(fn)
+    subscription = Subscription(event, fn, delivery, policy, max_depth)
+    subscribers[event].append(subscription)
+    return subscription
+
+def unsubscribe(event: EventType, fn):
+    for subscription in list(subscribers.get(event, [])):
+        if subscription.fn == fn:
+            subscribers[event].remove(subscription)
+            subscription.close()
 
 def post_event(event: EventType, data):
+    if check_types and not isinstance(data, PAYLOAD_TYPES[event]):
+        raise TypeError(f'{event.name} expects {PAYLOAD_TYPES[event]}, got {type(data).__name__}')
+
     if not event in subscribers:
         return
 
-    for fn in subscribers[event]:
-        fn(data)
+    start = time.perf_counter()
+    for subscription in subscribers[event]:
+        subscription.post(data)
+    metrics.record('post_event', time.perf_counter() - start, 1)
+
+def dispatch_pending() -> int:
+    ''' Deliver the pending events of every Delivery.MAIN subscription. Call this from the main thread. '''
+    count = 0
+    for subscriptions in list(subscribers.values()):
+        for subscription in subscriptions:
+            if subscription.delivery is Delivery.MAIN:
+                count += subscription.drain()
+    return count
+
+def set_synchronous(enabled: bool) -> None:
+    ''' Deliver every event synchronously in post_event, whatever the subscriptions asked for. Meant for tests. '''
+    global synchronous
+    synchronous = enabled
+
+def set_type_checking(enabled: bool) -> None:
+    ''' Make post_event raise TypeError for payloads that do not match PAYLOAD_TYPES. '''
+    global check_types
+    check_types = enabled
+
+def get_subscriptions() -> List[Subscription]:
+    return [subscription for subscriptions in subscribers.values() for subscription in subscriptions]
+
+def shutdown() -> None:
+    ''' Deliver everything still pending and stop the delivery threads. '''
+    for subscription in get_subscriptions():
+        subscription.close()
+
+def stats() -> List[Dict[str, object]]:
+    ''' Return the delivery counters of every subscription. '''
+    return [{
+        'event': subscription.event.name,
+        'subscriber': subscription.name,
+        'delivery': subscription.delivery.name,
+        'policy': subscription.policy.name,
+        'depth': subscription.depth,
+        'delivered': subscription.delivered,
+        'dropped': subscription.dropped,
+        'mean_latency_ms': subscription.mean_latency * 1e3,
+        'max_latency_ms': subscription.latency_max * 1e3,
+    } for subscription in get_subscriptions()]
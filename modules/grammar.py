@@ -0,0 +1,284 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+import re
+
+import numpy as np
+
+class GrammarType(Enum):
+    DELIMITED = auto()
+    CSV_HEADER = auto()
+    KEY_VALUE = auto()
+    REGEX = auto()
+
+HEADER_FIELD = re.compile(r'[A-Za-z_][\w .()/%\[\]-]*')
+
+def is_number(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+@lru_cache(maxsize=16)
+def compile_pattern(pattern: str) -> Tuple['re.Pattern', Tuple[str, ...]]:
+    ''' Compile a REGEX grammar pattern and name its groups; named groups keep their name. '''
+    try:
+        regex = re.compile(pattern)
+    except re.error as error:
+        raise ValueError(f'Invalid pattern {pattern!r}: {error}') from None
+    if regex.groups == 0:
+        raise ValueError(f'Pattern {pattern!r} has no group, put every channel in ( )')
+    group_names = {index: name for name, index in regex.groupindex.items()}
+    return regex, tuple(group_names.get(index, f'ch{index - 1}') for index in range(1, regex.groups + 1))
+
+@dataclass
+class FrameGrammar(ABC):
+    ''' Converts the text of frames into sample batches.
+
+    parse_batch() returns (indices, values) pairs: (n_frames, n_channels)
+    arrays with the indices in frames of the rows they hold. Frames that do
+    not hold data in this grammar at all, such as debug prints in a mixed
+    stream, are counted as text; frames that do but fail to convert are
+    counted as malformed. names, when known, names the channels of the
+    last batch.
+    '''
+    delimiter: str = ','
+    names: Optional[List[str]] = field(init=False, default=None)
+    malformed_count: int = field(init=False, default=0)
+    text_count: int = field(init=False, default=0)
+
+    @abstractmethod
+    def parse_batch(self, frames: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        ''' Convert frames into batches, see the class docstring. '''
+
+    def split(self, frame: str) -> List[str]:
+        return frame.split(self.delimiter) if self.delimiter else [frame]
+
+@dataclass
+class DelimitedGrammar(FrameGrammar):
+    ''' Frames of numbers separated by delimiter, one channel per field. '''
+
+    def parse_batch(self, frames: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        ''' One array per run of frames with the same channel count. '''
+        if self.delimiter:
+            runs = groupby(frames, key=lambda frame: frame.count(self.delimiter) + 1)
+        else:
+            runs = groupby(frames, key=lambda frame: 1)
+
+        batches = []
+        first = 0
+        for channel_count, run in runs:
+            run = list(run)
+            indices, values = self.convert_run(run, channel_count)
+            if values.size:
+                batches.append((indices + first, values))
+            first += len(run)
+        return batches
+
+    def convert_run(self, frames: List[str], channel_count: int) -> Tuple[np.ndarray, np.ndarray]:
+        fields = self.delimiter.join(frames).split(self.delimiter) if self.delimiter else frames
+        try:
+            return np.arange(len(frames)), np.array(fields, dtype=np.float64).reshape(len(frames), channel_count)
+        except ValueError:
+            pass
+
+        indices, rows = [], []
+        for index, frame in enumerate(frames):
+            fields = self.split(frame)
+            try:
+                rows.append(list(map(float, fields)))
+                indices.append(index)
+            except ValueError:
+                self.reject(fields)
+        return np.array(indices, dtype=np.intp), np.array(rows, dtype=np.float64).reshape(len(rows), channel_count)
+
+    def reject(self, fields: List[str]) -> None:
+        ''' Count a frame that is not all numbers as text if none of its fields is one. '''
+        if any(is_number(text) for text in fields):
+            self.malformed_count += 1
+        else:
+            self.text_count += 1
+
+@dataclass
+class CsvHeaderGrammar(DelimitedGrammar):
+    ''' Delimited frames, where a frame of names such as 'time,volts,amps' names the channels.
+
+    A frame of names is only taken as the header once the next data frame
+    has as many fields; otherwise, as for a debug print such as 'Init done,
+    starting ADC', it is counted as text. The names hold until the next
+    header, e.g. after the device restarts. Frames of a single field are
+    only taken as a header if it is one word.
+    '''
+    pending: List[List[str]] = field(init=False, default_factory=list)
+    _rejected: List[Optional[List[str]]] = field(init=False, default_factory=list)
+
+    def reject(self, fields: List[str]) -> None:
+        fields = [text.strip() for text in fields]
+        if all(HEADER_FIELD.fullmatch(text) for text in fields) and (len(fields) > 1 or fields[0].isidentifier()):
+            self._rejected.append(fields)
+        else:
+            self._rejected.append(None)
+            super().reject(fields)
+
+    def convert_run(self, frames: List[str], channel_count: int) -> Tuple[np.ndarray, np.ndarray]:
+        self._rejected = []
+        indices, values = super().convert_run(frames, channel_count)
+        if not self._rejected:
+            if self.pending and len(indices):
+                self.resolve(channel_count)
+            return indices, values
+
+        # Replay the run in order: a header waits for the data frame after it.
+        is_data = np.zeros(len(frames), dtype=bool)
+        is_data[indices] = True
+        rejected = iter(self._rejected)
+        for index in range(len(frames)):
+            if is_data[index]:
+                if self.pending:
+                    self.resolve(channel_count)
+                continue
+            names = next(rejected)
+            if names is not None:
+                self.pending.append(names)
+        self._rejected = []
+        return indices, values
+
+    def resolve(self, channel_count: int) -> None:
+        ''' Take the last pending header with channel_count names, count the others as text.
+
+        Headers without spaces in their names are preferred, debug prints
+        rarely have none.
+        '''
+        matching = [names for names in self.pending if len(names) == channel_count]
+        if matching:
+            words = [names for names in matching if not any(' ' in text for text in names)]
+            self.names = (words or matching)[-1]
+        self.text_count += len(self.pending) - (1 if matching else 0)
+        self.pending = []
+
+    def parse_batch(self, frames: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        batches = super().parse_batch(frames)
+        if self.names is not None and any(values.shape[1] != len(self.names) for _, values in batches):
+            # The header does not describe these frames.
+            self.names = None
+        return batches
+
+@dataclass
+class KeyValueGrammar(FrameGrammar):
+    ''' Frames of key=value pairs separated by delimiter, or by whitespace without one.
+
+    Every key seen becomes a channel, in order of first appearance, and keys
+    a frame does not hold are NaN in its row, so frames may carry different
+    subsets of the keys. All the values of a call are converted together.
+    A value that is not a number is NaN and makes its frame malformed; a
+    frame without any number, such as 'state=idle', is dropped.
+    '''
+    columns: Dict[str, int] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.names = []
+
+    def parse_batch(self, frames: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        indices, rows, keys, fields = [], [], [], []
+        for index, frame in enumerate(frames):
+            pairs = [pair.partition('=') for pair in (frame.split(self.delimiter) if self.delimiter else frame.split())]
+            pairs = [(key.strip(), value) for key, separator, value in pairs if separator and key.strip()]
+            if not pairs:
+                self.text_count += 1
+                continue
+            row = len(indices)
+            indices.append(index)
+            for key, value in pairs:
+                rows.append(row)
+                keys.append(key)
+                fields.append(value)
+        if not indices:
+            return []
+
+        indices, rows = np.array(indices, dtype=np.intp), np.array(rows, dtype=np.intp)
+        try:
+            numbers = np.array(fields, dtype=np.float64)
+        except ValueError:
+            is_valid = np.array([is_number(text) for text in fields])
+            numbers = np.array([float(text) if valid else np.nan for text, valid in zip(fields, is_valid)])
+            self.malformed_count += len(np.unique(rows[~is_valid]))
+            # Frames without a single number, such as 'state=idle', are dropped; the others keep NaN.
+            kept = np.zeros(len(indices), dtype=bool)
+            kept[rows[is_valid]] = True
+            if not kept.all():
+                is_kept = kept[rows]
+                rows = (np.cumsum(kept) - 1)[rows[is_kept]]
+                keys = [key for key, keep in zip(keys, is_kept) if keep]
+                numbers = numbers[is_kept]
+                indices = indices[kept]
+            if not len(indices):
+                return []
+
+        columns = []
+        for key in keys:
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = len(self.names)
+                self.names.append(key)
+            columns.append(column)
+        values = np.full((len(indices), len(self.names)), np.nan)
+        values[rows, columns] = numbers
+        return [(indices, values)]
+
+@dataclass
+class RegexGrammar(FrameGrammar):
+    ''' Frames searched with a regular expression, one channel per group.
+
+    Named groups such as (?P<volts>\\S+) name their channel, and optional
+    groups that did not match are NaN. Frames the pattern does not match
+    are text.
+    '''
+    pattern: str = r'(\S+)'
+    regex: 're.Pattern' = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.regex, names = compile_pattern(self.pattern)
+        self.names = list(names)
+
+    def parse_batch(self, frames: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        indices, groups = [], []
+        search = self.regex.search
+        for index, frame in enumerate(frames):
+            match = search(frame)
+            if match is None:
+                continue
+            indices.append(index)
+            groups.append(match.groups())
+        self.text_count += len(frames) - len(indices)
+        if not indices:
+            return []
+
+        try:
+            return [(np.array(indices, dtype=np.intp), np.array(groups, dtype=np.float64))]
+        except (TypeError, ValueError):
+            pass
+
+        kept, rows = [], []
+        for index, row in zip(indices, groups):
+            try:
+                rows.append([np.nan if text is None else float(text) for text in row])
+                kept.append(index)
+            except (TypeError, ValueError):
+                self.malformed_count += 1
+        if not rows:
+            return []
+        return [(np.array(kept, dtype=np.intp), np.array(rows, dtype=np.float64))]
+
+def new_grammar(grammar_type: GrammarType, delimiter: str = ',', pattern: str = '') -> FrameGrammar:
+    ''' Raises ValueError if pattern is not a valid REGEX pattern. '''
+    if grammar_type is GrammarType.REGEX:
+        return RegexGrammar(delimiter, pattern)
+    return {
+        GrammarType.DELIMITED: DelimitedGrammar,
+        GrammarType.CSV_HEADER: CsvHeaderGrammar,
+        GrammarType.KEY_VALUE: KeyValueGrammar,
+    }[grammar_type](delimiter)
@@ -0,0 +1,143 @@
+''' Pipeline instrumentation.
+
+Every stage of the receive path reports the duration of each call and the
+number of items (bytes, frames, ...) it handled to the module level
+`metrics` registry. A stage keeps totals, a latency histogram and the calls
+of the last few seconds, from which rates are computed.
+'''
+from dataclasses import dataclass, field
+from collections import deque
+from typing import Any, Dict, IO, Optional
+import bisect
+import json
+import threading
+import time
+
+import numpy as np
+
+LATENCY_BINS = np.logspace(-6, 1, 7 * 10 + 1).tolist()
+
+@dataclass
+class StageMetrics:
+    ''' Counters of one pipeline stage.
+
+    The histogram has one bin per interval of LATENCY_BINS, from 1 us to 10 s,
+    plus a first and a last bin for shorter and longer calls. Rates are
+    computed over the calls of the last window seconds, or since the first
+    call if that is more recent.
+    '''
+    name: str
+    window: float = 5.0
+    calls: int = field(init=False, default=0)
+    items: int = field(init=False, default=0)
+    total_time: float = field(init=False, default=0.0)
+    max_time: float = field(init=False, default=0.0)
+    started: Optional[float] = field(init=False, default=None)
+    histogram: np.ndarray = field(init=False, default_factory=lambda: np.zeros(len(LATENCY_BINS) + 1, dtype=np.int64))
+    _recent: deque = field(init=False, default_factory=deque)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def record(self, latency: float, items: int = 0) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            if self.started is None:
+                self.started = now - latency
+            self.calls += 1
+            self.items += items
+            self.total_time += latency
+            self.max_time = max(self.max_time, latency)
+            self.histogram[bisect.bisect_right(LATENCY_BINS, latency)] += 1
+            self._recent.append((now, items))
+            self._prune(now)
+
+    def rate(self) -> float:
+        ''' Items per second over the last window seconds. '''
+        with self._lock:
+            return sum(items for _, items in self._recent) / self._span()
+
+    def call_rate(self) -> float:
+        ''' Calls per second over the last window seconds. '''
+        with self._lock:
+            return len(self._recent) / self._span()
+
+    def percentile(self, q: float) -> float:
+        ''' Upper bound in seconds of the histogram bin holding the q-th percentile. '''
+        if self.calls == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.histogram), q / 100 * self.calls))
+        return LATENCY_BINS[min(index, len(LATENCY_BINS) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'items': self.items,
+            'items_per_s': self.rate(),
+            'calls_per_s': self.call_rate(),
+            'mean_ms': self.total_time / self.calls * 1e3 if self.calls else 0.0,
+            'p50_ms': self.percentile(50) * 1e3,
+            'p99_ms': self.percentile(99) * 1e3,
+            'max_ms': self.max_time * 1e3,
+            'histogram': {f'{upper:.3g}': int(count) for upper, count
+                          in zip(LATENCY_BINS + [float('inf')], self.histogram) if count},
+        }
+
+    def _span(self) -> float:
+        now = time.perf_counter()
+        self._prune(now)
+        return max(min(self.window, now - (now if self.started is None else self.started)), 1e-3)
+
+    def _prune(self, now: float) -> None:
+        while self._recent and now - self._recent[0][0] > self.window:
+            self._recent.popleft()
+
+@dataclass
+class Metrics:
+    ''' A registry of StageMetrics, created on first use. '''
+    enabled: bool = True
+    stages: Dict[str, StageMetrics] = field(init=False, default_factory=dict)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def stage(self, name: str) -> StageMetrics:
+        stage = self.stages.get(name)
+        if stage is None:
+            with self._lock:
+                stage = self.stages.setdefault(name, StageMetrics(name))
+        return stage
+
+    def record(self, name: str, latency: float, items: int = 0) -> None:
+        if self.enabled:
+            self.stage(name).record(latency, items)
+
+    def rate(self, name: str) -> float:
+        stage = self.stages.get(name)
+        return 0.0 if stage is None else stage.rate()
+
+    def call_rate(self, name: str) -> float:
+        stage = self.stages.get(name)
+        return 0.0 if stage is None else stage.call_rate()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages = {}
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stage.snapshot() for name, stage in list(self.stages.items())}
+
+metrics = Metrics()
+
+@dataclass
+class MetricsLog:
+    ''' Appends snapshots to a JSON lines file, one object per line. '''
+    path: str
+    _file: Optional[IO[str]] = field(init=False, default=None)
+
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        self._file.write(json.dumps(snapshot) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
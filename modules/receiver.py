@@ -1,8 +1,13 @@
 from dataclasses import dataclass, field
-from typing import Protocol
+from typing import IO, Optional, Protocol
+import codecs
+import threading
+import time
 import serial
 import numpy as np
 
+from modules import capture
+
 class Receiver(Protocol):
     ''' A protocol to define how receiver should communicate with other object'''
 
@@ -18,12 +23,30 @@ class Receiver(Protocol):
     def receive_message() -> str:
         ...
 
+    ''' Block until data arrives or the read times out, then return the raw bytes. '''
+    def receive_bytes() -> bytes:
+        ...
+
+    ''' Wake up a blocked receive_bytes call. '''
+    def cancel_read() -> None:
+        ...
+
+    ''' Seconds the last receive_bytes call spent waiting for data to arrive. '''
+    wait_time: float
+
+def new_decoder() -> codecs.IncrementalDecoder:
+    ''' A UTF-8 decoder that keeps a multi-byte character split across reads for the next call. '''
+    return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
 @dataclass
 class SerialReceiver:
     my_serial: serial.Serial() = field(init=False, default_factory=serial.Serial)
     connected: bool = field(init=False, default=False)
+    decoder: codecs.IncrementalDecoder = field(init=False, default_factory=new_decoder)
+    wait_time: float = field(init=False, default=0.0)
 
     def connect(self, port: str, baudrate: int, timeout: float) -> bool:
+        self.decoder.reset()
         try:
             self.my_serial.port = port
             self.my_serial.baudrate = baudrate
@@ -44,13 +67,34 @@ class SerialReceiver:
     def receive_message(self) -> str:
         if self.connected is not True:
             return ''
-        return self.my_serial.read(self.my_serial.in_waiting).decode('utf-8')
+        return self.decoder.decode(self.my_serial.read(self.my_serial.in_waiting))
+
+    def receive_bytes(self) -> bytes:
+        self.wait_time = 0.0
+        if self.connected is not True:
+            return b''
+        waiting = self.my_serial.in_waiting
+        if waiting:
+            return self.my_serial.read(waiting)
+
+        # Nothing buffered yet: block for the first byte, then take what arrived with it.
+        start = time.perf_counter()
+        data = self.my_serial.read(1)
+        self.wait_time = time.perf_counter() - start
+        waiting = self.my_serial.in_waiting if data else 0
+        return data + self.my_serial.read(waiting) if waiting else data
+
+    def cancel_read(self) -> None:
+        if self.my_serial.is_open:
+            self.my_serial.cancel_read()
 
 import random
 @dataclass
 class SimulationReceiver:
 
     counter: float = 0.0
+    period: float = 0.02
+    wait_time: float = field(init=False, default=0.0)
 
     def connect(self, *args) -> bool:
         return True
@@ -71,3 +115,128 @@ class SimulationReceiver:
         self.counter += 0.1
         msg = '$$$' + ','.join(str(num).format() for num in simulate_data) + '###' + '\n'
         return msg
+
+    def receive_bytes(self) -> bytes:
+        start = time.perf_counter()
+        time.sleep(self.period)
+        self.wait_time = time.perf_counter() - start
+        return self.receive_message().encode('utf-8')
+
+    def cancel_read(self) -> None:
+        pass
+
+@dataclass
+class FileReplayReceiver:
+    ''' Replays a recorded text log or binary capture as if it arrived on a serial port.
+
+    speed is a multiple of real time, 0 replays as fast as possible. Text logs
+    carry no timestamps, so they are paced at the baudrate passed to connect().
+    Capture rows are paced by their timestamps and formatted as text frames
+    with start_string, delimiter and end_string. If connect() fails, error
+    tells why, e.g. a truncated capture header.
+    '''
+    speed: float = 1.0
+    chunk_size: int = 65536
+    start_string: str = '$$$'
+    end_string: str = '###'
+    delimiter: str = ','
+    connected: bool = field(init=False, default=False)
+    finished: bool = field(init=False, default=False)
+    wait_time: float = field(init=False, default=0.0)
+    error: Optional[Exception] = field(init=False, default=None)
+    decoder: codecs.IncrementalDecoder = field(init=False, default_factory=new_decoder)
+    _file: Optional[IO[bytes]] = field(init=False, default=None)
+    _capture: Optional[capture.CaptureReader] = field(init=False, default=None)
+    _position: int = field(init=False, default=0)
+    _bytes_per_second: float = field(init=False, default=0.0)
+    _started: float = field(init=False, default=0.0)
+    _cancel: threading.Event = field(init=False, default_factory=threading.Event)
+
+    def connect(self, path: str, baudrate: int = 115200, timeout: float = 0.5) -> bool:
+        self.disconnect()
+        self.decoder.reset()
+        self.finished = False
+        self._position = 0
+        self._bytes_per_second = baudrate / 10
+        self._cancel.clear()
+        self.error = None
+        try:
+            with open(path, 'rb') as f:
+                is_capture = f.read(len(capture.MAGIC)) == capture.MAGIC
+            if is_capture:
+                self._capture = capture.CaptureReader(path)
+            else:
+                self._file = open(path, 'rb')
+            self.connected = True
+        except (OSError, ValueError) as error:
+            self.error = error
+            self.connected = False
+        self._started = time.perf_counter()
+        return self.connected
+
+    def disconnect(self) -> bool:
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._capture = None
+        self.connected = False
+        return self.connected
+
+    def receive_message(self) -> str:
+        return self.decoder.decode(self.receive_bytes())
+
+    def receive_bytes(self) -> bytes:
+        self.wait_time = 0.0
+        if self.connected is not True or self.finished:
+            start = time.perf_counter()
+            self._cancel.wait(0.05)
+            self.wait_time = time.perf_counter() - start
+            return b''
+        if self._capture is not None:
+            return self.receive_rows()
+        return self.receive_text()
+
+    def cancel_read(self) -> None:
+        self._cancel.set()
+
+    def receive_text(self) -> bytes:
+        size = self.chunk_size
+        if self.speed > 0:
+            # Read about 20 ms worth of data so the replay is as smooth as a serial port.
+            size = max(1, min(size, int(self._bytes_per_second * self.speed * 0.02)))
+            self.wait_until(self._position / (self._bytes_per_second * self.speed))
+
+        data = self._file.read(size)
+        self._position += len(data)
+        if len(data) < size:
+            self.finished = True
+        return data
+
+    def receive_rows(self) -> bytes:
+        timestamps = self._capture.timestamps
+        if self._position >= len(timestamps):
+            self.finished = True
+            return b''
+
+        stop = min(self._position + self.chunk_size // 64 + 1, len(timestamps))
+        if self.speed > 0:
+            self.wait_until((timestamps[self._position] - timestamps[0]) / self.speed)
+            elapsed = (time.perf_counter() - self._started) * self.speed
+            stop = self._position + int(np.searchsorted(timestamps[self._position:stop], timestamps[0] + elapsed, side='right'))
+            stop = max(stop, self._position + 1)
+
+        values = self._capture.values[self._position:stop]
+        self._position = stop
+
+        # The strings are part of a % format, a literal % in them must be doubled.
+        start_string, delimiter, end_string = (text.replace('%', '%%') for text in (self.start_string, self.delimiter, self.end_string))
+        row_format = start_string + delimiter.join(['%.9g'] * values.shape[1]) + end_string + '\n'
+        return ''.join(row_format % tuple(row) for row in values.tolist()).encode('utf-8')
+
+    def wait_until(self, offset: float) -> None:
+        ''' Sleep until offset seconds after connect(), or until cancel_read(). '''
+        start = time.perf_counter()
+        delay = self._started + offset - start
+        if delay > 0:
+            self._cancel.wait(delay)
+            self.wait_time += time.perf_counter() - start
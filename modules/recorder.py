@@ -0,0 +1,262 @@
+from dataclasses import dataclass, field
+from collections import deque
+from datetime import datetime
+from enum import Enum, auto
+from typing import Any, Callable, Dict, Hashable, List, Optional, IO, Sequence, Tuple
+import io
+import os
+import threading
+import time
+
+import numpy as np
+
+from modules.acquisition import Chunk
+from modules.capture import default_names, encode_header, encode_rows
+from modules.event import EventType, Delivery, Subscription, subscribe
+from modules.sample import SampleBatch
+
+@dataclass
+class RotatingWriter:
+    ''' Writes items to rotating files on a background thread.
+
+    write() only appends to a bounded deque and never blocks; items that do
+    not fit are counted in items_dropped. The writer thread encodes the items,
+    starts a new file after max_bytes or max_seconds, flushes every
+    flush_interval seconds and optionally fsyncs after each flush. With a
+    layout, a new file (and header) is also started whenever the layout of
+    an item differs from the one the current file was opened with.
+    '''
+    dir: str
+    prefix: str
+    extension: str
+    encode: Callable[[Any], bytes] = bytes
+    header: Optional[Callable[[Any], bytes]] = None
+    layout: Optional[Callable[[Any], Hashable]] = None
+    max_bytes: int = 64 * 1024 * 1024
+    max_seconds: float = 3600.0
+    flush_interval: float = 1.0
+    fsync: bool = False
+    max_pending: int = 65536
+
+    bytes_written: int = field(init=False, default=0)
+    items_dropped: int = field(init=False, default=0)
+    files: List[str] = field(init=False, default_factory=list)
+    _pending: deque = field(init=False, default_factory=deque)
+    _wake: threading.Event = field(init=False, default_factory=threading.Event)
+    _stop: threading.Event = field(init=False, default_factory=threading.Event)
+    _thread: Optional[threading.Thread] = field(init=False, default=None)
+    _file: Optional[IO[bytes]] = field(init=False, default=None)
+    _file_bytes: int = field(init=False, default=0)
+    _file_opened: float = field(init=False, default=0.0)
+    _file_layout: Hashable = field(init=False, default=None)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        os.makedirs(self.dir, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'{self.prefix}-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        ''' Write everything still pending and close the current file. '''
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def write(self, item: Any) -> None:
+        if len(self._pending) >= self.max_pending:
+            self.items_dropped += 1
+            return
+        self._pending.append(item)
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            stopping = self._stop.is_set()
+            self._drain()
+
+            if self._file is not None and (stopping or time.monotonic() - last_flush >= self.flush_interval):
+                self._flush()
+                last_flush = time.monotonic()
+
+            if stopping:
+                break
+            self._wake.wait(min(self.flush_interval, 0.1))
+            self._wake.clear()
+
+        self._close()
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                item = self._pending.popleft()
+            except IndexError:
+                return
+
+            if self._file is None or self._file_bytes >= self.max_bytes \
+                    or time.monotonic() - self._file_opened >= self.max_seconds \
+                    or (self.layout is not None and self.layout(item) != self._file_layout):
+                self._open(item)
+
+            data = self.encode(item)
+            self._file.write(data)
+            self._file_bytes += len(data)
+            self.bytes_written += len(data)
+
+    def _open(self, item: Any) -> None:
+        self._close()
+        filename = f'{self.prefix}_{len(self.files):03d}{self.extension}'
+        path = os.path.join(self.dir, filename)
+        self._file = open(path, 'wb')
+        self._file_bytes = 0
+        self._file_opened = time.monotonic()
+        self.files.append(path)
+        if self.layout is not None:
+            self._file_layout = self.layout(item)
+        if self.header is not None:
+            data = self.header(item)
+            self._file.write(data)
+            self._file_bytes += len(data)
+
+    def _flush(self) -> None:
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _close(self) -> None:
+        if self._file is None:
+            return
+        self._flush()
+        self._file.close()
+        self._file = None
+
+class SampleFormat(Enum):
+    CSV = auto()
+    CAPTURE = auto()
+
+def encode_chunk(chunk: Chunk) -> bytes:
+    return chunk.data
+
+def encode_batch_csv(item: Tuple[np.ndarray, SampleBatch]) -> bytes:
+    timestamps, batch = item
+    buffer = io.BytesIO()
+    np.savetxt(buffer, np.column_stack([timestamps, batch.values]), delimiter=',',
+               fmt=['%.9f'] + ['%.9g'] * batch.channel_count)
+    return buffer.getvalue()
+
+def batch_csv_header(item: Tuple[np.ndarray, SampleBatch]) -> bytes:
+    _, batch = item
+    return (','.join(['timestamp'] + (batch.names or default_names(batch.channel_count))) + '\n').encode('utf-8')
+
+def batch_layout(item: Tuple[np.ndarray, SampleBatch]) -> Tuple[int, Optional[Tuple[str, ...]]]:
+    ''' The channel count and names a sample file header describes. '''
+    _, batch = item
+    return batch.channel_count, tuple(batch.names) if batch.names else None
+
+def encode_batch_capture(item: Tuple[np.ndarray, SampleBatch]) -> bytes:
+    timestamps, batch = item
+    return encode_rows(timestamps, batch.values)
+
+def batch_capture_header(item: Tuple[np.ndarray, SampleBatch]) -> bytes:
+    _, batch = item
+    return encode_header(batch.names or default_names(batch.channel_count))
+
+@dataclass
+class Recorder:
+    ''' Continuously records the raw byte stream and, optionally, the parsed samples of every source.
+
+    record_chunk is meant to be called by the acquisition threads and
+    record_batch by the event bus; both only hand the data to a
+    RotatingWriter, so recording never blocks the receive path. Samples are
+    written with the timestamps of their batch, in seconds since origin;
+    batches without timestamps get the time they were recorded at. A batch
+    with other channels than the ones before it starts a new sample file.
+    items_dropped counts the chunks and batches the writers had no room for,
+    over every recording so far.
+    '''
+    dir: str = 'logs'
+    filename: str = 'record'
+    is_sample_enabled: bool = True
+    sample_format: SampleFormat = SampleFormat.CSV
+    max_bytes: int = 64 * 1024 * 1024
+    max_seconds: float = 3600.0
+    flush_interval: float = 1.0
+    fsync: bool = False
+    origin: float = 0.0
+    raw_writers: Dict[str, RotatingWriter] = field(init=False, default_factory=dict)
+    sample_writers: Dict[str, RotatingWriter] = field(init=False, default_factory=dict)
+    subscription: Optional[Subscription] = field(init=False, default=None)
+    prefix: Optional[str] = field(init=False, default=None)
+    _stopped_dropped: int = field(init=False, default=0)
+
+    @property
+    def is_recording(self) -> bool:
+        return self.prefix is not None
+
+    @property
+    def items_dropped(self) -> int:
+        writers = list(self.raw_writers.values()) + list(self.sample_writers.values())
+        return self._stopped_dropped + sum(writer.items_dropped for writer in writers)
+
+    def setup_event_handler(self) -> None:
+        self.subscription = subscribe(EventType.NEW_FLOAT_BATCH_EVENT, self.record_batch, Delivery.THREAD)
+
+    def start(self, sources: Sequence[str] = ('',)) -> None:
+        ''' Start one raw (and sample) recording per source name. '''
+        if self.is_recording:
+            return
+        self.prefix = self.filename + datetime.now().strftime('_%Y%m%d_%H%M%S')
+        for source in sources:
+            self.add_source(source)
+
+    def add_source(self, source: str) -> None:
+        ''' Start recording source too, if recording and it is not recorded yet. '''
+        if self.prefix is None or source in self.raw_writers:
+            return
+        source_prefix = self.prefix + (f'_{source}' if source else '')
+        if self.is_sample_enabled and self.sample_format is SampleFormat.CAPTURE:
+            self.sample_writers[source] = self.new_writer(source_prefix + '_samples', '.spcap', encode_batch_capture, batch_capture_header, batch_layout)
+        elif self.is_sample_enabled:
+            self.sample_writers[source] = self.new_writer(source_prefix + '_samples', '.csv', encode_batch_csv, batch_csv_header, batch_layout)
+        self.raw_writers[source] = self.new_writer(source_prefix + '_raw', '.txt', encode_chunk)
+
+    def stop(self) -> None:
+        if self.subscription is not None:
+            self.subscription.flush()
+        raw_writers, sample_writers = self.raw_writers, self.sample_writers
+        self.prefix = None
+        self.raw_writers = {}
+        self.sample_writers = {}
+        for writer in list(raw_writers.values()) + list(sample_writers.values()):
+            writer.stop()
+            self._stopped_dropped += writer.items_dropped
+
+    def new_writer(self, prefix: str, extension: str, encode: Callable[[Any], bytes],
+                   header: Optional[Callable[[Any], bytes]] = None,
+                   layout: Optional[Callable[[Any], Hashable]] = None) -> RotatingWriter:
+        writer = RotatingWriter(
+            self.dir, prefix, extension, encode, header, layout,
+            max_bytes=self.max_bytes,
+            max_seconds=self.max_seconds,
+            flush_interval=self.flush_interval,
+            fsync=self.fsync,
+        )
+        writer.start()
+        return writer
+
+    def record_chunk(self, chunk: Chunk, source: str = '') -> None:
+        writer = self.raw_writers.get(source)
+        if writer is not None:
+            writer.write(chunk)
+
+    def record_batch(self, batch: SampleBatch) -> None:
+        writer = self.sample_writers.get(batch.source)
+        if writer is not None:
+            timestamps = batch.timestamps
+            if timestamps is None:
+                timestamps = np.full(len(batch), time.perf_counter() - self.origin)
+            writer.write((timestamps, batch))
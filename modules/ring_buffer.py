@@ -0,0 +1,105 @@
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+
+@dataclass
+class RingBuffer:
+    ''' A preallocated per-channel ring buffer of float samples.
+
+    Every sample is written twice, at head and at head + capacity, so the
+    newest `capacity` samples are always one contiguous slice of the storage
+    and view() never has to copy. A host timestamp is kept next to every
+    sample; samples appended without one get NaN.
+    '''
+    capacity: int = 100
+    channel_count: int = 0
+    total: int = field(init=False, default=0)
+    _data: np.ndarray = field(init=False, repr=False)
+    _times: np.ndarray = field(init=False, repr=False)
+    _head: int = field(init=False, default=0)
+    _size: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        self.capacity = max(1, int(self.capacity))
+        self._data = np.zeros((2 * self.capacity, self.channel_count), dtype=np.float64)
+        self._times = np.full(2 * self.capacity, np.nan)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, values: np.ndarray, timestamps: Optional[np.ndarray] = None) -> None:
+        ''' Append one sample of shape (n_channels,) or a block of shape (n_samples, n_channels).
+
+        timestamps holds one host time per sample, if known.
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        if values.shape[1] != self.channel_count:
+            self.set_channel_count(values.shape[1])
+        if timestamps is None:
+            timestamps = np.full(values.shape[0], np.nan)
+
+        if values.shape[0] > self.capacity:
+            self.total += values.shape[0] - self.capacity
+            values = values[-self.capacity:]
+            timestamps = timestamps[-self.capacity:]
+
+        count = values.shape[0]
+        first = min(count, self.capacity - self._head)
+        for storage, items in ((self._data, values), (self._times, timestamps)):
+            for offset in (0, self.capacity):
+                storage[self._head + offset:self._head + offset + first] = items[:first]
+            if count > first:
+                storage[:count - first] = items[first:]
+                storage[self.capacity:self.capacity + count - first] = items[first:]
+
+        self._head = (self._head + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+        self.total += count
+
+    def view(self) -> np.ndarray:
+        ''' Return the stored samples, oldest first, as a (n_samples, n_channels) view. '''
+        size = len(self)
+        end = self._head + self.capacity
+        return self._data[end - size:end]
+
+    def times(self) -> np.ndarray:
+        ''' Return the timestamp of every row of view(). '''
+        size = len(self)
+        end = self._head + self.capacity
+        return self._times[end - size:end]
+
+    def indices(self) -> np.ndarray:
+        ''' Return the running sample index of every row of view(). '''
+        return np.arange(self.total - len(self), self.total)
+
+    def resize(self, capacity: int) -> None:
+        ''' Change the capacity, keeping as many of the newest samples as fit. '''
+        capacity = max(1, int(capacity))
+        if capacity == self.capacity:
+            return
+        kept = self.view()[-capacity:].copy()
+        kept_times = self.times()[-capacity:].copy()
+        total = self.total
+        self.capacity = capacity
+        self.clear()
+        self.append(kept, kept_times)
+        self.total = total
+
+    def set_channel_count(self, channel_count: int) -> None:
+        ''' Change the number of channels. New channels start as NaN, removed ones are dropped. '''
+        if channel_count == self.channel_count:
+            return
+        data = np.full((2 * self.capacity, channel_count), np.nan)
+        shared = min(channel_count, self.channel_count)
+        data[:, :shared] = self._data[:, :shared]
+        self._data = data
+        self.channel_count = channel_count
+
+    def clear(self) -> None:
+        self._data = np.zeros((2 * self.capacity, self.channel_count), dtype=np.float64)
+        self._times = np.full(2 * self.capacity, np.nan)
+        self._head = 0
+        self._size = 0
+        self.total = 0
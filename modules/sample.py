@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+
+@dataclass
+class SampleBatch:
+    ''' A block of parsed frames. values has shape (n_frames, n_channels).
+
+    source names the device the frames came from and timestamps, when known,
+    holds one host time in seconds per frame on the application's time base.
+    names, when set, names every channel; otherwise they are ch0, ch1, ...
+    '''
+    values: np.ndarray
+    source: str = ''
+    timestamps: Optional[np.ndarray] = None
+    names: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def channel_count(self) -> int:
+        return self.values.shape[1]
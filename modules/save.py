@@ -1,5 +1,9 @@
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import IO
 import os
+import shutil
+import tempfile
 
 def save_log(log: str, dir: str, filename: str):
     w_type = 'w'
@@ -11,5 +15,33 @@ def save_log(log: str, dir: str, filename: str):
     with open(os.path.join(dir, filename), w_type) as f:
         f.write(log)
 
+@dataclass
+class ConsoleHistory:
+    ''' Keeps the complete console text in an anonymous temporary file instead of in memory. '''
+    file: IO[str] = field(default_factory=lambda: tempfile.TemporaryFile('w+', encoding='utf-8', newline=''))
+
+    def write(self, text: str) -> None:
+        self.file.write(text)
+
+    def clear(self) -> None:
+        self.file.seek(0)
+        self.file.truncate()
+
+    def save(self, dir: str, filename: str) -> None:
+        ''' Copy the history to dir/filename the same way save_log does, appending to an existing file. '''
+        w_type = 'w'
+        if not os.path.isdir(dir):
+            os.mkdir(dir)
+        if os.path.exists(os.path.join(dir, filename)):
+            w_type = 'a'
+
+        self.file.flush()
+        self.file.seek(0)
+        try:
+            with open(os.path.join(dir, filename), w_type, encoding='utf-8', newline='') as f:
+                shutil.copyfileobj(self.file, f)
+        finally:
+            self.file.seek(0, os.SEEK_END)
+
 if __name__ == '__main__':
     save_log('test_string', 'logs', 'test1')
\ No newline at end of file
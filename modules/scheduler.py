@@ -0,0 +1,58 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Protocol
+import time
+
+from modules.metrics import metrics
+
+class Renderable(Protocol):
+    ''' A displayer that absorbs data as it arrives and repaints on request. '''
+
+    ''' Number of updates absorbed since the last render. '''
+    pending_updates: int
+
+    ''' Repaint with the newest data and reset pending_updates. '''
+    def render() -> None:
+        ...
+
+def render_stage(displayer: Renderable) -> str:
+    ''' Name of the metrics stage a displayer's renders are recorded under. '''
+    return 'render.' + type(displayer).__name__
+
+@dataclass
+class RenderScheduler:
+    ''' Repaint the displayers on an independent refresh clock.
+
+    The owner calls tick() every 1 / refresh_rate seconds. All updates a
+    displayer absorbed since its last paint collapse into a single render,
+    the others are counted as skipped frames.
+    '''
+    refresh_rate: float = 30.0
+    displayers: List[Renderable] = field(default_factory=list)
+    frames_rendered: Dict[int, int] = field(init=False, default_factory=dict)
+    frames_skipped: Dict[int, int] = field(init=False, default_factory=dict)
+
+    @property
+    def interval_ms(self) -> int:
+        return max(1, round(1000 / self.refresh_rate))
+
+    def add(self, displayer: Renderable) -> None:
+        self.displayers.append(displayer)
+        self.frames_rendered[id(displayer)] = 0
+        self.frames_skipped[id(displayer)] = 0
+
+    def remove(self, displayer: Renderable) -> None:
+        self.displayers = [other for other in self.displayers if other is not displayer]
+
+    def tick(self) -> None:
+        for displayer in self.displayers:
+            pending = displayer.pending_updates
+            if pending == 0:
+                continue
+            start = time.perf_counter()
+            displayer.render()
+            metrics.record(render_stage(displayer), time.perf_counter() - start, pending)
+            self.frames_rendered[id(displayer)] = self.frames_rendered.get(id(displayer), 0) + 1
+            self.frames_skipped[id(displayer)] = self.frames_skipped.get(id(displayer), 0) + pending - 1
+
+    def total_skipped(self) -> int:
+        return sum(self.frames_skipped.values())
@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field
+from typing import Optional
+import codecs
+import time
+
+from modules.receiver import Receiver, SerialReceiver, new_decoder
+from modules.acquisition import Acquisition
+from modules.string_parser import StringParser
+from modules.binary_parser import BinaryParser
+from modules.derived import DerivedChannels
+from modules.event import EventType, post_event
+from modules.timing import ArrivalTimes
+
+@dataclass
+class Source:
+    ''' One device: its receiver, acquisition thread and parsers.
+
+    Every source reads on its own acquisition thread. Its parsers are fed
+    directly rather than through the event bus, so the batches they post are
+    tagged with the source name and never mix with other devices' frames.
+    '''
+    name: str = ''
+    receiver: Receiver = field(default_factory=SerialReceiver)
+    parser: StringParser = field(default_factory=StringParser)
+    binary_parser: BinaryParser = field(default_factory=BinaryParser)
+    acquisition: Acquisition = field(init=False)
+    decoder: codecs.IncrementalDecoder = field(init=False, default_factory=new_decoder)
+    last_read: Optional[float] = field(init=False, default=None)
+    connected_at: float = field(init=False, default=0.0)
+    byte_time: float = field(init=False, default=0.0)
+
+    def __post_init__(self) -> None:
+        self.acquisition = Acquisition(self.receiver)
+        self.parser.source = self.name
+        self.binary_parser.source = self.name
+
+    def set_receiver(self, receiver: Receiver) -> None:
+        ''' Replace the receiver. Only call this while disconnected. '''
+        self.receiver = receiver
+        self.acquisition.receiver = receiver
+
+    def connect(self, port: str, baudrate: int, timeout: float = 0.5) -> bool:
+        connected = self.receiver.connect(port, baudrate, timeout)
+        if connected:
+            self.acquisition.queue.clear()
+            self.decoder.reset()
+            self.parser.framer.reset()
+            self.binary_parser.reset()
+            self.last_read = None
+            self.connected_at = time.perf_counter()
+            # 8N1 framing: a start bit, eight data bits and a stop bit per byte.
+            self.byte_time = 10 / baudrate if baudrate else 0.0
+            self.acquisition.start()
+        return connected
+
+    def disconnect(self) -> bool:
+        self.acquisition.stop()
+        return self.receiver.disconnect()
+
+    def set_binary_enabled(self, enabled: bool) -> None:
+        ''' Parse the stream with the BinaryParser instead of the StringParser. '''
+        self.binary_parser.enabled = enabled
+        self.parser.enabled = not enabled
+
+    def copy_config(self, other: 'Source') -> None:
+        ''' Frame and parse the stream as other does. '''
+        self.parser.set_config(other.parser.start_string, other.parser.end_string, other.parser.delimiter)
+        self.parser.set_grammar(other.parser.grammar_type, other.parser.pattern)
+        self.binary_parser.set_config(other.binary_parser.layout, other.binary_parser.framing, other.binary_parser.checksum)
+        self.set_binary_enabled(other.binary_parser.enabled)
+
+    def set_derived(self, derived: DerivedChannels) -> None:
+        ''' Append the derived channels to every batch either parser posts. '''
+        self.parser.derived = derived
+        self.binary_parser.derived = derived
+
+    def receive(self, origin: float) -> None:
+        ''' Drain the chunks read since the last call and parse them.
+
+        origin is the shared time base; batch timestamps are relative to it.
+        Each frame is stamped with the time its last byte arrived, interpolated
+        between the read that completed it and the read before.
+        '''
+        chunks = self.acquisition.queue.get_all()
+        if not chunks:
+            return
+        data = b''.join(chunk.data for chunk in chunks)
+        times = [chunk.timestamp - origin for chunk in chunks]
+        previous = self.connected_at - origin if self.last_read is None else self.last_read
+        self.last_read = times[-1]
+
+        if self.binary_parser.enabled:
+            arrival = ArrivalTimes.from_chunks([len(chunk.data) for chunk in chunks], times, previous, self.byte_time)
+            self.binary_parser.parse_bytes(data, arrival)
+            return
+
+        texts = [self.decoder.decode(chunk.data) for chunk in chunks]
+        msg = ''.join(texts)
+        if msg != '':
+            post_event(EventType.NEW_MESSAGE_EVENT, msg)
+            arrival = ArrivalTimes.from_chunks([len(text) for text in texts], times, previous, self.byte_time)
+            self.parser.parse_float(msg, arrival)
@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+class Window(Enum):
+    RECTANGULAR = auto()
+    HANN = auto()
+    HAMMING = auto()
+    BLACKMAN = auto()
+
+@lru_cache(maxsize=16)
+def window_coefficients(window: Window, size: int) -> np.ndarray:
+    ''' Window coefficients scaled so a full scale sine of amplitude A shows a peak of A. '''
+    coefficients = {
+        Window.RECTANGULAR: np.ones,
+        Window.HANN: np.hanning,
+        Window.HAMMING: np.hamming,
+        Window.BLACKMAN: np.blackman,
+    }[window](size)
+    coefficients = 2 * coefficients / coefficients.sum()
+    coefficients.setflags(write=False)
+    return coefficients
+
+@lru_cache(maxsize=16)
+def frequency_bins(size: int) -> np.ndarray:
+    ''' Frequencies of the rfft bins of a size point segment, in cycles per sample. '''
+    bins = np.fft.rfftfreq(size)
+    bins.setflags(write=False)
+    return bins
+
+@dataclass
+class SpectrumAnalyzer:
+    ''' Magnitude spectrum of every channel over a sliding window of the stream.
+
+    Samples are collected until a segment of size samples is complete; a new
+    segment starts every size * (1 - overlap) samples. update() transforms
+    only the segments completed by the new samples, all of them in one rfft
+    call, so the cost per sample does not depend on how often it is called.
+
+    With averages > 1 the spectrum is an exponential average over about that
+    many segments. With peak_hold the largest magnitude of every bin is kept
+    until reset().
+
+    The sample rate is estimated from the timestamps of the first segment and
+    estimated again if it drifts by more than 5 %; without timestamps the
+    frequencies are in cycles per sample.
+    '''
+    size: int = 1024
+    overlap: float = 0.5
+    window: Window = Window.HANN
+    averages: int = 1
+    peak_hold: bool = False
+
+    sample_rate: Optional[float] = field(init=False, default=None)
+    magnitude: Optional[np.ndarray] = field(init=False, default=None)
+    peak: Optional[np.ndarray] = field(init=False, default=None)
+    segment_count: int = field(init=False, default=0)
+    _values: Optional[np.ndarray] = field(init=False, default=None)
+    _times: Optional[np.ndarray] = field(init=False, default=None)
+
+    @property
+    def hop(self) -> int:
+        return max(1, int(round(self.size * (1 - self.overlap))))
+
+    def reset(self) -> None:
+        self.sample_rate = None
+        self.magnitude = None
+        self.peak = None
+        self.segment_count = 0
+        self._values = None
+        self._times = None
+
+    def update(self, values: np.ndarray, timestamps: Optional[np.ndarray] = None) -> None:
+        values = np.asarray(values, dtype=np.float64).reshape(-1, np.shape(values)[-1])
+        if timestamps is None:
+            timestamps = np.full(len(values), np.nan)
+        if self._values is None or self._values.shape[1] != values.shape[1]:
+            self.reset()
+            self._values = values
+            self._times = np.asarray(timestamps, dtype=np.float64)
+        else:
+            self._values = np.concatenate([self._values, values])
+            self._times = np.concatenate([self._times, timestamps])
+
+        count = (len(self._values) - self.size) // self.hop + 1
+        if count <= 0:
+            return
+
+        segments = np.lib.stride_tricks.sliding_window_view(self._values, self.size, axis=0)[::self.hop][:count]
+        self.estimate_rate(self._times[(count - 1) * self.hop:(count - 1) * self.hop + self.size])
+        # segments is (count, channels, size); transform along the samples.
+        spectra = np.abs(np.fft.rfft(segments * window_coefficients(self.window, self.size), axis=2))
+        # The window scaling counts every bin twice, once for its negative frequency; DC and Nyquist have none.
+        spectra[:, :, 0] *= 0.5
+        if self.size % 2 == 0:
+            spectra[:, :, -1] *= 0.5
+        self.accumulate(spectra.transpose(0, 2, 1))
+
+        consumed = count * self.hop
+        self._values = self._values[consumed:]
+        self._times = self._times[consumed:]
+
+    def accumulate(self, spectra: np.ndarray) -> None:
+        ''' Fold (count, bins, channels) segment spectra into the average and the peak. '''
+        alpha = 1 / max(1, self.averages)
+        for spectrum in spectra:
+            if self.magnitude is None or self.magnitude.shape != spectrum.shape:
+                self.magnitude = spectrum.copy()
+                self.peak = spectrum.copy()
+            else:
+                self.magnitude += alpha * (spectrum - self.magnitude)
+                np.maximum(self.peak, spectrum, out=self.peak)
+            self.segment_count += 1
+
+    def estimate_rate(self, times: np.ndarray) -> None:
+        if len(times) < 2 or not np.isfinite(times[[0, -1]]).all() or times[-1] <= times[0]:
+            return
+        rate = (len(times) - 1) / (times[-1] - times[0])
+        if self.sample_rate is None or abs(rate - self.sample_rate) > 0.05 * self.sample_rate:
+            self.sample_rate = rate
+
+    def frequencies(self) -> np.ndarray:
+        bins = frequency_bins(self.size)
+        return bins if self.sample_rate is None else bins * self.sample_rate
+
+    def spectrum(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        ''' Return the frequencies and the (n_bins, n_channels) magnitudes, or None before the first segment. '''
+        if self.magnitude is None:
+            return None
+        return self.frequencies(), self.magnitude
+
+    def peak_spectrum(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self.peak is None:
+            return None
+        return self.frequencies(), self.peak
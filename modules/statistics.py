@@ -0,0 +1,191 @@
+from dataclasses import dataclass, field
+from collections import deque
+from typing import Dict, List, Optional
+import time
+
+import numpy as np
+
+from modules.capture import default_names
+from modules.event import EventType, subscribe
+from modules.sample import SampleBatch
+
+@dataclass
+class RunningStats:
+    ''' Count, mean, sum of squared deviations, minimum and maximum of every channel.
+
+    Batches are combined with the parallel form of Welford's algorithm
+    (Chan et al.): the mean and squared deviations of a batch are computed
+    with NumPy and merged into the totals, which stays accurate over any
+    number of samples, unlike accumulating sums of squares. Values that are
+    not finite, such as the NaN of a key a frame does not hold, are left
+    out, so every channel has its own count.
+    '''
+    count: Optional[np.ndarray] = None
+    mean: Optional[np.ndarray] = None
+    m2: Optional[np.ndarray] = None
+    minimum: Optional[np.ndarray] = None
+    maximum: Optional[np.ndarray] = None
+    first_time: float = float('nan')
+    last_time: float = float('nan')
+
+    @classmethod
+    def of(cls, values: np.ndarray, first_time: float = float('nan'), last_time: float = float('nan')) -> 'RunningStats':
+        finite = np.isfinite(values)
+        count = finite.sum(axis=0)
+        has_values = count > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(finite, values, 0.0).sum(axis=0) / count
+        m2 = (np.where(finite, values - mean, 0.0) ** 2).sum(axis=0)
+        minimum = np.where(has_values, np.where(finite, values, np.inf).min(axis=0), np.nan)
+        maximum = np.where(has_values, np.where(finite, values, -np.inf).max(axis=0), np.nan)
+        return cls(count, mean, m2, minimum, maximum, first_time, last_time)
+
+    def merge(self, other: 'RunningStats') -> None:
+        if other.count is None:
+            return
+        if self.count is None:
+            self.count, self.mean, self.m2 = other.count.copy(), other.mean.copy(), other.m2.copy()
+            self.minimum, self.maximum = other.minimum.copy(), other.maximum.copy()
+            self.first_time, self.last_time = other.first_time, other.last_time
+            return
+
+        count = self.count + other.count
+        # Channels without values on one side have a NaN mean there, which must not spread.
+        mean = np.where(self.count > 0, self.mean, 0.0)
+        delta = np.where(other.count > 0, other.mean, 0.0) - mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(count > 0, other.count / count, 0.0)
+            cross = np.where(count > 0, self.count * other.count / count, 0.0)
+        self.mean = np.where(count > 0, mean + delta * weight, np.nan)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * cross
+        self.count = count
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+        if not np.isfinite(self.first_time):
+            self.first_time = other.first_time
+        self.last_time = other.last_time
+
+    @property
+    def variance(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 0, self.m2 / self.count, np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    @property
+    def rms(self) -> np.ndarray:
+        return np.sqrt(self.mean ** 2 + self.variance)
+
+    @property
+    def peak_to_peak(self) -> np.ndarray:
+        return self.maximum - self.minimum
+
+    @property
+    def rate(self) -> np.ndarray:
+        ''' Samples per second of every channel between the first and the last timestamp, NaN if unknown. '''
+        span = self.last_time - self.first_time
+        if self.count is None or not np.isfinite(span) or span <= 0:
+            return np.full(0 if self.count is None else len(self.count), np.nan)
+        return np.where(self.count >= 2, (self.count - 1) / span, np.nan)
+
+@dataclass
+class WindowedStats:
+    ''' RunningStats over the samples of the last window seconds.
+
+    One RunningStats is kept per batch and batches older than the window are
+    dropped, so the window moves in whole batches. stats() merges the
+    remaining batches; the cost per sample stays constant however long the
+    recording runs.
+    '''
+    window: float = 1.0
+    blocks: deque = field(default_factory=deque)
+
+    def update(self, block: RunningStats) -> None:
+        self.blocks.append(block)
+        while self.blocks and block.last_time - self.blocks[0].last_time > self.window:
+            self.blocks.popleft()
+
+    def stats(self) -> RunningStats:
+        total = RunningStats()
+        for block in self.blocks:
+            total.merge(block)
+        return total
+
+@dataclass
+class StatisticsMonitor:
+    ''' Keeps running and windowed statistics of every channel of every source.
+
+    Batches without timestamps are stamped with the time they are recorded
+    at, relative to origin.
+    '''
+    window: float = 1.0
+    origin: float = 0.0
+    totals: Dict[str, RunningStats] = field(init=False, default_factory=dict)
+    windows: Dict[str, WindowedStats] = field(init=False, default_factory=dict)
+    names: Dict[str, List[str]] = field(init=False, default_factory=dict)
+
+    def setup_event_handler(self) -> None:
+        subscribe(EventType.NEW_FLOAT_EVENT, self.record_float)
+        subscribe(EventType.NEW_FLOAT_BATCH_EVENT, self.record_batch)
+
+    def record_float(self, datas: List[float]) -> None:
+        self.record(np.asarray([datas], dtype=np.float64))
+
+    def record_batch(self, batch: SampleBatch) -> None:
+        if not len(batch):
+            return
+        self.record(batch.values, batch.source, batch.timestamps, batch.names)
+
+    def record(self, values: np.ndarray, source: str = '', timestamps: Optional[np.ndarray] = None,
+               names: Optional[List[str]] = None) -> None:
+        if timestamps is None:
+            now = time.perf_counter() - self.origin
+            first_time, last_time = now, now
+        else:
+            first_time, last_time = float(timestamps[0]), float(timestamps[-1])
+
+        total = self.totals.get(source)
+        if total is None or total.mean.shape[0] != values.shape[1]:
+            self.totals[source] = total = RunningStats()
+            self.windows[source] = WindowedStats(self.window)
+        self.names[source] = names or default_names(values.shape[1])
+
+        block = RunningStats.of(values, first_time, last_time)
+        total.merge(block)
+        self.windows[source].update(block)
+
+    def remove_source(self, source: str) -> None:
+        self.totals.pop(source, None)
+        self.windows.pop(source, None)
+        self.names.pop(source, None)
+
+    def reset(self) -> None:
+        self.totals.clear()
+        self.windows.clear()
+        self.names.clear()
+
+    def rows(self) -> List[Dict[str, object]]:
+        ''' Return one dict of statistics per channel of every source. '''
+        rows = []
+        for source, total in self.totals.items():
+            recent = self.windows[source].stats()
+            for channel in range(total.mean.shape[0]):
+                rows.append({
+                    'source': source,
+                    'channel': channel,
+                    'name': self.names[source][channel],
+                    'count': int(total.count[channel]),
+                    'mean': total.mean[channel],
+                    'rms': total.rms[channel],
+                    'std': total.std[channel],
+                    'min': total.minimum[channel],
+                    'max': total.maximum[channel],
+                    'peak_to_peak': total.peak_to_peak[channel],
+                    'rate': recent.rate[channel],
+                    'window_mean': recent.mean[channel],
+                    'window_rms': recent.rms[channel],
+                    'window_peak_to_peak': recent.peak_to_peak[channel],
+                })
+        return rows
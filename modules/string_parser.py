@@ -1,29 +1,170 @@
 from dataclasses import dataclass, field
-from typing import List
-from modules.event import EventType, subscribe, post_event
+from typing import List, Optional, Tuple
+import time
+import numpy as np
+from modules.derived import DerivedChannels
+from modules.event import EventType, post_event
+from modules.grammar import FrameGrammar, GrammarType, new_grammar
+from modules.metrics import metrics
+from modules.sample import SampleBatch
+from modules.timing import ArrivalTimes
+
+@dataclass
+class StreamFramer:
+    ''' Split a stream of text into start_string ... end_string frames.
+
+    Text that has not been closed by end_string yet is carried over to the
+    next call, so a frame split across two reads is still recovered. An empty
+    end_string means frames end at a newline. After feed(), frame_ends holds
+    the position in the fed text where each returned frame ended.
+    '''
+    start_string: str = ''
+    end_string: str = ''
+    max_frame_length: int = 4096
+
+    frame_count: int = field(init=False, default=0)
+    malformed_count: int = field(init=False, default=0)
+    truncated_count: int = field(init=False, default=0)
+    frame_ends: List[int] = field(init=False, default_factory=list)
+    _buffer: str = field(init=False, default='')
+
+    def set_config(self, start_string: str, end_string: str) -> None:
+        if (start_string, end_string) != (self.start_string, self.end_string):
+            self.start_string = start_string
+            self.end_string = end_string
+            self._buffer = ''
+
+    def reset(self) -> None:
+        self._buffer = ''
+        self.frame_count = 0
+        self.malformed_count = 0
+        self.truncated_count = 0
+
+    def feed(self, text: str) -> List[str]:
+        ''' Return every frame completed by text, in order of arrival. '''
+        carried = len(self._buffer)
+        buffer = self._buffer + text
+        end_string = self.end_string or '\n'
+        frames = []
+        self.frame_ends = []
+        pos = 0
+
+        while True:
+            if self.start_string:
+                start = buffer.find(self.start_string, pos)
+                if start < 0:
+                    pos = max(pos, len(buffer) - len(self.start_string) + 1)
+                    break
+                body_start = start + len(self.start_string)
+            else:
+                start = body_start = pos
+
+            stop = buffer.find(end_string, body_start)
+            if stop < 0:
+                pos = start
+                break
+
+            body = buffer[body_start:stop]
+            restart = body.rfind(self.start_string) if self.start_string else -1
+            if restart >= 0:
+                # The end of the previous frame was lost, keep the newest one.
+                self.malformed_count += 1
+                body = body[restart + len(self.start_string):]
+
+            frames.append(body.strip())
+            pos = stop + len(end_string)
+            self.frame_ends.append(pos - carried)
+
+        self._buffer = buffer[pos:]
+        if len(self._buffer) > self.max_frame_length:
+            self.truncated_count += 1
+            restart = self._buffer.rfind(self.start_string) if self.start_string else -1
+            self._buffer = self._buffer[restart:] if restart > 0 else ''
+
+        self.frame_count += len(frames)
+        return frames
 
 @dataclass
 class StringParser:
+    ''' Frames text with a StreamFramer and converts the frames with a FrameGrammar.
+
+    The grammar is built again only when the grammar type, the delimiter or
+    the pattern change, so calling set_config() on every keystroke is cheap.
+    '''
     start_string: str = ''
     end_string: str = ''
     delimiter: str = ''
+    batch_mode: bool = True
+    enabled: bool = True
+    source: str = ''
+    derived: DerivedChannels = field(default_factory=DerivedChannels)
+    grammar_type: GrammarType = GrammarType.DELIMITED
+    pattern: str = ''
+    framer: StreamFramer = field(init=False, default_factory=StreamFramer)
+    grammar: FrameGrammar = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.framer.set_config(self.start_string, self.end_string)
+        self.grammar = new_grammar(self.grammar_type, self.delimiter, self.pattern)
+
+    @property
+    def malformed_count(self) -> int:
+        ''' Frames whose end string was lost and frames the grammar could not convert. '''
+        return self.framer.malformed_count + self.grammar.malformed_count
 
-    def setup_event_handler(self) -> None:
-        subscribe(EventType.NEW_MESSAGE_EVENT, self.parse_float)
+    @property
+    def truncated_count(self) -> int:
+        ''' Times text without an end string outgrew max_frame_length and was dropped. '''
+        return self.framer.truncated_count
+
+    @property
+    def text_count(self) -> int:
+        ''' Frames that hold no data in the grammar, e.g. debug prints between data lines. '''
+        return self.grammar.text_count
 
     def set_config(self, start_string: str, end_string: str, delimiter: str) -> None:
         self.start_string = start_string
         self.end_string = end_string
-        self.delimiter = delimiter
-
-    def parse_string(self, msg: str) -> str:
-        if self.start_string in msg and self.end_string in msg:
-            msg = msg[msg.index(self.start_string) + len(self.start_string) : msg.index(self.end_string)]
-            return msg.strip()
-        return ''
-
-    def parse_float(self, msg: str) -> None:
-        try:
-            post_event(EventType.NEW_FLOAT_EVENT, list(map(float, self.parse_string(msg).split(self.delimiter))))
-        except ValueError:
-            pass
\ No newline at end of file
+        self.framer.set_config(start_string, end_string)
+        if delimiter != self.delimiter:
+            self.grammar = new_grammar(self.grammar_type, delimiter, self.pattern)
+            self.delimiter = delimiter
+
+    def set_grammar(self, grammar_type: GrammarType, pattern: str = '') -> None:
+        ''' Raises ValueError if pattern is not a valid REGEX pattern; the grammar is then unchanged. '''
+        if (grammar_type, pattern) != (self.grammar_type, self.pattern):
+            self.grammar = new_grammar(grammar_type, self.delimiter, pattern)
+            self.grammar_type = grammar_type
+            self.pattern = pattern
+
+    def parse_string(self, msg: str) -> List[str]:
+        return self.framer.feed(msg)
+
+    def parse_float(self, msg: str, arrival: Optional[ArrivalTimes] = None) -> None:
+        ''' arrival maps positions in msg to the host time they were read at, if known. '''
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        frames = self.parse_string(msg)
+        framed = time.perf_counter()
+        metrics.record('framing', framed - start, len(frames))
+        if self.batch_mode:
+            frame_times = None if arrival is None else arrival.at(self.framer.frame_ends)
+            batches = self.parse_batch(frames)
+            metrics.record('parsing', time.perf_counter() - framed, sum(len(values) for _, values in batches))
+            for indices, values in batches:
+                timestamps = None if frame_times is None else frame_times[indices]
+                names = self.grammar.names
+                if names is not None and len(names) != values.shape[1]:
+                    names = None
+                batch = SampleBatch(values, self.source, timestamps, None if names is None else list(names))
+                post_event(EventType.NEW_FLOAT_BATCH_EVENT, self.derived.apply_batch(batch))
+            return
+
+        for _, values in self.parse_batch(frames):
+            for datas in self.derived.apply(values, self.grammar.names).tolist():
+                post_event(EventType.NEW_FLOAT_EVENT, datas)
+
+    def parse_batch(self, frames: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        ''' Convert frames into (n_frames, n_channels) arrays with the grammar, see FrameGrammar.parse_batch. '''
+        return self.grammar.parse_batch(frames)
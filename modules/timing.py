@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+import csv
+
+import numpy as np
+
+from modules.event import EventType, subscribe
+from modules.sample import SampleBatch
+
+@dataclass
+class ArrivalTimes:
+    ''' Maps positions in a block of received data to the host time they arrived at.
+
+    The block was built from consecutive reads. offsets holds the cumulative
+    end position of every read, starting with 0, and ends the host time each
+    read returned. The data of a read arrived between its start time and its
+    end time; positions inside it are interpolated linearly between the two.
+    '''
+    offsets: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+
+    @classmethod
+    def from_chunks(cls, lengths: Sequence[int], times: Sequence[float], previous: Optional[float] = None,
+                    unit_time: float = 0.0) -> 'ArrivalTimes':
+        ''' Build the map for reads of the given lengths that returned at times.
+
+        A read started when the previous one returned but, if unit_time (the
+        transfer time of one byte) is given, no earlier than its length times
+        unit_time before it returned, so data following an idle line is not
+        spread over the idle time. A first read with neither is stamped with
+        its return time.
+        '''
+        lengths = np.asarray(lengths, dtype=np.float64)
+        ends = np.asarray(times, dtype=np.float64)
+        previous_ends = np.concatenate([[-np.inf if previous is None else previous], ends[:-1]])
+        starts = np.maximum(ends - lengths * unit_time, previous_ends) if unit_time > 0 else previous_ends
+        starts = np.where(np.isfinite(starts), np.minimum(starts, ends), ends)
+        return cls(np.concatenate([[0], np.cumsum(lengths)]), starts, ends)
+
+    def at(self, positions: Sequence[int]) -> np.ndarray:
+        ''' Return the arrival time of the data ending at each position. '''
+        positions = np.asarray(positions, dtype=np.float64)
+        read = np.clip(np.searchsorted(self.offsets, positions, side='left') - 1, 0, len(self.ends) - 1)
+        low, high = self.offsets[read], self.offsets[read + 1]
+        fraction = np.clip((positions - low) / np.maximum(high - low, 1), 0.0, 1.0)
+        return self.starts[read] + fraction * (self.ends[read] - self.starts[read])
+
+def log_bins(low: float = 1e-6, high: float = 10.0, per_decade: int = 10) -> np.ndarray:
+    decades = int(round(np.log10(high / low)))
+    return np.logspace(np.log10(low), np.log10(high), decades * per_decade + 1)
+
+@dataclass
+class InterArrivalMonitor:
+    ''' Accumulates a histogram of the time between consecutive frames of every source.
+
+    The bins are log spaced between 1 us and 10 s, so both the normal frame
+    period and UART stalls of several seconds show up in one histogram;
+    intervals outside that range are counted in the first and last bin.
+    '''
+    bins: np.ndarray = field(default_factory=log_bins)
+    counts: Dict[str, np.ndarray] = field(init=False, default_factory=dict)
+    max_interval: Dict[str, float] = field(init=False, default_factory=dict)
+    _last: Dict[str, float] = field(init=False, default_factory=dict)
+
+    def setup_event_handler(self) -> None:
+        subscribe(EventType.NEW_FLOAT_BATCH_EVENT, self.record_batch)
+
+    def record_batch(self, batch: SampleBatch) -> None:
+        if batch.timestamps is None or not len(batch):
+            return
+        self.record(batch.timestamps, batch.source)
+
+    def record(self, timestamps: np.ndarray, source: str = '') -> None:
+        last = self._last.get(source)
+        intervals = np.diff(timestamps if last is None else np.concatenate([[last], timestamps]))
+        self._last[source] = float(timestamps[-1])
+        if not intervals.size:
+            return
+
+        clipped = np.clip(intervals, self.bins[0], self.bins[-1])
+        counts, _ = np.histogram(clipped, self.bins)
+        if source in self.counts:
+            self.counts[source] += counts
+        else:
+            self.counts[source] = counts
+        self.max_interval[source] = max(self.max_interval.get(source, 0.0), float(intervals.max()))
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.max_interval.clear()
+        self._last.clear()
+
+    def export_csv(self, path: str) -> None:
+        ''' Write one row per bin with its bounds in seconds and one count column per source. '''
+        sources = list(self.counts)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['low_s', 'high_s'] + [source or 'count' for source in sources])
+            for index in range(len(self.bins) - 1):
+                writer.writerow([f'{self.bins[index]:.3g}', f'{self.bins[index + 1]:.3g}'] +
+                                [int(self.counts[source][index]) for source in sources])
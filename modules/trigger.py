@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import Optional
+
+import numpy as np
+
+class TriggerType(Enum):
+    RISING = auto()
+    FALLING = auto()
+    LEVEL = auto()
+    WINDOW = auto()
+
+class TriggerMode(Enum):
+    AUTO = auto()
+    NORMAL = auto()
+    SINGLE = auto()
+
+@dataclass
+class Trigger:
+    ''' Captures frames of pre + post samples around trigger events on one channel.
+
+    RISING and FALLING fire when the channel crosses level, LEVEL on every
+    sample at or above level and WINDOW when the channel leaves the band
+    between level and high. Triggers are searched with NumPy over the new
+    samples only, and the next trigger is searched after the end of the
+    captured frame.
+
+    NORMAL captures on every trigger and SINGLE on the first one, then waits
+    for arm(). AUTO behaves like NORMAL but, if no trigger was found for
+    pre + post samples, captures the newest samples untriggered.
+    '''
+    type: TriggerType = TriggerType.RISING
+    mode: TriggerMode = TriggerMode.AUTO
+    channel: int = 0
+    level: float = 0.0
+    high: float = 1.0
+    pre: int = 100
+    post: int = 400
+
+    armed: bool = field(init=False, default=True)
+    frame: Optional[np.ndarray] = field(init=False, default=None, repr=False)
+    frame_times: Optional[np.ndarray] = field(init=False, default=None, repr=False)
+    is_triggered: bool = field(init=False, default=False)
+    capture_count: int = field(init=False, default=0)
+    _values: Optional[np.ndarray] = field(init=False, default=None, repr=False)
+    _times: Optional[np.ndarray] = field(init=False, default=None, repr=False)
+    _search: int = field(init=False, default=0)
+    _pending: Optional[int] = field(init=False, default=None)
+    _since_capture: int = field(init=False, default=0)
+
+    def arm(self) -> None:
+        ''' Wait for the next trigger, also after a SINGLE capture. '''
+        self.armed = True
+        self._pending = None
+        self._since_capture = 0
+        if self._values is not None:
+            self._search = len(self._values)
+
+    def update(self, values: np.ndarray, timestamps: Optional[np.ndarray] = None) -> bool:
+        ''' Add samples; return True if a new frame was captured. '''
+        values = np.asarray(values, dtype=np.float64).reshape(-1, np.shape(values)[-1])
+        times = np.full(len(values), np.nan) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        if self._values is None or self._values.shape[1] != values.shape[1]:
+            self._values, self._times = values, times
+            self._search = 0
+            self._pending = None
+        else:
+            self._values = np.concatenate([self._values, values])
+            self._times = np.concatenate([self._times, times])
+        self._since_capture += len(values)
+
+        captured = False
+        while self.armed:
+            if self._pending is None:
+                self._pending = self.find(max(self._search, self.pre, 1))
+                if self._pending is None:
+                    self._search = len(self._values)
+                    break
+            if len(self._values) - self._pending < self.post:
+                break
+            self.capture(self._pending, True)
+            captured = True
+            self._search = self._pending + self.post
+            self._pending = None
+            if self.mode is TriggerMode.SINGLE:
+                self.armed = False
+
+        if not captured and self.mode is TriggerMode.AUTO and self._pending is None \
+                and self._since_capture >= self.pre + self.post and len(self._values) >= self.pre + self.post:
+            self.capture(len(self._values) - self.post, False)
+            captured = True
+
+        if not self.armed:
+            self._search = len(self._values)
+        self.trim()
+        return captured
+
+    def find(self, start: int) -> Optional[int]:
+        ''' Return the index of the first trigger at or after start, which must be at least 1. '''
+        if start >= len(self._values) or self.channel >= self._values.shape[1]:
+            return None
+        x = self._values[start - 1:, self.channel]
+        previous, current = x[:-1], x[1:]
+        if self.type is TriggerType.RISING:
+            hits = (previous < self.level) & (current >= self.level)
+        elif self.type is TriggerType.FALLING:
+            hits = (previous > self.level) & (current <= self.level)
+        elif self.type is TriggerType.LEVEL:
+            hits = current >= self.level
+        else:
+            outside = (x < self.level) | (x > self.high)
+            hits = ~outside[:-1] & outside[1:]
+        indices = np.flatnonzero(hits)
+        return start + int(indices[0]) if indices.size else None
+
+    def capture(self, index: int, is_triggered: bool) -> None:
+        self.frame = self._values[index - self.pre:index + self.post].copy()
+        self.frame_times = self._times[index - self.pre:index + self.post] - self._times[index]
+        self.is_triggered = is_triggered
+        self.capture_count += 1
+        self._since_capture = 0
+
+    def trim(self) -> None:
+        ''' Drop the samples no future frame can include. '''
+        keep = min(self._search - self.pre, len(self._values) - self.pre - self.post)
+        if self._pending is not None:
+            keep = min(keep, self._pending - self.pre)
+        if keep <= 0:
+            return
+        self._values = self._values[keep:]
+        self._times = self._times[keep:]
+        self._search -= keep
+        if self._pending is not None:
+            self._pending -= keep
@@ -0,0 +1,81 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from modules import event
+from modules.binary_parser import BinaryParser, Checksum, Framing, cobs_decode, cobs_encode, slip_decode, slip_encode
+from modules.event import EventType
+
+PAYLOADS = [
+    b'',
+    b'\x00',
+    b'\x00\x00',
+    b'abc',
+    b'\x11\x00\x22\x00',
+    bytes(range(256)),
+    bytes(253) + b'\x01',
+    b'\x01' * 254,
+    b'\x01' * 255 + b'\x00' + b'\x02' * 600,
+    b'\xc0\xdb\xdc\xdd',
+]
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_cobs_round_trip(payload):
+    encoded = cobs_encode(payload)
+    assert b'\x00' not in encoded
+    assert cobs_decode(encoded) == payload
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_slip_round_trip(payload):
+    encoded = slip_encode(payload)
+    assert b'\xc0' not in encoded
+    assert slip_decode(encoded) == payload
+
+def test_cobs_decode_rejects_truncated_frame():
+    with pytest.raises(ValueError):
+        cobs_decode(b'\x05ab')
+
+def frame(values, framing, checksum=Checksum.NONE):
+    payload = struct.pack('<fff', *values)
+    if checksum is Checksum.CRC32:
+        payload += zlib.crc32(payload).to_bytes(4, 'little')
+    if framing is Framing.COBS:
+        return cobs_encode(payload) + b'\x00'
+    return slip_encode(payload) + b'\xc0'
+
+@pytest.mark.parametrize('framing', list(Framing))
+def test_parse_batch_across_reads(framing):
+    parser = BinaryParser('<fff', framing, enabled=True)
+    data = b''.join(frame((index, 0.0, -index), framing) for index in range(5))
+    ends, first = parser.parse_batch(data[:7])
+    _, rest = parser.parse_batch(data[7:])
+    values = np.concatenate([first, rest])
+    np.testing.assert_array_equal(values[:, 0], np.arange(5))
+    np.testing.assert_array_equal(values[:, 2], -np.arange(5))
+    assert parser.malformed_count == 0
+
+def test_parse_batch_counts_bad_checksum():
+    parser = BinaryParser('<fff', Framing.COBS, Checksum.CRC32, enabled=True)
+    good = frame((1, 2, 3), Framing.COBS, Checksum.CRC32)
+    bad = bytearray(good)
+    bad[2] ^= 0xFF
+    _, values = parser.parse_batch(good + bytes(bad) + good)
+    assert values.shape == (2, 3)
+    assert parser.malformed_count == 1
+
+def test_parse_bytes_posts_a_tagged_batch():
+    batches = []
+    event.set_synchronous(True)
+    event.subscribe(EventType.NEW_FLOAT_BATCH_EVENT, batches.append)
+    try:
+        parser = BinaryParser('<fff', Framing.SLIP, enabled=True, source='COM7')
+        parser.parse_bytes(frame((1, 2, 3), Framing.SLIP) + frame((4, 5, 6), Framing.SLIP))
+    finally:
+        event.unsubscribe(EventType.NEW_FLOAT_BATCH_EVENT, batches.append)
+        event.set_synchronous(False)
+
+    assert len(batches) == 1
+    assert batches[0].source == 'COM7'
+    np.testing.assert_array_equal(batches[0].values, [[1, 2, 3], [4, 5, 6]])
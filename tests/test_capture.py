@@ -0,0 +1,87 @@
+import struct
+
+import numpy as np
+import pytest
+
+from modules.capture import HEADER_ALIGNMENT, MAGIC, CaptureReader, CaptureWriter, encode_header, encode_rows
+
+def test_header_is_aligned_and_names_round_trip(tmp_path):
+    names = ['time', 'volts', 'température']
+    header = encode_header(names)
+    assert header.startswith(MAGIC)
+    assert len(header) % HEADER_ALIGNMENT == 0
+
+    path = tmp_path / 'empty.spcap'
+    path.write_bytes(header)
+    reader = CaptureReader(str(path))
+    assert reader.names == names
+    assert reader.channel_count == 3
+    assert len(reader) == 0
+
+@pytest.mark.parametrize('value_dtype', ['d', 'f'])
+def test_writer_and_reader_round_trip(tmp_path, value_dtype):
+    path = str(tmp_path / 'capture.spcap')
+    timestamps = np.arange(10) * 0.01
+    values = np.arange(30, dtype=float).reshape(10, 3)
+    with CaptureWriter(path, ['a', 'b', 'c'], value_dtype) as writer:
+        writer.append(timestamps[:4], values[:4])
+        writer.append(timestamps[4:], values[4:])
+
+    reader = CaptureReader(path)
+    assert reader.value_dtype == value_dtype
+    np.testing.assert_array_equal(reader.timestamps, timestamps)
+    np.testing.assert_array_equal(reader.values, values)
+    read_timestamps, read_values = reader.read(2, 5)
+    np.testing.assert_array_equal(read_timestamps, timestamps[2:5])
+    np.testing.assert_array_equal(read_values, values[2:5])
+
+def test_writer_rejects_other_channel_count(tmp_path):
+    with CaptureWriter(str(tmp_path / 'capture.spcap'), ['a', 'b']) as writer:
+        with pytest.raises(ValueError):
+            writer.append(np.zeros(1), np.zeros((1, 3)))
+
+def test_partial_last_row_is_ignored(tmp_path):
+    path = tmp_path / 'crashed.spcap'
+    path.write_bytes(encode_header(['a']) + encode_rows(np.arange(3.0), np.ones((3, 1))) + b'\x01\x02\x03')
+    reader = CaptureReader(str(path))
+    assert len(reader) == 3
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / 'log.txt'
+    path.write_bytes(b'1,2,3\n' * 10)
+    with pytest.raises(ValueError):
+        CaptureReader(str(path))
+
+def test_to_csv(tmp_path):
+    path = str(tmp_path / 'capture.spcap')
+    with CaptureWriter(path, ['x', 'y']) as writer:
+        writer.append(np.array([0.5, 1.5]), np.array([[1.0, 2.0], [3.0, 4.0]]))
+    CaptureReader(path).to_csv(str(tmp_path / 'capture.csv'))
+    lines = (tmp_path / 'capture.csv').read_text().splitlines()
+    assert lines[0] == 'timestamp,x,y'
+    assert [float(text) for text in lines[2].split(',')] == [1.5, 3.0, 4.0]
+
+@pytest.mark.parametrize('cut', [HEADER_ALIGNMENT // 2 + 1, 25, 27])
+def test_truncated_names_raise_value_error(tmp_path, cut):
+    header = encode_header(['first', 'second', 'third'])
+    path = tmp_path / 'truncated.spcap'
+    path.write_bytes(header[:cut])
+    with pytest.raises(ValueError, match='truncated capture header'):
+        CaptureReader(str(path))
+
+def test_header_size_shorter_than_names_raises_value_error(tmp_path):
+    header = bytearray(encode_header(['x' * 100]))
+    struct.pack_into('<I', header, 8, HEADER_ALIGNMENT)
+    path = tmp_path / 'corrupt.spcap'
+    path.write_bytes(bytes(header))
+    with pytest.raises(ValueError, match='truncated capture header'):
+        CaptureReader(str(path))
+
+def test_replay_reports_a_corrupt_capture(tmp_path):
+    from modules.receiver import FileReplayReceiver
+
+    path = tmp_path / 'truncated.spcap'
+    path.write_bytes(encode_header(['first', 'second'])[:24])
+    receiver = FileReplayReceiver()
+    assert not receiver.connect(str(path))
+    assert 'truncated capture header' in str(receiver.error)
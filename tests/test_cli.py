@@ -0,0 +1,20 @@
+import pytest
+
+from cli import parse_args
+
+def test_parse_args_accepts_a_binary_capture():
+    args = parse_args(['--port', 'COM3', '--protocol', 'cobs', '--layout', '<Hffff', '--checksum', 'crc16'])
+    assert (args.port, args.protocol, args.layout) == ('COM3', 'cobs', '<Hffff')
+
+@pytest.mark.parametrize('argv, message', [
+    (['--protocol', 'cobs'], 'one of --port, --replay or --list is required'),
+    (['--port', 'COM3', '--protocol', 'cobs', '--layout', '<fz'], "Unsupported struct layout '<fz'"),
+    (['--port', 'COM3', '--layout', '@ff'], "Native alignment '@' is not supported"),
+    (['--port', 'COM3', '--derived', 'x = ch0 +'], 'Invalid expression'),
+    (['--port', 'COM3', '--grammar', 'regex', '--pattern', 'v: \\S+'], 'has no group'),
+])
+def test_parse_args_rejects_bad_options(capsys, argv, message):
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(argv)
+    assert exit_info.value.code == 2
+    assert message in capsys.readouterr().err
@@ -0,0 +1,56 @@
+import numpy as np
+
+from modules.decimation import MinMaxPyramid
+from modules.ring_buffer import RingBuffer
+
+def filled(capacity, values):
+    buffer = RingBuffer(capacity)
+    pyramid = MinMaxPyramid(buffer)
+    for block in np.array_split(values, 37):
+        buffer.append(block, np.arange(len(block), dtype=float))
+        pyramid.update()
+    return buffer, pyramid
+
+def test_short_window_is_returned_as_is():
+    values = np.arange(100.0)[:, np.newaxis]
+    buffer, pyramid = filled(1000, values)
+    x, decimated = pyramid.decimate(500)
+    np.testing.assert_array_equal(x, np.arange(100))
+    np.testing.assert_array_equal(decimated, values)
+
+def test_decimation_bounds_points_and_keeps_peaks():
+    rng = np.random.default_rng(0)
+    values = rng.standard_normal((20000, 2))
+    values[12345, 0] = 50.0
+    values[17001, 1] = -50.0
+    buffer, pyramid = filled(16384, values)
+
+    x, decimated = pyramid.decimate(1000)
+    assert len(decimated) <= 1100
+    assert decimated[:, 0].max() == 50.0
+    assert decimated[:, 1].min() == -50.0
+    np.testing.assert_array_equal(decimated.min(axis=0), buffer.view().min(axis=0))
+    np.testing.assert_array_equal(decimated.max(axis=0), buffer.view().max(axis=0))
+    assert np.all(np.diff(x) >= 0)
+    assert buffer.indices()[0] <= x[0] and x[-1] <= buffer.indices()[-1]
+
+def test_update_matches_rebuild():
+    rng = np.random.default_rng(1)
+    values = rng.standard_normal((5000, 1))
+    buffer, pyramid = filled(4096, values)
+    incremental = pyramid.decimate(300)
+
+    rebuilt = MinMaxPyramid(buffer)
+    rebuilt.update()
+    expected = rebuilt.decimate(300)
+    # The rebuilt pyramid lost the buckets that started before the buffer, compare the shared tail.
+    count = min(len(incremental[0]), len(expected[0]))
+    np.testing.assert_array_equal(incremental[0][-count:], expected[0][-count:])
+    np.testing.assert_array_equal(incremental[1][-count:], expected[1][-count:])
+
+def test_nan_samples_are_ignored_by_buckets():
+    values = np.arange(4096.0)[:, np.newaxis]
+    values[100:110] = np.nan
+    _, pyramid = filled(4096, values)
+    _, decimated = pyramid.decimate(200)
+    assert np.isfinite(decimated).all()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from modules.derived import DerivedChannels, compile_expression
+from modules.sample import SampleBatch
+
+@pytest.mark.parametrize('expression', [
+    "__import__('os')",
+    'ch0.real',
+    'ch0[0]',
+    '(lambda: 1)()',
+    'open(ch0)',
+    'np.sqrt(ch0)',
+    'sqrt(x=ch0)',
+    '__builtins__',
+    '_private + 1',
+    "'text'",
+    'True',
+    '[ch0, ch1]',
+    'ch0 if ch1 else 0',
+    'ch0 and ch1',
+])
+def test_rejects_syntax_outside_the_whitelist(expression):
+    with pytest.raises(ValueError):
+        compile_expression(expression)
+
+def test_accepts_functions_constants_and_channel_names():
+    compile_expression('sqrt(ch0**2 + temp) * pi - where(ch1 > e, 1, 0)')
+
+@pytest.mark.parametrize('text', [
+    'ch0 = ch1',
+    'sqrt = ch0',
+    '_x = ch0',
+    'a = ch0; a = ch1',
+    'a = b; b = ch0',
+    'a = a + 1',
+    'a = arctan2(ch0)',
+    'ch0 + 1',
+])
+def test_rejects_invalid_definitions(text):
+    with pytest.raises(ValueError):
+        DerivedChannels(text)
+
+def test_uses_raw_and_earlier_derived_channels():
+    derived = DerivedChannels('diff = ch0 - ch1; double = diff * 2')
+    values = derived.apply(np.array([[3.0, 1.0], [5.0, 2.0]]))
+    np.testing.assert_array_equal(values, [[3, 1, 2, 4], [5, 2, 3, 6]])
+
+def test_uses_grammar_channel_names():
+    derived = DerivedChannels('fahrenheit = temp * 1.8 + 32')
+    batch = derived.apply_batch(SampleBatch(np.array([[0.0, 100.0], [1.0, 0.0]]), 'port', None, ['time', 'temp']))
+    assert batch.names == ['time', 'temp', 'fahrenheit']
+    np.testing.assert_allclose(batch.values[:, 2], [212, 32])
+
+def test_missing_channels_are_nan():
+    derived = DerivedChannels('a = ch2; b = temp; c = a + 1')
+    values = derived.apply(np.array([[1.0, 2.0]]), ['volts', 'amps'])
+    assert values.shape == (1, 5)
+    assert np.isnan(values[0, 2:]).all()
+
+def test_grammar_names_that_are_not_identifiers_are_ignored():
+    derived = DerivedChannels('watts = ch0 * ch1')
+    values = derived.apply(np.array([[2.0, 3.0]]), ['volts (V)', 'pi'])
+    np.testing.assert_array_equal(values, [[2, 3, 6]])
@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+QtWidgets = pytest.importorskip('PyQt5.QtWidgets')
+
+from modules.displayer import MplConfig, PlotType, QtPlotDisplayer
+from modules.sample import SampleBatch
+from modules.trigger import TriggerMode
+from UI.plotwidget import PlotWidget
+
+@pytest.fixture(scope='module')
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+@pytest.mark.parametrize('plot_type', list(PlotType))
+def test_remove_source_forgets_its_traces(qapp, plot_type):
+    displayer = QtPlotDisplayer(PlotWidget())
+    displayer.update_mpl_config(MplConfig(plot_type=plot_type, fft_size=4))
+    displayer.display_batch(SampleBatch(np.ones((4, 1)), '', np.arange(4.0)))
+    displayer.display_batch(SampleBatch(np.ones((4, 2)), 'COM4', np.arange(4.0), ['volts', 'amps']))
+    displayer.render()
+    assert 'COM4: volts' in displayer.labels
+
+    displayer.remove_source('COM4')
+    assert 'COM4' not in displayer.latest_datas and 'COM4' not in displayer.names
+    assert 'COM4' not in displayer.samples and 'COM4' not in displayer.spectra
+    displayer.render()
+    assert not any(label.startswith('COM4') for label in displayer.labels)
+
+def test_remove_trigger_source_rearms(qapp):
+    displayer = QtPlotDisplayer(PlotWidget())
+    displayer.update_mpl_config(MplConfig(plot_type=PlotType.PLOT, trigger_mode=TriggerMode.NORMAL))
+    displayer.display_batch(SampleBatch(np.zeros((4, 1)), 'COM4'))
+    assert displayer.trigger_source == 'COM4'
+    trigger = displayer.trigger
+    displayer.remove_source('COM4')
+    assert displayer.trigger_source is None and displayer.trigger is not trigger
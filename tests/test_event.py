@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from modules import event
+from modules.event import Delivery, EventType, QueuePolicy, dispatch_pending, post_event, subscribe, unsubscribe
+
+@pytest.fixture(autouse=True)
+def bus(monkeypatch):
+    ''' Give every test an empty bus and stop the delivery threads it started. '''
+    monkeypatch.setattr(event, 'subscribers', {})
+    yield
+    event.shutdown()
+    event.set_synchronous(False)
+    event.set_type_checking(False)
+
+class Blocking:
+    ''' A handler that holds the first event until release() so the queue fills up behind it. '''
+
+    def __init__(self):
+        self.received = []
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, data):
+        self.started.set()
+        self.released.wait(5)
+        self.received.append(data)
+
+    def release(self):
+        self.released.set()
+
+def hold_first(policy, max_depth):
+    handler = Blocking()
+    subscription = subscribe(EventType.NEW_MESSAGE_EVENT, handler, Delivery.THREAD, policy, max_depth)
+    post_event(EventType.NEW_MESSAGE_EVENT, 'first')
+    assert handler.started.wait(5)
+    return handler, subscription
+
+def test_thread_delivery_runs_off_the_posting_thread():
+    threads = []
+    subscription = subscribe(EventType.NEW_MESSAGE_EVENT, lambda data: threads.append(threading.current_thread()),
+                             Delivery.THREAD)
+    post_event(EventType.NEW_MESSAGE_EVENT, 'a')
+    assert subscription.flush(5)
+    assert threads and threads[0] is not threading.current_thread()
+
+def test_latest_keeps_only_the_newest_pending_event():
+    handler, subscription = hold_first(QueuePolicy.LATEST, 8)
+    for index in range(3):
+        post_event(EventType.NEW_MESSAGE_EVENT, str(index))
+    assert subscription.depth == 1
+    handler.release()
+    assert subscription.flush(5)
+    assert handler.received == ['first', '2']
+    assert subscription.dropped == 2
+
+def test_drop_oldest_keeps_the_newest_max_depth_events():
+    handler, subscription = hold_first(QueuePolicy.DROP_OLDEST, 2)
+    for index in range(4):
+        post_event(EventType.NEW_MESSAGE_EVENT, str(index))
+    handler.release()
+    assert subscription.flush(5)
+    assert handler.received == ['first', '2', '3']
+    assert subscription.dropped == 2
+
+def test_lossless_makes_the_poster_wait():
+    handler, subscription = hold_first(QueuePolicy.LOSSLESS, 1)
+    post_event(EventType.NEW_MESSAGE_EVENT, '1')
+    poster = threading.Thread(target=post_event, args=(EventType.NEW_MESSAGE_EVENT, '2'))
+    poster.start()
+    poster.join(0.2)
+    assert poster.is_alive()
+
+    handler.release()
+    poster.join(5)
+    assert not poster.is_alive()
+    assert subscription.flush(5)
+    assert handler.received == ['first', '1', '2']
+    assert subscription.dropped == 0
+
+def test_main_delivery_waits_for_dispatch_pending():
+    received = []
+    subscription = subscribe(EventType.NEW_MESSAGE_EVENT, received.append, Delivery.MAIN)
+    for index in range(3):
+        post_event(EventType.NEW_MESSAGE_EVENT, str(index))
+    assert received == []
+    assert subscription.depth == 3
+    assert dispatch_pending() == 3
+    assert received == ['0', '1', '2']
+    assert dispatch_pending() == 0
+
+def test_flush_times_out_while_the_handler_is_busy():
+    handler, subscription = hold_first(QueuePolicy.LOSSLESS, 8)
+    post_event(EventType.NEW_MESSAGE_EVENT, 'second')
+    assert not subscription.flush(0.05)
+    handler.release()
+    assert subscription.flush(5)
+    assert handler.received == ['first', 'second']
+
+def test_close_delivers_pending_and_stops_the_thread():
+    handler, subscription = hold_first(QueuePolicy.LOSSLESS, 8)
+    post_event(EventType.NEW_MESSAGE_EVENT, 'second')
+    thread = subscription._thread
+    handler.release()
+    subscription.close()
+    assert handler.received == ['first', 'second']
+    assert subscription._thread is None and not thread.is_alive()
+
+def test_unsubscribe_stops_delivery():
+    received = []
+    subscribe(EventType.NEW_MESSAGE_EVENT, received.append, Delivery.THREAD)
+    post_event(EventType.NEW_MESSAGE_EVENT, 'a')
+    unsubscribe(EventType.NEW_MESSAGE_EVENT, received.append)
+    post_event(EventType.NEW_MESSAGE_EVENT, 'b')
+    assert received == ['a']
+    assert event.get_subscriptions() == []
+
+def test_set_synchronous_delivers_queued_subscriptions_in_post_event():
+    threads = []
+    subscribe(EventType.NEW_MESSAGE_EVENT, lambda data: threads.append(threading.current_thread()), Delivery.THREAD)
+    subscribe(EventType.NEW_MESSAGE_EVENT, lambda data: threads.append(threading.current_thread()), Delivery.MAIN)
+    event.set_synchronous(True)
+    post_event(EventType.NEW_MESSAGE_EVENT, 'a')
+    assert threads == [threading.current_thread()] * 2
+
+def test_type_checking_rejects_wrong_payloads():
+    received = []
+    subscribe(EventType.NEW_FLOAT_EVENT, received.append)
+    post_event(EventType.NEW_FLOAT_EVENT, 'not a list')
+    event.set_type_checking(True)
+    with pytest.raises(TypeError):
+        post_event(EventType.NEW_FLOAT_EVENT, 'not a list')
+    post_event(EventType.NEW_FLOAT_EVENT, [1.0, 2.0])
+    assert received == ['not a list', [1.0, 2.0]]
+
+def test_stats_counts_deliveries_and_drops():
+    handler, subscription = hold_first(QueuePolicy.DROP_OLDEST, 1)
+    post_event(EventType.NEW_MESSAGE_EVENT, 'dropped')
+    post_event(EventType.NEW_MESSAGE_EVENT, 'kept')
+    [row] = event.stats()
+    assert row['event'] == 'NEW_MESSAGE_EVENT'
+    assert (row['delivery'], row['policy']) == ('THREAD', 'DROP_OLDEST')
+    assert (row['depth'], row['delivered'], row['dropped']) == (1, 0, 1)
+
+    handler.release()
+    assert subscription.flush(5)
+    [row] = event.stats()
+    assert (row['depth'], row['delivered'], row['dropped']) == (0, 2, 1)
+    assert row['max_latency_ms'] >= row['mean_latency_ms'] > 0
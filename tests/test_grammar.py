@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from modules.grammar import (CsvHeaderGrammar, DelimitedGrammar, GrammarType, KeyValueGrammar, RegexGrammar,
+                             new_grammar)
+
+def test_delimited_fast_path():
+    grammar = DelimitedGrammar(',')
+    [(indices, values)] = grammar.parse_batch(['1,2', '3,4', '5,6'])
+    np.testing.assert_array_equal(indices, [0, 1, 2])
+    np.testing.assert_array_equal(values, [[1, 2], [3, 4], [5, 6]])
+
+def test_delimited_fallback_counts_text_and_malformed():
+    grammar = DelimitedGrammar(',')
+    batches = grammar.parse_batch(['1,2', 'boot,ok', '3,x', '4,5', '6', '7'])
+    assert [indices.tolist() for indices, _ in batches] == [[0, 3], [4, 5]]
+    np.testing.assert_array_equal(batches[0][1], [[1, 2], [4, 5]])
+    np.testing.assert_array_equal(batches[1][1], [[6], [7]])
+    assert (grammar.text_count, grammar.malformed_count) == (1, 1)
+
+def test_delimited_without_delimiter_takes_one_channel():
+    [(_, values)] = DelimitedGrammar('').parse_batch(['1.5', '2.5'])
+    np.testing.assert_array_equal(values, [[1.5], [2.5]])
+
+def test_csv_header_names_the_following_data():
+    grammar = CsvHeaderGrammar(',')
+    [(indices, values)] = grammar.parse_batch(['time,volts', '0,1.5', '1,1.6'])
+    assert grammar.names == ['time', 'volts']
+    np.testing.assert_array_equal(indices, [1, 2])
+    assert (grammar.text_count, grammar.malformed_count) == (0, 0)
+
+def test_csv_header_waits_for_data_across_calls():
+    grammar = CsvHeaderGrammar(',')
+    assert grammar.parse_batch(['time,volts']) == []
+    assert grammar.names is None and grammar.pending == [['time', 'volts']]
+    grammar.parse_batch(['0,1.5'])
+    assert grammar.names == ['time', 'volts'] and grammar.pending == []
+
+def test_csv_header_ignores_debug_prints():
+    grammar = CsvHeaderGrammar(',')
+    grammar.parse_batch(['Init done, starting ADC', 'time,volts', 'Sensor ok, calibrated', '0,1.5'])
+    assert grammar.names == ['time', 'volts']
+    assert grammar.text_count == 2
+
+def test_csv_header_that_does_not_match_is_text():
+    grammar = CsvHeaderGrammar(',')
+    grammar.parse_batch(['a,b,c', '1,2'])
+    assert grammar.names is None
+    assert grammar.text_count == 1
+
+def test_csv_header_is_dropped_when_the_channel_count_changes():
+    grammar = CsvHeaderGrammar(',')
+    grammar.parse_batch(['time,volts', '0,1.5'])
+    grammar.parse_batch(['1,2,3'])
+    assert grammar.names is None
+
+def test_key_value_fills_missing_keys_with_nan():
+    grammar = KeyValueGrammar(',')
+    [(indices, values)] = grammar.parse_batch(['a=1,b=2', 'b=3', 'c=4,a=5'])
+    assert grammar.names == ['a', 'b', 'c']
+    np.testing.assert_array_equal(indices, [0, 1, 2])
+    np.testing.assert_array_equal(values, [[1, 2, np.nan], [np.nan, 3, np.nan], [5, np.nan, 4]])
+
+def test_key_value_keeps_columns_across_calls():
+    grammar = KeyValueGrammar('')
+    grammar.parse_batch(['x=1 y=2'])
+    [(_, values)] = grammar.parse_batch(['y=3'])
+    np.testing.assert_array_equal(values, [[np.nan, 3]])
+
+def test_key_value_bad_values():
+    grammar = KeyValueGrammar(',')
+    [(indices, values)] = grammar.parse_batch(['a=1,b=x', 'state=idle', 'debug print', 'a=2'])
+    np.testing.assert_array_equal(indices, [0, 3])
+    np.testing.assert_array_equal(values, [[1, np.nan], [2, np.nan]])
+    assert grammar.names == ['a', 'b']
+    assert (grammar.malformed_count, grammar.text_count) == (2, 1)
+
+def test_key_value_frame_without_numbers_is_dropped():
+    grammar = KeyValueGrammar(',')
+    assert grammar.parse_batch(['a=x']) == []
+    assert grammar.malformed_count == 1
+    assert grammar.names == []
+
+def test_regex_optional_groups_are_nan():
+    grammar = RegexGrammar(',', r'v=(?P<volts>\S+)(?: t=(\S+))?')
+    [(indices, values)] = grammar.parse_batch(['v=1 t=2', 'noise', 'v=3', 'v=x'])
+    assert grammar.names == ['volts', 'ch1']
+    np.testing.assert_array_equal(indices, [0, 2])
+    np.testing.assert_array_equal(values, [[1, 2], [3, np.nan]])
+    assert (grammar.text_count, grammar.malformed_count) == (1, 1)
+
+def test_regex_without_group_is_rejected():
+    with pytest.raises(ValueError):
+        new_grammar(GrammarType.REGEX, ',', r'v=\S+')
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+
+from modules.acquisition import Chunk
+from modules.capture import CaptureReader
+from modules.recorder import Recorder, RotatingWriter, SampleFormat
+from modules.sample import SampleBatch
+
+def read_all(paths):
+    return [open(path, 'rb').read() for path in paths]
+
+def test_rotates_by_size(tmp_path):
+    writer = RotatingWriter(str(tmp_path), 'raw', '.txt', max_bytes=10)
+    writer.start()
+    for index in range(5):
+        writer.write(f'{index}abc'.encode())
+    writer.stop()
+    assert read_all(writer.files) == [b'0abc1abc2abc', b'3abc4abc']
+    assert writer.bytes_written == 20
+
+def test_rotates_by_time(tmp_path):
+    writer = RotatingWriter(str(tmp_path), 'raw', '.txt', max_seconds=0.0)
+    writer.start()
+    for index in range(3):
+        writer.write(str(index).encode())
+    writer.stop()
+    assert read_all(writer.files) == [b'0', b'1', b'2']
+
+def test_stop_writes_everything_pending(tmp_path):
+    writer = RotatingWriter(str(tmp_path), 'raw', '.txt', flush_interval=60.0)
+    writer.start()
+    for index in range(1000):
+        writer.write(b'%d\n' % index)
+    writer.stop()
+    assert read_all(writer.files) == [b''.join(b'%d\n' % index for index in range(1000))]
+
+def test_full_queue_counts_drops(tmp_path):
+    writer = RotatingWriter(str(tmp_path), 'raw', '.txt', max_pending=2)
+    for index in range(5):
+        writer.write(str(index).encode())
+    assert writer.items_dropped == 3
+    writer.start()
+    writer.stop()
+    assert read_all(writer.files) == [b'01']
+
+def test_layout_change_starts_new_capture(tmp_path):
+    recorder = Recorder(str(tmp_path), sample_format=SampleFormat.CAPTURE)
+    recorder.start([''])
+    recorder.record_batch(SampleBatch(np.ones((2, 2)), timestamps=np.array([0.0, 1.0])))
+    recorder.record_batch(SampleBatch(np.ones((3, 2)), timestamps=np.arange(3.0)))
+    recorder.record_batch(SampleBatch(np.zeros((1, 3)), timestamps=np.array([4.0])))
+    recorder.record_batch(SampleBatch(np.zeros((1, 3)), timestamps=np.array([5.0]), names=['t', 'v', 'a']))
+    recorder.record_chunk(Chunk(0.0, b'1,1\n'))
+    recorder.stop()
+
+    captures = sorted(path for path in os.listdir(tmp_path) if path.endswith('.spcap'))
+    readers = [CaptureReader(str(tmp_path / path)) for path in captures]
+    assert [(reader.names, len(reader)) for reader in readers] == [
+        (['ch0', 'ch1'], 5),
+        (['ch0', 'ch1', 'ch2'], 1),
+        (['t', 'v', 'a'], 1),
+    ]
+    assert not recorder.is_recording
+
+def test_recorder_keeps_drops_after_stop(tmp_path):
+    recorder = Recorder(str(tmp_path))
+    recorder.start(['COM3'])
+    writer = recorder.raw_writers['COM3']
+    writer.stop()
+    writer.max_pending = 1
+    for _ in range(3):
+        recorder.record_chunk(Chunk(0.0, b'x'), 'COM3')
+    assert recorder.items_dropped == 2
+    recorder.stop()
+    assert recorder.items_dropped == 2
@@ -0,0 +1,57 @@
+import numpy as np
+
+from modules.ring_buffer import RingBuffer
+
+def test_append_wraps_and_keeps_newest():
+    buffer = RingBuffer(5)
+    for start in range(0, 12, 3):
+        block = np.arange(start, start + 3, dtype=float)
+        buffer.append(np.column_stack([block, -block]), block * 0.1)
+
+    assert len(buffer) == 5
+    assert buffer.total == 12
+    np.testing.assert_array_equal(buffer.view()[:, 0], [7, 8, 9, 10, 11])
+    np.testing.assert_array_equal(buffer.view()[:, 1], [-7, -8, -9, -10, -11])
+    np.testing.assert_allclose(buffer.times(), [0.7, 0.8, 0.9, 1.0, 1.1])
+    np.testing.assert_array_equal(buffer.indices(), [7, 8, 9, 10, 11])
+
+def test_view_is_contiguous_without_copy():
+    buffer = RingBuffer(4, 1)
+    buffer.append(np.arange(6.0)[:, np.newaxis])
+    view = buffer.view()
+    assert view.base is not None
+    assert view.flags['C_CONTIGUOUS']
+
+def test_block_larger_than_capacity():
+    buffer = RingBuffer(3)
+    buffer.append(np.arange(10.0)[:, np.newaxis])
+    np.testing.assert_array_equal(buffer.view()[:, 0], [7, 8, 9])
+    assert buffer.total == 10
+
+def test_missing_timestamps_are_nan():
+    buffer = RingBuffer(3)
+    buffer.append([1.0, 2.0])
+    assert np.isnan(buffer.times()).all()
+
+def test_resize_keeps_newest_and_total():
+    buffer = RingBuffer(6)
+    buffer.append(np.arange(8.0)[:, np.newaxis], np.arange(8.0))
+
+    buffer.resize(3)
+    np.testing.assert_array_equal(buffer.view()[:, 0], [5, 6, 7])
+    np.testing.assert_array_equal(buffer.times(), [5, 6, 7])
+    np.testing.assert_array_equal(buffer.indices(), [5, 6, 7])
+
+    buffer.resize(10)
+    buffer.append([[8.0]])
+    np.testing.assert_array_equal(buffer.view()[:, 0], [5, 6, 7, 8])
+    assert buffer.total == 9
+
+def test_channel_count_change_fills_nan():
+    buffer = RingBuffer(4)
+    buffer.append([[1.0]])
+    buffer.append([[2.0, 3.0]])
+    view = buffer.view()
+    assert view.shape == (2, 2)
+    assert np.isnan(view[0, 1])
+    np.testing.assert_array_equal(view[1], [2, 3])
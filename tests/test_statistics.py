@@ -0,0 +1,54 @@
+import numpy as np
+
+from modules.statistics import RunningStats, StatisticsMonitor
+
+def merged(values, splits):
+    stats = RunningStats()
+    for block in np.split(values, splits):
+        stats.merge(RunningStats.of(block))
+    return stats
+
+def test_merge_matches_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.normal(1e6, 3.0, (5000, 3))
+    splits = np.sort(rng.choice(np.arange(1, 5000), 40, replace=False))
+    stats = merged(values, splits)
+
+    np.testing.assert_array_equal(stats.count, [5000, 5000, 5000])
+    np.testing.assert_allclose(stats.mean, values.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(stats.variance, values.var(axis=0), rtol=1e-9)
+    np.testing.assert_array_equal(stats.minimum, values.min(axis=0))
+    np.testing.assert_array_equal(stats.maximum, values.max(axis=0))
+
+def test_nan_values_are_skipped_per_channel():
+    values = np.array([
+        [1.0, np.nan, np.nan],
+        [2.0, 10.0, np.nan],
+        [np.nan, 20.0, np.nan],
+        [3.0, np.nan, np.nan],
+    ])
+    stats = merged(values, [1, 2, 3])
+    np.testing.assert_array_equal(stats.count, [3, 2, 0])
+    np.testing.assert_allclose(stats.mean[:2], [2.0, 15.0])
+    np.testing.assert_allclose(stats.variance[:2], [2 / 3, 25.0])
+    np.testing.assert_array_equal(stats.minimum[:2], [1.0, 10.0])
+    assert np.isnan(stats.mean[2]) and np.isnan(stats.variance[2]) and np.isnan(stats.minimum[2])
+
+def test_rate_per_channel():
+    stats = RunningStats.of(np.array([[1.0, 1.0], [2.0, np.nan], [3.0, 3.0]]), 10.0, 12.0)
+    np.testing.assert_allclose(stats.rate, [1.0, 0.5])
+    assert np.isnan(RunningStats.of(np.ones((3, 1))).rate).all()
+
+def test_monitor_rows_for_key_value_frames():
+    monitor = StatisticsMonitor()
+    monitor.record(np.array([[1.0, np.nan], [3.0, 4.0]]), 'COM3', np.array([0.0, 1.0]), ['volts', 'amps'])
+    rows = monitor.rows()
+    assert [(row['source'], row['name']) for row in rows] == [('COM3', 'volts'), ('COM3', 'amps')]
+    assert [row['count'] for row in rows] == [2, 1]
+
+def test_monitor_forgets_removed_source():
+    monitor = StatisticsMonitor()
+    monitor.record(np.ones((2, 1)), '', np.array([0.0, 1.0]))
+    monitor.record(np.ones((2, 2)), 'COM4', np.array([0.0, 1.0]))
+    monitor.remove_source('COM4')
+    assert [row['source'] for row in monitor.rows()] == ['']
@@ -0,0 +1,61 @@
+from modules.receiver import new_decoder
+from modules.string_parser import StreamFramer, StringParser
+
+def test_frame_split_across_chunks():
+    framer = StreamFramer('$', '#')
+    assert framer.feed('$1,2') == []
+    assert framer.feed(',3') == []
+    assert framer.feed('#') == ['1,2,3']
+    assert framer.frame_ends == [1]
+
+def test_several_frames_in_one_chunk():
+    framer = StreamFramer()
+    assert framer.feed('1,2\n3,4\r\n5,') == ['1,2', '3,4']
+    assert framer.frame_ends == [4, 9]
+    assert framer.feed('6\n') == ['5,6']
+    assert framer.frame_count == 3
+
+def test_text_before_the_start_string_is_skipped():
+    framer = StreamFramer('$$$', '###')
+    assert framer.feed('boot$$') == []
+    assert framer.feed('$1,2###') == ['1,2']
+
+def test_lost_end_marker_resyncs_at_next_start():
+    framer = StreamFramer('$', '#')
+    assert framer.feed('$1,2$3,4#$5,6#') == ['3,4', '5,6']
+    assert framer.malformed_count == 1
+
+def test_oversize_buffer_keeps_the_last_start():
+    framer = StreamFramer('$', '#', max_frame_length=16)
+    assert framer.feed('$' + 'x' * 20 + '$1,') == []
+    assert framer.truncated_count == 1
+    assert framer.feed('2#') == ['1,2']
+
+def test_oversize_buffer_without_frames_is_dropped():
+    framer = StreamFramer(max_frame_length=16)
+    assert framer.feed('x' * 20) == []
+    assert framer.truncated_count == 1
+    assert framer.feed('1,2\n') == ['1,2']
+
+def test_multibyte_character_split_across_reads():
+    decoder = new_decoder()
+    framer = StreamFramer()
+    data = 'température=21.5\n'.encode()
+    split = data.index('é'.encode()) + 1
+    frames = framer.feed(decoder.decode(data[:split])) + framer.feed(decoder.decode(data[split:]))
+    assert frames == ['température=21.5']
+
+def test_constructor_configures_the_framer():
+    parser = StringParser('$$$', '###', ',')
+    frames = parser.parse_string('noise\n$$$1,2###\n')
+    assert frames == ['1,2']
+    [(indices, values)] = parser.parse_batch(frames)
+    assert values.tolist() == [[1.0, 2.0]]
+
+def test_parser_counts_framer_errors():
+    parser = StringParser('$', '#', ',')
+    parser.framer.max_frame_length = 8
+    parser.parse_batch(parser.parse_string('$1,2$3,4#$1,x#'))
+    parser.parse_string('$' + 'y' * 10)
+    assert parser.malformed_count == 2
+    assert parser.truncated_count == 1
@@ -0,0 +1,59 @@
+import numpy as np
+
+from modules.trigger import Trigger, TriggerMode, TriggerType
+
+def square_wave(length, period, phase=0):
+    return ((np.arange(length) + phase) // (period // 2) % 2).astype(float)[:, np.newaxis]
+
+def test_rising_edge_is_at_pre():
+    trigger = Trigger(TriggerType.RISING, TriggerMode.NORMAL, level=0.5, pre=10, post=20)
+    assert trigger.update(square_wave(200, 100))
+    assert trigger.frame.shape == (30, 1)
+    assert trigger.frame[9, 0] == 0 and trigger.frame[10, 0] == 1
+    assert trigger.is_triggered
+
+def test_falling_edge_across_updates():
+    trigger = Trigger(TriggerType.FALLING, TriggerMode.NORMAL, level=0.5, pre=5, post=5)
+    wave = square_wave(300, 60)
+    captures = sum(trigger.update(block) for block in np.array_split(wave, 47))
+    assert captures == trigger.capture_count == 4
+    assert trigger.frame[4, 0] == 1 and trigger.frame[5, 0] == 0
+
+def test_frame_times_are_relative_to_trigger():
+    trigger = Trigger(TriggerType.RISING, TriggerMode.NORMAL, level=0.5, pre=3, post=3)
+    trigger.update(square_wave(40, 20), np.arange(40) * 0.5)
+    np.testing.assert_allclose(trigger.frame_times, [-1.5, -1.0, -0.5, 0.0, 0.5, 1.0])
+
+def test_window_fires_when_leaving_band():
+    values = np.zeros((50, 1))
+    values[30:] = 5.0
+    trigger = Trigger(TriggerType.WINDOW, TriggerMode.NORMAL, level=-1.0, high=1.0, pre=2, post=4)
+    assert trigger.update(values)
+    np.testing.assert_array_equal(trigger.frame[:, 0], [0, 0, 5, 5, 5, 5])
+
+def test_single_waits_for_arm():
+    trigger = Trigger(TriggerType.RISING, TriggerMode.SINGLE, level=0.5, pre=5, post=5)
+    assert trigger.update(square_wave(100, 20))
+    assert not trigger.armed
+    assert not trigger.update(square_wave(100, 20))
+    assert trigger.capture_count == 1
+
+    trigger.arm()
+    assert trigger.update(square_wave(100, 20))
+    assert trigger.capture_count == 2
+
+def test_auto_captures_untriggered():
+    trigger = Trigger(TriggerType.RISING, TriggerMode.AUTO, level=10.0, pre=10, post=10)
+    assert not trigger.update(np.zeros((15, 1)))
+    assert trigger.update(np.arange(10.0)[:, np.newaxis])
+    assert not trigger.is_triggered
+    np.testing.assert_array_equal(trigger.frame[-10:, 0], np.arange(10))
+
+def test_trim_bounds_kept_samples():
+    trigger = Trigger(TriggerType.RISING, TriggerMode.NORMAL, level=2.0, pre=50, post=100)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        block = rng.random((64, 2))
+        trigger.update(block)
+        assert len(trigger._values) <= trigger.pre + trigger.post + len(block)
+    assert trigger.capture_count == 0